@@ -22,7 +22,10 @@ from .data.data_manager import DataManager
 from .data.pct14_data_manager import PCT14DataManager
 from .data.ha_config_generator import HomeAssistantConfigurationGenerator
 from .view.main_panel import MainPanel
+from .data.telegram_journal import TelegramJournal
 from .controller.app_bus import AppBus, AppBusEventType
+from .controller.serial_controller import SerialController
+from .controller.telegram_replay import TelegramReplayEngine
 
 import logging
 
@@ -36,6 +39,9 @@ Home Assistant Configurations for the Home Assistant Eltako Integration (https:/
     p.add_argument('-c', "--app_config", help="Filename of stored application configuration. Filename must end with '.eodm'.", default=None)
     p.add_argument('-ha', "--ha_config", help="Filename for Home Assistant Configuration for Eltako Integration. By passing the filename it will disable the GUI and only generate the Home Assistant Configuration file.")
     p.add_argument('-pct14', '--pct14_export', help="Load PCT14 exported file. Filename must end with .xml")
+    p.add_argument('-r', '--replay_journal', help="Replays recorded telegrams of a journal file (.eojournal) without GUI and logs throughput and latencies.")
+    p.add_argument('--replay_speed', help="Speed factor for replaying telegrams. 1 = original timing, 0 = as fast as possible.", type=float, default=1.0)
+    p.add_argument('-p', '--profile_app_bus', help="Measures latencies of all event handlers and logs a report when the application is closed.", action='store_true')
     return p.parse_args()
 
 
@@ -79,10 +85,13 @@ def main():
         return
     
     # init application message BUS
-    app_bus = AppBus()
+    app_bus = AppBus(batched_dispatch=True, max_queue_size=10000)
 
     init_logger(app_bus, logging.DEBUG if opts.verbose > 0 else logging.INFO)
 
+    if opts.profile_app_bus:
+        app_bus.enable_profiling()
+
     # init DATA MANAGER
     data_manager = DataManager(app_bus)
 
@@ -107,9 +116,20 @@ def main():
         # For CLI mode, load data immediately
         data_manager.load_application_data_from_file(opts.app_config)
         HomeAssistantConfigurationGenerator(app_bus, data_manager).save_as_yaml_to_file(opts.ha_config)
+    elif opts.replay_journal:
+        # replay telegrams without GUI e.g. as load test
+        if initial_config_file:
+            data_manager.load_application_data_from_file(initial_config_file)
+        serial_controller = SerialController(app_bus, None)
+        engine = TelegramReplayEngine(app_bus, serial_controller, TelegramJournal(opts.replay_journal))
+        LOGGER.info(str(engine.run(speed=opts.replay_speed)))
     else:
         # For GUI mode, pass initial config to MainPanel for delayed loading
         MainPanel(app_bus, data_manager, initial_config_file, initial_pct14_file)
 
+    if app_bus.is_profiling_enabled():
+        LOGGER.info(app_bus.get_profiling_report())
+    app_bus.shutdown()
+
 if __name__ == "__main__":
     main()
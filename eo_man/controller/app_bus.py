@@ -2,9 +2,15 @@ import inspect
 import asyncio
 import threading
 import queue
+import time
+import copy
+import concurrent.futures
+from collections import deque
+from contextlib import contextmanager
 
 from enum import Enum
 from .. import LOGGER
+from .app_bus_profiler import AppBusProfiler
 
 class AppBusEventType(Enum):
     LOG_MESSAGE = 0                     # dict with keys: msg:str, color:str
@@ -27,16 +33,100 @@ class AppBusEventType(Enum):
     SEND_MESSAGE_TEMPLATE_LIST_UPDATED = 18
     REQUEST_SERVICE_ENDPOINT_DETECTION = 19
     SERVICE_ENDPOINTS_UPDATES = 20     # fired when new services are detected
+    UPDATE_DEVICES_REPRESENTATION = 21  # list of devices (bus devices and sensors) updated at once, e.g. when loading a project
 
-class AppBus():
+
+class AppBusCoalescingPolicy(Enum):
+    """Defines how queued events of the same type are collapsed in batched dispatch mode."""
+    NONE = 0                # every event is dispatched
+    LATEST_WINS = 1         # only the latest queued event of this type is dispatched
+    PER_EXTERNAL_ID = 2     # only the latest queued event per device (external_id) is dispatched
+
+
+class AppBusDropPolicy(Enum):
+    """Defines what happens to an event fired from a background thread when the event queue is full."""
+    NEVER_DROP = 0          # event bypasses the bounded queue and is processed with priority
+    BLOCK = 1               # background thread waits for free space (backpressure) and drops the event after a timeout
+    DROP = 2                # event is shed immediately
+
+
+class AppBusEventStatistics():
+    """Counters of one event type passing the event queue"""
 
     def __init__(self) -> None:
+        self.enqueued:int = 0
+        self.dropped:int = 0
+        self.coalesced:int = 0
+        self.processed:int = 0
+        self.total_latency:float = 0.0    # seconds between queuing and execution
+        self.max_latency:float = 0.0
+
+    @property
+    def avg_latency(self) -> float:
+        if self.processed == 0:
+            return 0.0
+        return self.total_latency / self.processed
+
+    def __str__(self) -> str:
+        return (f"enqueued: {self.enqueued}, dropped: {self.dropped}, coalesced: {self.coalesced}, processed: {self.processed}, "
+                f"avg latency: {self.avg_latency*1000:.1f}ms, max latency: {self.max_latency*1000:.1f}ms")
+
+
+class AppBus():
+
+    DEFAULT_COALESCING_POLICIES:dict[AppBusEventType:AppBusCoalescingPolicy] = {
+        AppBusEventType.DEVICE_ITERATION_PROGRESS: AppBusCoalescingPolicy.LATEST_WINS,
+        AppBusEventType.UPDATE_DEVICE_REPRESENTATION: AppBusCoalescingPolicy.PER_EXTERNAL_ID,
+        AppBusEventType.UPDATE_SENSOR_REPRESENTATION: AppBusCoalescingPolicy.PER_EXTERNAL_ID,
+    }
+
+    DEFAULT_DROP_POLICIES:dict[AppBusEventType:AppBusDropPolicy] = {
+        AppBusEventType.LOG_MESSAGE: AppBusDropPolicy.DROP,
+        AppBusEventType.DEVICE_ITERATION_PROGRESS: AppBusDropPolicy.DROP,
+        AppBusEventType.CONNECTION_STATUS_CHANGE: AppBusDropPolicy.NEVER_DROP,
+        AppBusEventType.DEVICE_SCAN_STATUS: AppBusDropPolicy.NEVER_DROP,
+        AppBusEventType.WRITE_SENDER_IDS_TO_DEVICES_STATUS: AppBusDropPolicy.NEVER_DROP,
+        AppBusEventType.LOAD_FILE: AppBusDropPolicy.NEVER_DROP,
+        AppBusEventType.WINDOW_CLOSED: AppBusDropPolicy.NEVER_DROP,
+        AppBusEventType.WINDOW_LOADED: AppBusDropPolicy.NEVER_DROP,
+        AppBusEventType.UPDATE_DEVICES_REPRESENTATION: AppBusDropPolicy.NEVER_DROP,
+        AppBusEventType.UPDATE_DEVICE_REPRESENTATION: AppBusDropPolicy.NEVER_DROP,
+        AppBusEventType.UPDATE_SENSOR_REPRESENTATION: AppBusDropPolicy.NEVER_DROP,
+    }
+
+    def __init__(self, batched_dispatch:bool=False, tick_time_budget:float=0.05, max_queue_size:int=0, backpressure_timeout:float=1.0) -> None:
         self.handler_count = 0
         self._main_thread_id = threading.get_ident()
         self._tk_root = None  # Will be set later by main panel
-        self._event_queue = queue.Queue()
+        # max_queue_size <= 0 means unbounded
+        self._event_queue = queue.Queue(maxsize=max_queue_size)
         self._queue_timer_active = False
 
+        # bounded queue: events which must never be dropped are kept here if the queue is full
+        self.max_queue_size:int = max_queue_size
+        self.backpressure_timeout:float = backpressure_timeout
+        self.drop_policies:dict[AppBusEventType:AppBusDropPolicy] = dict(self.DEFAULT_DROP_POLICIES)
+        self._priority_events:deque[tuple] = deque()
+        self._statistics_lock = threading.Lock()
+        self._statistics:dict[AppBusEventType:AppBusEventStatistics] = {et: AppBusEventStatistics() for et in AppBusEventType}
+
+        # long-lived event loop for coroutine handlers, started on first use on a dedicated thread
+        self._async_loop:asyncio.AbstractEventLoop = None
+        self._async_loop_thread:threading.Thread = None
+        self._async_loop_lock = threading.Lock()
+        self._async_handler_futures:set[concurrent.futures.Future] = set()
+
+        # opt-in latency profiling of event handlers
+        self.profiler:AppBusProfiler = None
+
+        # batched dispatch: events from background threads are collected, coalesced and 
+        # processed within a time budget (in seconds) per tk tick.
+        self.batched_dispatch:bool = batched_dispatch
+        self.tick_time_budget:float = tick_time_budget
+        self.coalescing_policies:dict[AppBusEventType:AppBusCoalescingPolicy] = dict(self.DEFAULT_COALESCING_POLICIES)
+        self._pending_events:deque[list] = deque()
+        self._pending_events_index:dict[tuple:list] = {}
+
         for event_type in AppBusEventType:
             if event_type not in self._controller_event_handlers.keys():
                 self._controller_event_handlers[event_type] = {}
@@ -53,25 +143,293 @@ class AppBus():
         if not self._tk_root:
             return
             
+        delay = 10
         try:
-            while True:
-                try:
-                    # Get event from queue without blocking
-                    event, data = self._event_queue.get_nowait()
-                    self._execute_event_handlers(event, data)
-                except queue.Empty:
-                    break
+            if self.batched_dispatch:
+                # come back immediately if the time budget was not sufficient to process all events
+                if self._process_event_batch():
+                    delay = 1
+            else:
+                priority_events = self._take_priority_events()
+                queued_events = []
+                while True:
+                    try:
+                        # Get event from queue without blocking
+                        queued_events.append(self._event_queue.get_nowait())
+                    except queue.Empty:
+                        break
+                for event, data, enqueued_at in self._prioritize(priority_events, queued_events):
+                    self._execute_queued_event(event, data, enqueued_at)
         except Exception as e:
             LOGGER.exception(f"Error processing event queue: {e}")
         
         # Schedule next queue check only if tk_root is still valid
         if self._tk_root:
             try:
-                self._tk_root.after(10, self._process_event_queue)
+                self._tk_root.after(delay, self._process_event_queue)
             except Exception as e:
                 LOGGER.exception(f"Error scheduling next event queue check: {e}")
 
 
+    def set_coalescing_policy(self, event:AppBusEventType, policy:AppBusCoalescingPolicy) -> None:
+        self.coalescing_policies[event] = policy
+
+
+    def set_drop_policy(self, event:AppBusEventType, policy:AppBusDropPolicy) -> None:
+        self.drop_policies[event] = policy
+
+
+    def get_event_statistics(self) -> dict[AppBusEventType:AppBusEventStatistics]:
+        """Returns a snapshot of the queue counters per event type."""
+        with self._statistics_lock:
+            return {et: copy.copy(s) for et, s in self._statistics.items()}
+
+
+    def reset_event_statistics(self) -> None:
+        with self._statistics_lock:
+            self._statistics = {et: AppBusEventStatistics() for et in AppBusEventType}
+
+
+    def get_queue_size(self) -> int:
+        return self._event_queue.qsize() + len(self._priority_events) + len(self._pending_events)
+
+
+    def wait_for_queued_events(self, timeout:float=None) -> bool:
+        """Waits on a background thread until the main thread has processed all queued events. 
+        Returns False if the timeout was reached or no tk root processes the queue."""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while self.get_queue_size() > 0:
+            if self._tk_root is None or (deadline is not None and time.perf_counter() >= deadline):
+                return False
+            time.sleep(0.01)
+        return True
+
+
+    def is_saturated(self) -> bool:
+        """True if the bounded event queue is full and events are shed or producers are slowed down."""
+        return self.max_queue_size > 0 and self._event_queue.full()
+
+
+    def _enqueue_event(self, event:AppBusEventType, data) -> bool:
+        """Puts event into the queue according to its drop policy. Returns False if the event was dropped."""
+        entry = (event, data, time.perf_counter())
+        policy = self.drop_policies.get(event, AppBusDropPolicy.BLOCK)
+        # the tk thread waits for coroutine handlers, so the loop thread must not wait for the tk thread to empty the queue
+        if policy == AppBusDropPolicy.BLOCK and self._is_async_loop_thread():
+            policy = AppBusDropPolicy.NEVER_DROP
+        try:
+            if policy == AppBusDropPolicy.BLOCK:
+                self._event_queue.put(entry, block=True, timeout=self.backpressure_timeout)
+            else:
+                self._event_queue.put(entry, block=False)
+        except queue.Full:
+            if policy != AppBusDropPolicy.NEVER_DROP:
+                with self._statistics_lock:
+                    stats = self._statistics[event]
+                    stats.dropped += 1
+                    dropped = stats.dropped
+                # do not flood the log while the bus is saturated
+                if dropped == 1 or dropped % 1000 == 0:
+                    LOGGER.warning(f"Event queue full, dropped {dropped} events of type {event} so far")
+                return False
+            self._priority_events.append(entry)
+
+        with self._statistics_lock:
+            self._statistics[event].enqueued += 1
+        return True
+
+
+    def _execute_queued_event(self, event:AppBusEventType, data, enqueued_at:float) -> None:
+        latency = time.perf_counter() - enqueued_at
+        with self._statistics_lock:
+            stats = self._statistics[event]
+            stats.processed += 1
+            stats.total_latency += latency
+            stats.max_latency = max(stats.max_latency, latency)
+        self._execute_event_handlers(event, data, fired_at=enqueued_at)
+
+
+    def enable_profiling(self) -> AppBusProfiler:
+        if self.profiler is None:
+            self.profiler = AppBusProfiler()
+        return self.profiler
+
+
+    def disable_profiling(self) -> None:
+        self.profiler = None
+
+
+    @contextmanager
+    def use_profiler(self, profiler:AppBusProfiler):
+        """Measures event handlers with the given profiler within the context. The previous profiler is restored afterwards."""
+        previous_profiler = self.profiler
+        self.profiler = profiler
+        try:
+            yield profiler
+        finally:
+            self.profiler = previous_profiler
+
+
+    def is_profiling_enabled(self) -> bool:
+        return self.profiler is not None
+
+
+    def get_profiling_report(self) -> str:
+        """Returns handler latencies and queue counters as printable text."""
+        lines = []
+        if self.profiler is not None:
+            lines.append(self.profiler.get_report())
+        else:
+            lines.append("Event handler profiling is disabled.")
+        lines.append(f"Event Queue (size: {self.get_queue_size()}, saturated: {self.is_saturated()})")
+        for event, stats in self.get_event_statistics().items():
+            if stats.enqueued > 0 or stats.dropped > 0:
+                lines.append(f"{event.name:<38} {stats}")
+        return '\n'.join(lines)
+
+
+    def _get_coalescing_key(self, event:AppBusEventType, data) -> tuple:
+        policy = self.coalescing_policies.get(event, AppBusCoalescingPolicy.NONE)
+        if policy == AppBusCoalescingPolicy.LATEST_WINS:
+            return (event,)
+        if policy == AppBusCoalescingPolicy.PER_EXTERNAL_ID:
+            external_id = getattr(data, 'external_id', None)
+            if external_id is not None:
+                return (event, external_id)
+        return None
+
+
+    def _take_priority_events(self) -> list[tuple]:
+        priority_events = []
+        while self._priority_events:
+            priority_events.append(self._priority_events.popleft())
+        return priority_events
+
+
+    @classmethod
+    def _prioritize(cls, priority_events:list, events:list) -> list:
+        """Puts events which must never be dropped in front of the other events. Earlier events of the same type 
+        are moved in front as well so that events of one type are always processed in the order they were fired.
+        Events are tuples or lists with the event type first and the time they were queued last."""
+        if len(priority_events) == 0:
+            return events
+
+        latest_priority_event = {}
+        for e in priority_events:
+            latest_priority_event[e[0]] = max(latest_priority_event.get(e[0], e[-1]), e[-1])
+
+        front = list(priority_events)
+        rest = []
+        for e in events:
+            if e[0] in latest_priority_event and e[-1] < latest_priority_event[e[0]]:
+                front.append(e)
+            else:
+                rest.append(e)
+        front.sort(key=lambda e: e[-1])
+        return front + rest
+
+
+    def _collect_queued_events(self) -> None:
+        """Moves queued events into the pending list and collapses redundant ones. With a bounded queue the pending list
+        is limited to max_queue_size so that the queue fills up and the drop policies apply if events are processed too slowly."""
+        priority_events = [[event, data, None, enqueued_at] for event, data, enqueued_at in self._take_priority_events()]
+
+        while self.max_queue_size <= 0 or len(self._pending_events) < self.max_queue_size:
+            try:
+                event, data, enqueued_at = self._event_queue.get_nowait()
+            except queue.Empty:
+                break
+
+            key = self._get_coalescing_key(event, data)
+            if key is not None and key in self._pending_events_index:
+                # replace data of the already pending event and keep its position
+                self._pending_events_index[key][1] = data
+                with self._statistics_lock:
+                    self._statistics[event].coalesced += 1
+                continue
+
+            entry = [event, data, key, enqueued_at]
+            self._pending_events.append(entry)
+            if key is not None:
+                self._pending_events_index[key] = entry
+
+        # events which must never be dropped are processed first
+        if len(priority_events) > 0:
+            self._pending_events = deque(self._prioritize(priority_events, list(self._pending_events)))
+
+
+    def _process_event_batch(self) -> bool:
+        """Processes pending events until the time budget of this tick is used up. Returns True if events are left."""
+        deadline = time.perf_counter() + self.tick_time_budget
+        self._collect_queued_events()
+
+        while self._pending_events:
+            event, data, key, enqueued_at = self._pending_events.popleft()
+            if key is not None:
+                del self._pending_events_index[key]
+            self._execute_queued_event(event, data, enqueued_at)
+
+            if time.perf_counter() >= deadline:
+                break
+
+        return len(self._pending_events) > 0
+
+
+    def _get_async_loop(self) -> asyncio.AbstractEventLoop:
+        with self._async_loop_lock:
+            if self._async_loop is None or self._async_loop.is_closed():
+                self._async_loop = asyncio.new_event_loop()
+                self._async_loop_thread = threading.Thread(target=self._run_async_loop, 
+                                                           args=(self._async_loop,), 
+                                                           name='AppBusAsyncLoop', 
+                                                           daemon=True)
+                self._async_loop_thread.start()
+            return self._async_loop
+
+
+    def _run_async_loop(self, loop:asyncio.AbstractEventLoop) -> None:
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+
+    def _is_async_loop_thread(self) -> bool:
+        return self._async_loop_thread is not None and threading.current_thread() is self._async_loop_thread
+
+
+    def submit_coroutine(self, coro) -> concurrent.futures.Future:
+        """Schedules a coroutine thread-safe on the event loop of the app bus. The returned future can be used to observe its completion."""
+        future = asyncio.run_coroutine_threadsafe(coro, self._get_async_loop())
+        with self._async_loop_lock:
+            self._async_handler_futures.add(future)
+        future.add_done_callback(self._remove_async_handler_future)
+        return future
+
+
+    def _remove_async_handler_future(self, future:concurrent.futures.Future) -> None:
+        with self._async_loop_lock:
+            self._async_handler_futures.discard(future)
+
+
+    def wait_for_async_handlers(self, timeout:float=None) -> bool:
+        """Waits until all submitted coroutine handlers are completed. Returns False if the timeout was reached."""
+        with self._async_loop_lock:
+            futures = list(self._async_handler_futures)
+        _, not_done = concurrent.futures.wait(futures, timeout=timeout)
+        return len(not_done) == 0
+
+
+    def shutdown(self) -> None:
+        """Stops the event loop of coroutine handlers."""
+        with self._async_loop_lock:
+            loop = self._async_loop
+            self._async_loop = None
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(loop.stop)
+
+
     _controller_event_handlers={}
     def add_event_handler(self, event:AppBusEventType, handler) -> int:
         self.handler_count += 1
@@ -92,26 +450,52 @@ class AppBus():
         else:
             # We're in a background thread, queue the event for main thread processing
             try:
-                self._event_queue.put((event, data), block=False)
-            except queue.Full:
-                LOGGER.warning(f"Event queue full, dropping event {event}")
+                self._enqueue_event(event, data)
             except Exception as e:
                 LOGGER.exception(f"Failed to queue event {event}: {e}")
                 # Fallback: execute directly but log warning
                 LOGGER.warning(f"Executing event {event} directly from background thread as fallback")
                 self._execute_event_handlers(event, data)
 
-    def _execute_event_handlers(self, event:AppBusEventType, data) -> None:
+    def _execute_event_handlers(self, event:AppBusEventType, data, fired_at:float=None) -> None:
         # Enable debug logging for all events
         LOGGER.debug(f"[AppBus] Executing event {event} with {len(self._controller_event_handlers[event])} handlers")
-        for h in self._controller_event_handlers[event].values(): 
+        profiler = self.profiler
+        if profiler is not None and fired_at is None:
+            fired_at = time.perf_counter()
+
+        for h in list(self._controller_event_handlers[event].values()): 
+            is_coroutine = inspect.iscoroutinefunction(h)
+            is_coroutine_pending = False
+            if profiler is not None:
+                started_at = time.perf_counter()
             try:
-                if inspect.iscoroutinefunction(h):
-                    asyncio.run(h(data))
+                if is_coroutine:
+                    future = self.submit_coroutine(h(data))
+                    if self._is_async_loop_thread():
+                        # the loop cannot be waited for on its own thread
+                        is_coroutine_pending = True
+                        future.add_done_callback(lambda f, e=event: self._log_async_handler_error(f, e))
+                        if profiler is not None:
+                            # coroutine handlers are measured from submission until completion
+                            future.add_done_callback(lambda f, e=event, h=h, s=started_at: 
+                                                     profiler.record(e, h, time.perf_counter() - s, s - fired_at))
+                    else:
+                        # handlers change shared data like the devices, so they are completed 
+                        # before the next handler or event is processed
+                        future.result()
                 else:
                     h(data)
             except:
                 LOGGER.exception(f"Error handling event {event}")
+
+            if profiler is not None and not is_coroutine_pending:
+                profiler.record(event, h, time.perf_counter() - started_at, started_at - fired_at)
+
+
+    def _log_async_handler_error(self, future:concurrent.futures.Future, event:AppBusEventType) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            LOGGER.error(f"Error handling event {event}", exc_info=future.exception())
                 
 
     async def async_fire_event(self, event:AppBusEventType, data) -> None:
@@ -123,9 +507,7 @@ class AppBus():
             # We're in a background thread, queue the event for main thread processing
             # Note: For async events from background threads, we convert to sync execution
             try:
-                self._event_queue.put((event, data), block=False)
-            except queue.Full:
-                LOGGER.warning(f"Event queue full, dropping async event {event}")
+                self._enqueue_event(event, data)
             except Exception as e:
                 LOGGER.exception(f"Failed to queue async event {event}: {e}")
                 # Fallback: execute directly but log warning  
@@ -0,0 +1,83 @@
+import bisect
+import threading
+
+
+class HandlerProfile():
+    """Latency statistics of one event handler for one event type"""
+
+    # upper bounds of the histogram buckets in seconds, last bucket catches everything above
+    HISTOGRAM_BUCKETS:list[float] = [0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0]
+
+    def __init__(self, handler_name:str) -> None:
+        self.handler_name:str = handler_name
+        self.call_count:int = 0
+        self.total_time:float = 0.0
+        self.max_time:float = 0.0
+        self.total_queue_wait:float = 0.0
+        self.max_queue_wait:float = 0.0
+        self.histogram:list[int] = [0] * (len(self.HISTOGRAM_BUCKETS) + 1)
+
+    @property
+    def avg_time(self) -> float:
+        return self.total_time / self.call_count if self.call_count > 0 else 0.0
+
+    @property
+    def avg_queue_wait(self) -> float:
+        return self.total_queue_wait / self.call_count if self.call_count > 0 else 0.0
+
+    def record(self, duration:float, queue_wait:float) -> None:
+        self.call_count += 1
+        self.total_time += duration
+        self.max_time = max(self.max_time, duration)
+        self.total_queue_wait += queue_wait
+        self.max_queue_wait = max(self.max_queue_wait, queue_wait)
+        self.histogram[bisect.bisect_left(self.HISTOGRAM_BUCKETS, duration)] += 1
+
+    @classmethod
+    def get_histogram_labels(cls) -> list[str]:
+        labels = [f"<={b*1000:g}ms" for b in cls.HISTOGRAM_BUCKETS]
+        labels.append(f">{cls.HISTOGRAM_BUCKETS[-1]*1000:g}ms")
+        return labels
+
+
+class AppBusProfiler():
+    """Collects latencies of event handlers per (event type, handler).
+    Queue wait is the time between firing an event and the start of the handler."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._profiles:dict[tuple:HandlerProfile] = {}
+
+    @classmethod
+    def get_handler_name(cls, handler) -> str:
+        return getattr(handler, '__qualname__', None) or repr(handler)
+
+    def record(self, event, handler, duration:float, queue_wait:float) -> None:
+        key = (event, handler)
+        with self._lock:
+            if key not in self._profiles:
+                self._profiles[key] = HandlerProfile(self.get_handler_name(handler))
+            self._profiles[key].record(duration, queue_wait)
+
+    def get_profiles(self) -> dict[tuple:HandlerProfile]:
+        """Returns profiles keyed by (event type, handler name) sorted by total time descending."""
+        with self._lock:
+            profiles = list(self._profiles.items())
+        profiles.sort(key=lambda kv: kv[1].total_time, reverse=True)
+        return {(event, p.handler_name): p for (event, _), p in profiles}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._profiles = {}
+
+    def get_report(self) -> str:
+        lines = []
+        lines.append("Event Handler Profile (sorted by total time)")
+        lines.append(f"{'Event':<38} {'Handler':<60} {'Calls':>8} {'Total':>10} {'Avg':>9} {'Max':>9} {'Avg Wait':>9} {'Max Wait':>9}")
+        for (event, handler_name), p in self.get_profiles().items():
+            event_name = event.name if hasattr(event, 'name') else str(event)
+            lines.append(f"{event_name:<38} {handler_name:<60} {p.call_count:>8} {p.total_time*1000:>8.1f}ms "
+                         f"{p.avg_time*1000:>7.2f}ms {p.max_time*1000:>7.1f}ms {p.avg_queue_wait*1000:>7.1f}ms {p.max_queue_wait*1000:>7.1f}ms")
+            histogram = ', '.join(f"{l}: {c}" for l, c in zip(HandlerProfile.get_histogram_labels(), p.histogram) if c > 0)
+            lines.append(f"{'':<38} histogram: {histogram}")
+        return '\n'.join(lines)
@@ -0,0 +1,285 @@
+import heapq
+import random
+import threading
+import time
+from urllib.parse import urlparse, parse_qs
+
+import serial
+from serial.serialutil import SerialBase, SerialException, PortNotOpenError
+
+from eltakobus.error import ParseError
+from eltakobus.message import *
+from eltakobus.util import AddressExpression
+
+
+class SimulatedBusDevice():
+    """Bus participant of the simulated FAM14 bus with discovery data and memory"""
+
+    MEMORY_ROW_SIZE:int = 8
+
+    def __init__(self, address:int, model:bytes, size:int, memory_size:int, is_fam:bool=False) -> None:
+        self.address:int = address
+        self.model:bytes = model
+        self.size:int = size
+        self.memory_size:int = memory_size
+        self.is_fam:bool = is_fam
+        # BusInterface.read_mem() reads rows 0..memory_size (inclusive)
+        self.memory:list[bytes] = [bytes(self.MEMORY_ROW_SIZE)] * (memory_size + 1)
+
+    def get_discovery_reply(self) -> EltakoDiscoveryReply:
+        return EltakoDiscoveryReply(self.address, self.size, self.memory_size, self.model, self.is_fam)
+
+
+class Fam14Simulator():
+    """In-process emulation of a FAM14 with a configurable number of bus devices.
+
+    Requests written to the bus (lock/unlock, discovery, memory read and write) are answered after the
+    given latency. While the bus is not locked synthetic status telegrams of the bus devices (EltakoWrappedRPS/4BS)
+    and telegrams of decentralized sensors (RPS/4BS) are emitted at the given rate (telegrams per second).
+    """
+
+    # (model bytes, size, memory size) of the simulated bus devices: FSR14-4x, FUD14, FSB14, FSR14-2x
+    DEVICE_MODELS:list[tuple] = [
+        (bytes((0x04, 0x01, 0x11, 0x10)), 4, 128),
+        (bytes((0x04, 0x04, 0x11, 0x10)), 1, 128),
+        (bytes((0x04, 0x06, 0x11, 0x10)), 2, 128),
+        (bytes((0x04, 0x02, 0x11, 0x10)), 2, 128),
+    ]
+    FAM14_MODEL:bytes = bytes((0x07, 0xff, 0x11, 0x10))
+    FAM14_ADDRESS:int = 255
+    FIRST_SENSOR_ROW:int = 12
+    SENSOR_BASE_ADDRESS:int = 0xFEDB0000
+
+    def __init__(self, device_count:int=10, sensor_count:int=10, rate:float=0, latency:float=0.01,
+                 base_id:str='FF-AA-80-00', echo:bool=True, seed:int=None) -> None:
+        self.latency:float = latency
+        self.rate:float = rate
+        self.echo:bool = echo
+        self.base_id:str = base_id
+        self.is_locked:bool = False
+        self.emitted_telegrams:int = 0
+        self.answered_requests:int = 0
+
+        self._random = random.Random(seed)
+        self._selected_device:SimulatedBusDevice = None
+        # (due time, sequence number, serialized telegram)
+        self._scheduled:list[tuple] = []
+        self._seq:int = 0
+        self._bus_free_at:float = 0.0
+        self._last_emit:float = None
+
+        self.fam14 = SimulatedBusDevice(self.FAM14_ADDRESS, self.FAM14_MODEL, 1, 128, is_fam=True)
+        self.fam14.memory[1] = AddressExpression.parse(base_id)[0] + bytes(4)
+
+        self.sensor_addresses:list[bytes] = [(self.SENSOR_BASE_ADDRESS + i).to_bytes(4, 'big') for i in range(sensor_count)]
+
+        self.devices:dict[int:SimulatedBusDevice] = {}
+        address = 1
+        for i in range(device_count):
+            model, size, memory_size = self.DEVICE_MODELS[i % len(self.DEVICE_MODELS)]
+            if address + size - 1 >= self.FAM14_ADDRESS:
+                raise ValueError(f"Not more than {i} devices fit on the simulated bus.")
+            dev = SimulatedBusDevice(address, model, size, memory_size)
+            # teach-in one push button per device so that scans find sensors
+            if len(self.sensor_addresses) > 0:
+                sender = self.sensor_addresses[i % len(self.sensor_addresses)]
+                dev.memory[self.FIRST_SENSOR_ROW] = sender + bytes((5, 3, 1, 0))
+            self.devices[address] = dev
+            address += size
+        self._device_list:list[SimulatedBusDevice] = list(self.devices.values())
+
+
+    def _get_device(self, address:int) -> SimulatedBusDevice:
+        if address == self.FAM14_ADDRESS:
+            return self.fam14
+        return self.devices.get(address, None)
+
+
+    def _schedule(self, message:ESP2Message, now:float) -> None:
+        self._bus_free_at = max(self._bus_free_at, now) + self.latency
+        heapq.heappush(self._scheduled, (self._bus_free_at, self._seq, message.serialize()))
+        self._seq += 1
+
+
+    def handle_request(self, message:ESP2Message) -> list[ESP2Message]:
+        """Returns the response telegrams of the FAM14 or the addressed bus device."""
+        msg = prettify(message)
+        fam_reply = self.fam14.get_discovery_reply()
+
+        if isinstance(msg, EltakoBusLock):
+            self.is_locked = True
+            return [fam_reply]
+        if isinstance(msg, EltakoBusUnlock):
+            self.is_locked = False
+            return [fam_reply]
+        if isinstance(msg, EltakoDiscoveryRequest):
+            dev = self._get_device(msg.address)
+            return [dev.get_discovery_reply() if dev else EltakoTimeout()]
+        if isinstance(msg, EltakoMemoryRequest):
+            dev = self._get_device(msg.address)
+            if dev is None or msg.row >= len(dev.memory):
+                return [EltakoTimeout()]
+            return [EltakoMemoryResponse(msg.row, dev.memory[msg.row])]
+        if isinstance(msg, EltakoMessage) and msg.is_request:
+            # select device for writing
+            if msg.org == 0xf2:
+                self._selected_device = self._get_device(msg.address)
+                if self._selected_device is None:
+                    return [EltakoTimeout()]
+                return [EltakoMessage(0xf2, msg.address, is_request=False)]
+            # write memory row of selected device
+            if msg.org == 0xf4:
+                dev = self._selected_device
+                if dev is None or msg.address >= len(dev.memory):
+                    return [EltakoTimeout()]
+                dev.memory[msg.address] = bytes(msg.payload)
+                return [EltakoMessage(0xf4, msg.address, is_request=False)]
+
+        # base id and version request of USB gateways
+        if message.body[:2] == b'\xab\x58':
+            return [ESP2Message(b'\x8b\x98' + AddressExpression.parse(self.base_id)[0] + b'\x00\x00\x00\x00\x00')]
+        if message.body[:2] == b'\xab\x4b':
+            return [ESP2Message(b'\x8b\x8c\x02\x07\x01\x00\x01\x00\x00\x00\x00')]
+        return []
+
+
+    def _create_telegram(self) -> ESP2Message:
+        """Returns a status telegram of a random bus device or sensor."""
+        i = self._random.randrange(len(self.devices) + len(self.sensor_addresses))
+        if i < len(self.devices):
+            dev = self._device_list[i]
+            channel = self._random.randrange(dev.size)
+            address = bytes((0, 0, 0, dev.address + channel))
+            if dev.model[1] == 0x04:
+                # dimmer value
+                return EltakoWrapped4BS(address, 0x00, bytes((0x02, self._random.randrange(101), 0x00, 0x09)))
+            return EltakoWrappedRPS(address, 0x30, bytes((self._random.choice((0x50, 0x70)),)))
+
+        address = self.sensor_addresses[i - len(self.devices)]
+        if i % 2 == 0:
+            return RPSMessage(address, 0x30, bytes((self._random.choice((0x10, 0x30, 0x50, 0x70)),)))
+        # temperature sensor A5-02-05
+        return Regular4BSMessage(address, 0x00, bytes((0x00, 0x00, self._random.randrange(256), 0x08)))
+
+
+    def receive(self, data:bytes, now:float=None) -> bytes:
+        """Processes data written to the bus. Returns data which is immediately visible (echo)."""
+        now = time.time() if now is None else now
+        frame_start = data.find(b'\xa5\x5a')
+        while 0 <= frame_start and frame_start + 14 <= len(data):
+            try:
+                message = ESP2Message.parse(data[frame_start:frame_start+14])
+            except ParseError:
+                frame_start = data.find(b'\xa5\x5a', frame_start+1)
+                continue
+            for response in self.handle_request(message):
+                self._schedule(response, now)
+                self.answered_requests += 1
+            frame_start = data.find(b'\xa5\x5a', frame_start+14)
+
+        return data if self.echo else b''
+
+
+    def get_due_data(self, now:float=None) -> bytes:
+        """Returns all responses and synthetic telegrams which are due at the given time."""
+        now = time.time() if now is None else now
+
+        if self.rate > 0 and not self.is_locked:
+            if self._last_emit is None:
+                self._last_emit = now
+            count = int((now - self._last_emit) * self.rate)
+            if count > 0:
+                self._last_emit += count / self.rate
+                for _ in range(count):
+                    heapq.heappush(self._scheduled, (now, self._seq, self._create_telegram().serialize()))
+                    self._seq += 1
+                self.emitted_telegrams += count
+        else:
+            self._last_emit = None
+
+        result = b''
+        while len(self._scheduled) > 0 and self._scheduled[0][0] <= now:
+            result += heapq.heappop(self._scheduled)[2]
+        return result
+
+
+    @classmethod
+    def from_url(cls, url:str) -> 'Fam14Simulator':
+        """Creates simulator from url like fam14sim://?devices=20&sensors=50&rate=100&latency=0.01"""
+        params = {k: v[-1] for k, v in parse_qs(urlparse(url).query).items()}
+        try:
+            return cls(device_count=int(params.get('devices', 10)),
+                       sensor_count=int(params.get('sensors', 10)),
+                       rate=float(params.get('rate', 0)),
+                       latency=float(params.get('latency', 0.01)),
+                       base_id=params.get('base_id', 'FF-AA-80-00'),
+                       echo=params.get('echo', '1') not in ['0', 'false'],
+                       seed=int(params['seed']) if 'seed' in params else None)
+        except ValueError as e:
+            raise SerialException(f"Invalid simulator url '{url}': {e}")
+
+
+class Fam14SimulatorSerial(SerialBase):
+    """pyserial port for urls starting with fam14sim:// so that RS485SerialInterfaceV2 can talk to a Fam14Simulator."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        self.simulator:Fam14Simulator = None
+        self._rx_buffer = bytearray()
+        self._lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def open(self) -> None:
+        if self.is_open:
+            raise SerialException("Port is already open.")
+        self.simulator = Fam14Simulator.from_url(self.portstr)
+        self._rx_buffer = bytearray()
+        self.is_open = True
+
+    def close(self) -> None:
+        self.is_open = False
+
+    def _reconfigure_port(self) -> None:
+        pass
+
+    def _poll(self) -> None:
+        self._rx_buffer += self.simulator.get_due_data()
+
+    @property
+    def in_waiting(self) -> int:
+        if not self.is_open:
+            raise PortNotOpenError()
+        with self._lock:
+            self._poll()
+            return len(self._rx_buffer)
+
+    def read(self, size:int=1) -> bytes:
+        if not self.is_open:
+            raise PortNotOpenError()
+        deadline = None if self._timeout is None else time.time() + self._timeout
+        while True:
+            with self._lock:
+                self._poll()
+                if len(self._rx_buffer) >= size or (deadline is not None and time.time() >= deadline):
+                    data = bytes(self._rx_buffer[:size])
+                    del self._rx_buffer[:size]
+                    return data
+            time.sleep(0.0005)
+
+    def write(self, data:bytes) -> int:
+        if not self.is_open:
+            raise PortNotOpenError()
+        with self._lock:
+            self._rx_buffer += self.simulator.receive(bytes(data))
+        return len(data)
+
+    def reset_input_buffer(self) -> None:
+        with self._lock:
+            self._rx_buffer = bytearray()
+
+    def reset_output_buffer(self) -> None:
+        pass
+
+
+# make fam14sim:// urls known to serial.serial_for_url() (see protocol_fam14sim)
+if 'eo_man.controller' not in serial.protocol_handler_packages:
+    serial.protocol_handler_packages.append('eo_man.controller')
@@ -0,0 +1,2 @@
+# pyserial url handler for fam14sim:// urls, e.g. fam14sim://?devices=20&sensors=50&rate=100&latency=0.01
+from .gateway_simulator import Fam14SimulatorSerial as Serial
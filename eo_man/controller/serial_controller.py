@@ -25,6 +25,8 @@ from ..data import data_helper
 from ..data.const import GatewayDeviceType as GDT, GATEWAY_DISPLAY_NAMES as GDN
 
 from .gateway_registry import GatewayRegistry
+# registers fam14sim:// urls for simulated FAM14 bus
+from . import gateway_simulator
 
 from .app_bus import AppBusEventType, AppBus
 
@@ -40,6 +42,8 @@ class SerialController():
         self.current_base_id:str = None
         self.current_device_type:GatewayDeviceType = None
         self.gateway_id:str = None
+        # set while recorded telegrams are fed in by the replay engine
+        self.is_replaying:bool = False
 
         self.gw_registry:GatewayRegistry = gw_registry
         
@@ -76,7 +80,8 @@ class SerialController():
             # log received message
             self.app_bus.fire_event(AppBusEventType.SERIAL_CALLBACK, {'msg': message, 
                                                                     'base_id': self.current_base_id,
-                                                                    'gateway_id': self.gateway_id})
+                                                                    'gateway_id': self.gateway_id,
+                                                                    'replay': self.is_replaying})
             
         except Exception as e:
             logging.exception(e)
@@ -0,0 +1,129 @@
+import threading
+import time
+from datetime import datetime
+
+from eltakobus.message import ESP2Message, prettify
+
+from .. import LOGGER
+from ..data.telegram_journal import TelegramJournal
+
+from .app_bus import AppBus, AppBusEventType
+from .app_bus_profiler import AppBusProfiler, HandlerProfile
+from .serial_controller import SerialController
+
+
+class TelegramReplayReport():
+    """Throughput and latencies of one replay run"""
+
+    def __init__(self, speed:float) -> None:
+        self.speed:float = speed
+        self.telegram_count:int = 0
+        self.feed_duration:float = 0.0      # time until all telegrams were passed to the serial controller
+        self.total_duration:float = 0.0     # time until all events were processed
+        self.ingest:HandlerProfile = HandlerProfile(SerialController._received_serial_event.__qualname__)
+        self.handler_profiles:dict[tuple:HandlerProfile] = {}
+        self.stopped:bool = False
+
+    @property
+    def throughput(self) -> float:
+        """processed telegrams per second"""
+        if self.total_duration <= 0:
+            return 0.0
+        return self.telegram_count / self.total_duration
+
+    def __str__(self) -> str:
+        speed = 'max' if not self.speed else f"{self.speed:g}x"
+        lines = [f"Replayed {self.telegram_count} telegrams (speed: {speed}{', stopped' if self.stopped else ''}) "
+                 f"in {self.total_duration:.3f}s => {self.throughput:.1f} telegrams/s"]
+        stages = [('INGEST', self.ingest)] + [(event.name, p) for (event, _), p in self.handler_profiles.items()]
+        for stage, p in stages:
+            lines.append(f"  {stage:<30} {p.handler_name:<55} calls: {p.call_count:>7}, avg: {p.avg_time*1000:.3f}ms, "
+                         f"max: {p.max_time*1000:.3f}ms, avg wait: {p.avg_queue_wait*1000:.3f}ms")
+        return '\n'.join(lines)
+
+
+class TelegramReplayEngine():
+    """Feeds recorded telegrams of a journal into the serial controller as if they were received from a gateway.
+    Speed 1 replays in original timing, N replays N times faster and 0 replays as fast as possible."""
+
+    def __init__(self, app_bus:AppBus, serial_controller:SerialController, journal:TelegramJournal) -> None:
+        self.app_bus = app_bus
+        self.serial_controller = serial_controller
+        self.journal = journal
+        self._stop_flag = threading.Event()
+        self._thread:threading.Thread = None
+
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+
+    def stop(self) -> None:
+        self._stop_flag.set()
+
+
+    def start(self, speed:float=1.0, start:datetime=None, end:datetime=None) -> None:
+        """Replays in a background thread and writes the report into the log view."""
+        def run():
+            try:
+                report = self.run(speed, start, end)
+                self.app_bus.fire_event(AppBusEventType.LOG_MESSAGE, {'msg': str(report), 'log-level': 'INFO'})
+            except Exception as e:
+                msg = f"Replay of telegram journal '{self.journal.filename}' failed!"
+                self.app_bus.fire_event(AppBusEventType.LOG_MESSAGE, {'msg': msg, 'log-level': 'ERROR', 'color': 'red'})
+                LOGGER.exception(msg, exc_info=True)
+
+        self._thread = threading.Thread(target=run, name='TelegramReplay', daemon=True)
+        self._thread.start()
+
+
+    def run(self, speed:float=1.0, start:datetime=None, end:datetime=None, drain_timeout:float=60) -> TelegramReplayReport:
+        if self.serial_controller.is_serial_connection_active():
+            raise Exception("Telegrams cannot be replayed while a gateway is connected.")
+
+        report = TelegramReplayReport(speed)
+        self._stop_flag.clear()
+
+        sc = self.serial_controller
+        previous_ids = (sc.current_base_id, sc.gateway_id)
+        sc.is_replaying = True
+        # measure all event handlers during replay with a separate profiler
+        profiler = AppBusProfiler()
+        try:
+            with self.app_bus.use_profiler(profiler):
+                first_timestamp = None
+                started_at = time.perf_counter()
+                for rm in self.journal.read(start, end):
+                    if first_timestamp is None:
+                        first_timestamp = rm.received_timestamp
+                    if speed:
+                        wait = (rm.received_timestamp - first_timestamp) / speed - (time.perf_counter() - started_at)
+                        if wait > 0:
+                            self._stop_flag.wait(wait)
+                    if self._stop_flag.is_set():
+                        report.stopped = True
+                        break
+
+                    message = prettify(ESP2Message.parse(rm.raw_message))
+                    sc.current_base_id = TelegramJournal.derive_base_id(message, rm.external_device_id)
+                    sc.gateway_id = rm.received_via_gateway_id
+
+                    t = time.perf_counter()
+                    sc._received_serial_event(message)
+                    report.ingest.record(time.perf_counter() - t, 0.0)
+                    report.telegram_count += 1
+
+                report.feed_duration = time.perf_counter() - started_at
+
+                # wait until the main thread processed all queued events
+                deadline = time.perf_counter() + drain_timeout
+                self.app_bus.wait_for_queued_events(timeout=drain_timeout)
+                self.app_bus.wait_for_async_handlers(timeout=max(0, deadline - time.perf_counter()))
+                report.total_duration = time.perf_counter() - started_at
+
+        finally:
+            sc.is_replaying = False
+            sc.current_base_id, sc.gateway_id = previous_ids
+
+        report.handler_profiles = profiler.get_profiles()
+        return report
@@ -1,10 +1,11 @@
 from typing import Final
-import yaml
 
 from .device import Device
 from .filter import DataFilter
 from .recorded_message import RecordedMessage
+from . import yaml_schema
 
+import os
 import pickle
 
 class ApplicationData():
@@ -105,7 +106,7 @@ class ApplicationData():
             file_content = file.read()
             for k,v in cls.translations.items():
                 file_content.replace(k,v)
-            app_data = yaml.load(file_content, Loader=yaml.Loader)
+            app_data = yaml_schema.load(file_content)
         cls._migrate(app_data)
         
         return app_data
@@ -126,5 +127,11 @@ class ApplicationData():
 
     @classmethod
     def write_to_yaml_file(cls, filename:str, application_data):
-        with open(filename, 'w') as file:
-            yaml.dump(application_data, file)
\ No newline at end of file
+        # file is only replaced if it was written completely
+        temp_filename = filename + '.tmp'
+        with open(temp_filename, 'w') as file:
+            yaml_schema.dump(application_data, file)
+        os.replace(temp_filename, filename)
+
+
+yaml_schema.register_class(ApplicationData)
\ No newline at end of file
@@ -0,0 +1,272 @@
+import os
+import json
+import sqlite3
+import threading
+from enum import Enum
+
+from homeassistant.const import Platform
+from eltakobus.device import SensorInfo
+
+from .application_data import ApplicationData
+from .device import Device
+from .filter import DataFilter
+from .message_history import MessageHistoryEntry
+from .recorded_message import RecordedMessage
+
+
+# only these classes are restored from a file, referenced by name so that the file does not depend on module paths
+_TYPE_KEY:str = '__type__'
+_STORED_CLASSES:dict[str:type] = {cls.__name__: cls for cls in [Device, SensorInfo, DataFilter, MessageHistoryEntry]}
+_STORED_ENUMS:dict[str:type] = {cls.__name__: cls for cls in [Platform]}
+
+
+def _encode(obj):
+    """Converts an entry into data which can be stored as json."""
+    t = type(obj)
+    if obj is None or t in (str, int, float, bool):
+        return obj
+    if t is list:
+        return [_encode(v) for v in obj]
+    if t is dict:
+        if _TYPE_KEY not in obj and all(type(k) is str for k in obj):
+            return {k: _encode(v) for k, v in obj.items()}
+        return {_TYPE_KEY: 'dict', 'items': [[_encode(k), _encode(v)] for k, v in obj.items()]}
+    if t is tuple:
+        return {_TYPE_KEY: 'tuple', 'items': [_encode(v) for v in obj]}
+    if t is bytes:
+        return {_TYPE_KEY: 'bytes', 'hex': obj.hex()}
+    if isinstance(obj, Enum) and _STORED_ENUMS.get(t.__name__, None) is t:
+        return {_TYPE_KEY: t.__name__, 'value': obj.value}
+    if _STORED_CLASSES.get(t.__name__, None) is t:
+        # custom __getstate__ e.g. of DataFilter defines what is stored
+        state = obj.__getstate__() if hasattr(t, '__getstate__') and t.__getstate__ is not object.__getstate__ else obj.__dict__
+        return {_TYPE_KEY: t.__name__, 'state': _encode(state)}
+    raise TypeError(f"Objects of type '{t.__name__}' cannot be stored in application data files.")
+
+
+def _decode_object(data:dict):
+    type_name = data.get(_TYPE_KEY, None)
+    if type_name is None:
+        return data
+    if type_name == 'dict':
+        return {k: v for k, v in data['items']}
+    if type_name == 'tuple':
+        return tuple(data['items'])
+    if type_name == 'bytes':
+        return bytes.fromhex(data['hex'])
+    if type_name in _STORED_ENUMS:
+        return _STORED_ENUMS[type_name](data['value'])
+    if type_name in _STORED_CLASSES:
+        cls = _STORED_CLASSES[type_name]
+        obj = cls.__new__(cls)
+        if hasattr(obj, '__setstate__'):
+            obj.__setstate__(data['state'])
+        else:
+            obj.__dict__.update(data['state'])
+        return obj
+    raise ValueError(f"Unknown type '{type_name}' in application data file.")
+
+
+def _dumps(obj) -> str:
+    return json.dumps(_encode(obj), separators=(',', ':'))
+
+
+def _loads(data:str):
+    return json.loads(data, object_hook=_decode_object)
+
+
+class ApplicationDataStore():
+    """Application data file (.eodm) as SQLite database with one table per section.
+
+    Devices and data filters are stored as one row per entry (json) so that saving only writes the entries which
+    have changed since the file was loaded or saved by this store. Recorded messages are only appended.
+    Files in the previous YAML format are still read via ApplicationData.read_from_yaml_file.
+    """
+
+    SQLITE_HEADER:bytes = b'SQLite format 3\x00'
+    SCHEMA_VERSION:int = 2
+
+    SCHEMA:list[str] = [
+        "CREATE TABLE IF NOT EXISTS info (key TEXT PRIMARY KEY, value TEXT)",
+        "CREATE TABLE IF NOT EXISTS devices (external_id TEXT PRIMARY KEY, position INTEGER, data TEXT)",
+        "CREATE TABLE IF NOT EXISTS data_filters (name TEXT PRIMARY KEY, position INTEGER, data TEXT)",
+        "CREATE TABLE IF NOT EXISTS recorded_messages (seq INTEGER PRIMARY KEY, received REAL, external_id TEXT, gateway_id TEXT, raw_message BLOB)",
+    ]
+
+    def __init__(self, filename:str) -> None:
+        self.filename:str = filename
+        self._lock = threading.Lock()
+        # content of the file as it was read or written last: key => (position, serialized entry)
+        self._saved_devices:dict[str:tuple] = None
+        self._saved_data_filters:dict[str:tuple] = None
+        self._saved_info:dict[str:bytes] = None
+        # latest recorded message in the file and number of recorded messages in the file
+        self._last_saved_message:RecordedMessage = None
+        self._saved_message_count:int = 0
+
+
+    @classmethod
+    def is_store_file(cls, filename:str) -> bool:
+        if not os.path.isfile(filename):
+            return False
+        with open(filename, 'rb') as f:
+            return f.read(len(cls.SQLITE_HEADER)) == cls.SQLITE_HEADER
+
+
+    def read(self) -> ApplicationData:
+        with self._lock:
+            con = sqlite3.connect(self.filename)
+            try:
+                info = {k: v for k, v in con.execute("SELECT key, value FROM info")}
+                schema_version = _loads(info['schema_version']) if 'schema_version' in info else None
+                if schema_version is None or schema_version > self.SCHEMA_VERSION:
+                    raise ValueError(f"Application data file '{self.filename}' has an unsupported format version ({schema_version}).")
+
+                app_data = ApplicationData(version=_loads(info['application_version']),
+                                           selected_data_filter=_loads(info['selected_data_filter_name']),
+                                           data_filters={}, devices={}, recoreded_messages=[])
+                app_data.send_message_template_list = _loads(info['send_message_template_list'])
+
+                saved_devices = {}
+                for external_id, position, data in con.execute("SELECT external_id, position, data FROM devices ORDER BY position"):
+                    app_data.devices[external_id] = _loads(data)
+                    saved_devices[external_id] = (position, data)
+
+                saved_data_filters = {}
+                for name, position, data in con.execute("SELECT name, position, data FROM data_filters ORDER BY position"):
+                    app_data.data_filters[name] = _loads(data)
+                    saved_data_filters[name] = (position, data)
+
+                for received, external_id, gateway_id, raw_message in con.execute("SELECT received, external_id, gateway_id, raw_message FROM recorded_messages ORDER BY seq"):
+                    rm = RecordedMessage.__new__(RecordedMessage)
+                    rm.__setstate__({'raw_message': raw_message, 'external_device_id': external_id, 'received_via_gateway_id': gateway_id, 'received': received})
+                    app_data.recoreded_messages.append(rm)
+            finally:
+                con.close()
+
+            last_message = app_data.recoreded_messages[-1] if len(app_data.recoreded_messages) > 0 else None
+            self._set_memo((info, saved_devices, saved_data_filters, last_message, len(app_data.recoreded_messages)))
+
+        ApplicationData._migrate(app_data)
+        return app_data
+
+
+    @classmethod
+    def encode(cls, app_data:ApplicationData) -> dict:
+        """Serializes all entries so that they can be written by another thread while the application data keeps changing."""
+        return {
+            'info': {
+                'schema_version': _dumps(cls.SCHEMA_VERSION),
+                'application_version': _dumps(app_data.application_version),
+                'selected_data_filter_name': _dumps(app_data.selected_data_filter_name),
+                'send_message_template_list': _dumps(app_data.send_message_template_list),
+            },
+            'devices': {k: _dumps(d) for k, d in app_data.devices.items()},
+            'data_filters': {k: _dumps(f) for k, f in app_data.data_filters.items()},
+            # recorded messages are not changed after they were received
+            'recorded_messages': list(app_data.recoreded_messages),
+        }
+
+
+    def write(self, app_data:ApplicationData) -> None:
+        """Writes only changes compared to the last read or write. Unknown files are written completely and replace the existing file."""
+        self.write_encoded(self.encode(app_data))
+
+
+    def write_encoded(self, encoded_data:dict) -> None:
+        """Writes application data which was serialized with encode()."""
+        with self._lock:
+            if self._saved_devices is None or not self.is_store_file(self.filename):
+                self._write_new_file(encoded_data)
+                return
+
+            con = sqlite3.connect(self.filename)
+            try:
+                with con:
+                    memo = self._write_changes(con, encoded_data, self._get_memo())
+            finally:
+                con.close()
+            self._set_memo(memo)
+
+
+    def _write_new_file(self, encoded_data:dict) -> None:
+        # file is only replaced if it was written completely
+        temp_filename = self.filename + '.tmp'
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+
+        con = sqlite3.connect(temp_filename)
+        try:
+            with con:
+                for statement in self.SCHEMA:
+                    con.execute(statement)
+                memo = self._write_changes(con, encoded_data, ({}, {}, {}, None, 0))
+        finally:
+            con.close()
+
+        os.replace(temp_filename, self.filename)
+        self._set_memo(memo)
+
+
+    def _get_memo(self) -> tuple:
+        return self._saved_info, self._saved_devices, self._saved_data_filters, self._last_saved_message, self._saved_message_count
+
+
+    def _set_memo(self, memo:tuple) -> None:
+        self._saved_info, self._saved_devices, self._saved_data_filters, self._last_saved_message, self._saved_message_count = memo
+
+
+    @classmethod
+    def _write_changes(cls, con:sqlite3.Connection, encoded_data:dict, memo:tuple) -> tuple:
+        """Writes all entries which differ from the memo (content of the file) and returns the new memo."""
+        saved_info, saved_devices, saved_data_filters, last_saved_message, saved_message_count = memo
+
+        info = encoded_data['info']
+        con.executemany("INSERT OR REPLACE INTO info (key, value) VALUES (?, ?)",
+                        [(k, v) for k, v in info.items() if saved_info.get(k, None) != v])
+
+        devices = cls._write_rows(con, 'devices', 'external_id', encoded_data['devices'], saved_devices)
+        data_filters = cls._write_rows(con, 'data_filters', 'name', encoded_data['data_filters'], saved_data_filters)
+        last_message, message_count = cls._write_recorded_messages(con, encoded_data['recorded_messages'], last_saved_message, saved_message_count)
+
+        return info, devices, data_filters, last_message, message_count
+
+
+    @classmethod
+    def _write_rows(cls, con:sqlite3.Connection, table:str, key_column:str, entries:dict[str:str], saved_entries:dict[str:tuple]) -> dict[str:tuple]:
+        rows = {}
+        changed_rows = []
+        for position, (key, data) in enumerate(entries.items()):
+            row = (position, data)
+            rows[key] = row
+            if saved_entries.get(key, None) != row:
+                changed_rows.append((key, *row))
+
+        con.executemany(f"INSERT OR REPLACE INTO {table} ({key_column}, position, data) VALUES (?, ?, ?)", changed_rows)
+        con.executemany(f"DELETE FROM {table} WHERE {key_column} = ?", [(key,) for key in saved_entries if key not in rows])
+        return rows
+
+
+    @classmethod
+    def _write_recorded_messages(cls, con:sqlite3.Connection, messages:list[RecordedMessage], last_saved_message:RecordedMessage, saved_message_count:int) -> tuple:
+        # find already stored messages, recorded messages are only appended or removed at the beginning
+        new_messages_start = None
+        if last_saved_message is not None:
+            for i in range(len(messages)-1, -1, -1):
+                if messages[i] is last_saved_message:
+                    new_messages_start = i+1
+                    break
+        elif saved_message_count == 0:
+            new_messages_start = 0
+
+        if new_messages_start is None:
+            con.execute("DELETE FROM recorded_messages")
+            new_messages_start = 0
+
+        con.executemany("INSERT INTO recorded_messages (received, external_id, gateway_id, raw_message) VALUES (?, ?, ?, ?)",
+                        [(m.received_timestamp, m.external_device_id, m.received_via_gateway_id, m.raw_message) for m in messages[new_messages_start:]])
+
+        # remove messages which are not recorded anymore
+        con.execute("DELETE FROM recorded_messages WHERE seq <= (SELECT seq FROM recorded_messages ORDER BY seq DESC LIMIT 1 OFFSET ?)", (len(messages),))
+
+        return (messages[-1] if len(messages) > 0 else None), len(messages)
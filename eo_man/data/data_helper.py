@@ -1,5 +1,7 @@
 
 import os
+import functools
+from types import MappingProxyType
 from termcolor import colored
 
 from .const import *
@@ -153,25 +155,60 @@ MDNS_SERVICE_2_GW_TYPE_MAPPING = {
 
 SENSOR_MESSAGE_TYPES = [EltakoWrappedRPS, EltakoWrapped4BS, RPSMessage, Regular4BSMessage, Regular1BSMessage, EltakoMessage]
 
+# normalized eep name => eep class, built on first use
+_eep_registry:dict[str:EEP] = None
+# eep names as passed by callers => eep class (or None)
+_eep_lookup:dict[str:EEP] = {}
+_eep_names:list[str] = None
+
+def _normalize_eep_name(eep_name:str) -> str:
+    return eep_name.replace('_', '-').upper()
+
+def invalidate_eep_registry():
+    """Needs to be called when new EEP classes are defined after the registry was built."""
+    global _eep_registry, _eep_names
+    _eep_registry = None
+    _eep_names = None
+    _eep_lookup.clear()
+
+def _get_eep_registry() -> dict[str:EEP]:
+    global _eep_registry
+    if _eep_registry is None:
+        registry = {}
+        # same order as a walk through the class tree so that the first match wins
+        for child in EEP.__subclasses__():
+            registry.setdefault(_normalize_eep_name(child.__name__), child)
+            for sub_child in child.__subclasses__():
+                eep_string = getattr(sub_child, 'eep_string', None)
+                if eep_string is not None:
+                    registry.setdefault(_normalize_eep_name(eep_string), sub_child)
+        _eep_registry = registry
+    return _eep_registry
+
 def get_all_eep_names():
-    subclasses = set()
-    work = [EEP]
-    while work:
-        parent = work.pop()
-        for child in parent.__subclasses__():
-            if child not in subclasses:
-                subclasses.add(child)
-                work.append(child)
-    return sorted(set([s.__name__.replace('_', '-').upper() for s in subclasses if len(s.__name__) == 8 and s.__name__.count('_') == 2]))
+    global _eep_names
+    if _eep_names is None:
+        subclasses = set()
+        work = [EEP]
+        while work:
+            parent = work.pop()
+            for child in parent.__subclasses__():
+                if child not in subclasses:
+                    subclasses.add(child)
+                    work.append(child)
+        _eep_names = sorted(set([s.__name__.replace('_', '-').upper() for s in subclasses if len(s.__name__) == 8 and s.__name__.count('_') == 2]))
+    return list(_eep_names)
 
 def find_eep_by_name(eep_name:str) -> EEP:
-    for child in EEP.__subclasses__():
-        if child.__name__.replace('_', '-').upper() == eep_name.replace('_', '-').upper():
-            return child
-        for sub_child in child.__subclasses__():
-            if sub_child.eep_string.replace('_', '-').upper() == eep_name.replace('_', '-').upper():
-                return sub_child
-    return None
+    if eep_name is None:
+        return None
+    try:
+        return _eep_lookup[eep_name]
+    except KeyError:
+        pass
+    eep = _get_eep_registry().get(_normalize_eep_name(eep_name), None)
+    _eep_lookup[eep_name] = eep
+    return eep
 
 def get_values_for_eep(eep:EEP, message:EltakoMessage) -> list[str]:
     properties_as_str = []
@@ -187,6 +224,7 @@ def a2s(address:int, length:int=4):
     
     return b2s( address.to_bytes(length, byteorder = 'big') )
 
+@functools.lru_cache(maxsize=1024)
 def build_unique_name_for_device_type(device_type:str)->str:
     dev_type = device_type.replace('-', '_').upper()
     #remove unimportant parts
@@ -197,29 +235,35 @@ def build_unique_name_for_device_type(device_type:str)->str:
 
     return dev_type
 
-def find_device_info_by_device_type(device_type:str, eep:str=None) -> dict:
+def _build_eep_mapping_indexes() -> tuple[MappingProxyType]:
+    """Builds lookup tables for EEP_MAPPING. Only the first matching entry is kept for each key."""
+    by_hw_type = {}
+    by_hw_type_and_eep = {}
+    by_eep = {}
+    descriptions = set()
     for i in EEP_MAPPING:
         hw_type = str(i['hw-type']).replace('-', '_').upper()
-        dev_type = build_unique_name_for_device_type(device_type)
+        by_hw_type.setdefault(hw_type, i)
+        by_hw_type_and_eep.setdefault((hw_type, i.get(CONF_EEP, None)), i)
+        if CONF_EEP in i:
+            by_eep.setdefault(i[CONF_EEP], i)
+        if 'description' in i:
+            descriptions.add(i['description'])
+    return MappingProxyType(by_hw_type), MappingProxyType(by_hw_type_and_eep), MappingProxyType(by_eep), frozenset(descriptions)
 
-        if hw_type == dev_type:
-            if eep is None:
-                return i
-            elif i[CONF_EEP] == eep:
-                return i
-    return {}
+_EEP_MAPPING_BY_HW_TYPE, _EEP_MAPPING_BY_HW_TYPE_AND_EEP, _EEP_MAPPING_BY_EEP, _EEP_MAPPING_DESCRIPTIONS = _build_eep_mapping_indexes()
+
+def find_device_info_by_device_type(device_type:str, eep:str=None) -> dict:
+    dev_type = build_unique_name_for_device_type(device_type)
+    if eep is None:
+        return _EEP_MAPPING_BY_HW_TYPE.get(dev_type, {})
+    return _EEP_MAPPING_BY_HW_TYPE_AND_EEP.get((dev_type, eep), {})
 
 def find_device_info_by_eep(eep:str) -> dict:
-    for i in EEP_MAPPING:
-        if CONF_EEP in i and i[CONF_EEP] == eep:
-            return i
-    return {}
+    return _EEP_MAPPING_BY_EEP.get(eep, {})
 
 def is_device_description(description:str) -> bool:
-    for i in EEP_MAPPING:
-        if 'description' in i and i['description'] == description:
-            return True
-    return False
+    return description in _EEP_MAPPING_DESCRIPTIONS
 
 def get_known_device_types() -> list:
     return sorted(list(set([t['hw-type'] for t in EEP_MAPPING])))
@@ -238,6 +282,7 @@ def get_name_from_key_function_name(kf: KeyFunction) -> str:
         return substr
     return ""
 
+@functools.lru_cache(maxsize=4096)
 def a2i(address:str) -> int:
     return int.from_bytes(AddressExpression.parse(address)[0], 'big')
 
@@ -259,9 +304,7 @@ class BusObjectHelper():
         return None
     
 def add_addresses(adr1:str, adr2:str) -> str:
-    _adr1 = int.from_bytes( AddressExpression.parse(adr1)[0], 'big')
-    _adr2 = int.from_bytes( AddressExpression.parse(adr2)[0], 'big')
-    return a2s(_adr1 + _adr2)
+    return a2s(a2i(adr1) + a2i(adr2))
     
 def print_memory_entires(sensors: list[SensorInfo]) -> None:
     for _s in sensors:
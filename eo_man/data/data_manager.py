@@ -1,13 +1,25 @@
+import os
+import copy
+import threading
+from datetime import datetime
+
 from ..controller.app_bus import AppBus, AppBusEventType
 from . import data_helper 
 from .device import Device 
 from .application_data import ApplicationData
-from .filter import DataFilter
+from .application_data_store import ApplicationDataStore
+from .filter import DataFilter, DeviceSearchIndex
 from .const import *
 from .app_info import ApplicationInfo as AppInfo
 from .recorded_message import RecordedMessage
+from .recorded_message_store import RecordedMessageStore
+from .telegram_journal import TelegramJournal
+from .telegram_decoder import TelegramDecoder
+from .device_dict import DeviceDict
 from .message_history import MessageHistoryEntry
 
+from .. import LOGGER
+
 from eltakobus.util import AddressExpression, b2s
 from eltakobus.eep import EEP
 from eltakobus.message import *
@@ -24,35 +36,124 @@ class DataManager():
         self.app_bus.add_event_handler(AppBusEventType.REMOVED_DATA_TABLE_FILTER, self.remove_current_data_filter_handler)
         self.app_bus.add_event_handler(AppBusEventType.ASYNC_TRANSCEIVER_DETECTED, self._async_transceiver_detected)
         self.app_bus.add_event_handler(AppBusEventType.SEND_MESSAGE_TEMPLATE_LIST_UPDATED, self.on_update_send_message_template_list)
+        self.app_bus.add_event_handler(AppBusEventType.WINDOW_CLOSED, self._on_window_closed)
+        # registered before the views so that they filter on the updated search documents
+        self.app_bus.add_event_handler(AppBusEventType.UPDATE_DEVICE_REPRESENTATION, self.device_search_index_invalidate_handler)
+        self.app_bus.add_event_handler(AppBusEventType.UPDATE_SENSOR_REPRESENTATION, self.device_search_index_invalidate_handler)
+        self.app_bus.add_event_handler(AppBusEventType.UPDATE_DEVICES_REPRESENTATION, self.devices_search_index_invalidate_handler)
 
         # devices
-        self.devices:dict[str:Device] = {}
+        self.devices:DeviceDict = DeviceDict()
+        # base id => base id as int
+        self._base_id_ints:dict[str:int] = {}
+        # external id => decoder for the eep of the device
+        self._telegram_decoders:dict[str:TelegramDecoder] = {}
+        # sensor id of memory entries => (device, memory entry), built on demand
+        self._sensor_index:dict[str:list[tuple]] = None
+        self._sensor_index_key:tuple = None
 
         # filter
         self.data_fitlers:dict[str:DataFilter] = {}
         self.selected_data_filter_name:DataFilter = None
+        # cached search documents of devices which are evaluated by filters
+        self.device_search_index:DeviceSearchIndex = DeviceSearchIndex()
 
         # recorded messages
-        self.recoreded_messages:list[RecordedMessage] = []
+        self.recoreded_messages:RecordedMessageStore = RecordedMessageStore()
+        # durable history of all received telegrams next to the application data file
+        self.telegram_journal:TelegramJournal = None
+        # application data file which was loaded or saved last, used to only write changes
+        self.application_data_store:ApplicationDataStore = None
 
         # message history
         self.send_message_template_list:list[MessageHistoryEntry] = None
 
+        # changes of data which is not kept in devices, compared with the state of the last save (see is_dirty)
+        self._change_count:int = 0
+        self._saved_change_key:tuple = self._get_change_key()
+        self._is_loading:bool = False
+        # snapshot waiting for the save worker thread: (store or filename, application data, change key, callback)
+        self._pending_save:tuple = None
+        self._save_thread:threading.Thread = None
+        self._save_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._save_idle = threading.Event()
+        self._save_idle.set()
+
+
+    @property
+    def devices(self) -> DeviceDict:
+        return self._devices
+
+    @devices.setter
+    def devices(self, devices:dict[str:Device]) -> None:
+        self._devices = devices if isinstance(devices, DeviceDict) else DeviceDict(devices)
+
+
+    def _get_sensor_index(self) -> dict[str:list[tuple]]:
+        """Returns all memory entries of all devices by sensor id. Rebuilt when the devices have changed."""
+        key = (id(self.devices), self.devices.version)
+        if self._sensor_index is None or self._sensor_index_key != key:
+            index = {}
+            for d in list(self.devices.values()):
+                for m in d.memory_entries:
+                    index.setdefault(m.sensor_id_str, []).append((d, m))
+            self._sensor_index = index
+            self._sensor_index_key = key
+        return self._sensor_index
+
+
+    def _get_base_id_int(self, base_id:str) -> int:
+        base_int = self._base_id_ints.get(base_id, None)
+        if base_int is None:
+            base_int = data_helper.a2i(base_id)
+            self._base_id_ints[base_id] = base_int
+        return base_int
+
+
+    def _get_change_key(self) -> tuple:
+        return (id(self.devices), self.devices.version, self._change_count)
+
+
+    def _set_dirty(self) -> None:
+        self._change_count += 1
+
+
+    def is_dirty(self) -> bool:
+        """Returns True if the application data has changed since it was loaded or saved last."""
+        return not self._is_loading and self._get_change_key() != self._saved_change_key
+
 
     def set_current_data_filter_handler(self, filter:DataFilter):
-        if filter is not None:
-            self.selected_data_filter_name = filter.name
-        else:
-            self.selected_data_filter_name = None
+        name = filter.name if filter is not None else None
+        if self.selected_data_filter_name != name:
+            self.selected_data_filter_name = name
+            self._set_dirty()
 
 
     def remove_current_data_filter_handler(self, filter:DataFilter):
         if self.selected_data_filter_name is not None and self.selected_data_filter_name == filter.name:
             self.selected_data_filter_name = None
+            self._set_dirty()
+
+
+    def device_search_index_invalidate_handler(self, device:Device):
+        self.device_search_index.invalidate(device)
+
+
+    def devices_search_index_invalidate_handler(self, devices:list[Device]):
+        for d in devices:
+            self.device_search_index.invalidate(d)
+
+
+    def filter_device(self, filter:DataFilter, device:Device) -> bool:
+        """Evaluates the filter using the cached search document of the device."""
+        return filter.filter_device(device, self.device_search_index.get_document(device))
 
 
     def add_filter(self, filter:DataFilter) -> None:
         self.data_fitlers[filter.name] = filter
+        self._set_dirty()
 
         self.app_bus.fire_event(AppBusEventType.ADDED_DATA_TABLE_FILTER, filter)
 
@@ -60,12 +161,22 @@ class DataManager():
     def remove_filter(self, filter:DataFilter) -> None:
         if filter.name in self.data_fitlers.keys():
             del self.data_fitlers[filter.name]
+            self._set_dirty()
 
         self.app_bus.fire_event(AppBusEventType.REMOVED_DATA_TABLE_FILTER, filter)
 
 
+    def _on_window_closed(self, data):
+        # let a running save finish before the application exits
+        self.wait_for_pending_save()
+        if self.telegram_journal is not None:
+            self.telegram_journal.close()
+
+
     def _reset(self, data):
         self.devices = {}
+        self._telegram_decoders = {}
+        self.device_search_index.invalidate()
 
 
     def load_data_filters(self, filters:list[DataFilter]):
@@ -78,21 +189,100 @@ class DataManager():
         d_list =  [d.external_id for d in devices.values() if d.is_fam14()] 
         d_list += [d.external_id for d in devices.values() if not d.is_fam14()] 
         for key in d_list:
-            device:Device = devices[key]
-            self.devices[key] = device
-            if device.is_bus_device():
-                self.app_bus.fire_event(AppBusEventType.UPDATE_DEVICE_REPRESENTATION, device)
+            self.devices[key] = devices[key]
+        self.app_bus.fire_event(AppBusEventType.UPDATE_DEVICES_REPRESENTATION, [devices[key] for key in d_list])
+
+
+    def open_telegram_journal(self, app_data_filename:str) -> TelegramJournal:
+        """Opens the journal belonging to the application data file. The journal file is created with the first recorded telegram.
+        A damaged journal is renamed and replaced by a new one, None is returned if that is not possible."""
+        journal_filename = TelegramJournal.get_journal_filename(app_data_filename)
+        if self.telegram_journal is not None:
+            if os.path.abspath(self.telegram_journal.filename) == os.path.abspath(journal_filename):
+                return self.telegram_journal
+            self.telegram_journal.close()
+
+        try:
+            self.telegram_journal = TelegramJournal(journal_filename)
+        except Exception as e:
+            # the journal is a side file and must not prevent opening the application data
+            self.telegram_journal = self._replace_damaged_telegram_journal(journal_filename, e)
+        return self.telegram_journal
+
+
+    def _replace_damaged_telegram_journal(self, journal_filename:str, error:Exception) -> TelegramJournal:
+        backup_filename = f"{journal_filename}.{datetime.now().strftime('%Y%m%d-%H%M%S')}.damaged"
+        try:
+            os.replace(journal_filename, backup_filename)
+            journal = TelegramJournal(journal_filename)
+        except Exception:
+            LOGGER.exception(f"Telegram journal '{journal_filename}' cannot be opened, received telegrams are not journaled.")
+            return None
+
+        msg = f"Telegram journal '{journal_filename}' could not be opened ({error}). It was renamed to '{backup_filename}'."
+        LOGGER.error(msg)
+        self.app_bus.fire_event(AppBusEventType.LOG_MESSAGE, {'msg': msg, 'log-level': 'ERROR', 'color': 'red'})
+        return journal
+
+
+    def _flush_telegram_journal(self, app_data_filename:str) -> None:
+        journal = self.open_telegram_journal(app_data_filename)
+        if journal is not None:
+            journal.flush()
+
+
+    def replay_telegram_journal(self, start:datetime=None, end:datetime=None) -> int:
+        """Feeds telegrams of the journal into the data manager like received ones. Returns number of replayed telegrams."""
+        if self.telegram_journal is None:
+            return 0
+        return self.telegram_journal.replay(self._serial_callback_handler, start, end)
+
+
+    def _record_message(self, message:EltakoMessage, external_id:str, data:dict) -> None:
+        rm = RecordedMessage(message, external_id, data['gateway_id'], data.get('received', None))
+        self.recoreded_messages.append(rm)
+        self._set_dirty()
+        if self.telegram_journal is not None and not data.get('replay', False):
+            self.telegram_journal.append(rm)
+
+
+    def _get_application_data_store(self, filename:str) -> ApplicationDataStore:
+        if self.application_data_store is None or os.path.abspath(self.application_data_store.filename) != os.path.abspath(filename):
+            self.application_data_store = ApplicationDataStore(filename)
+        return self.application_data_store
+
+
+    def begin_loading(self) -> None:
+        """Suppresses saving (see is_dirty) until the next call of load_application_data_from_file has finished."""
+        self._is_loading = True
+
+
+    def load_application_data_from_file(self, filename:str, mark_as_saved:bool=True):
+        """Loads and applies the file. If mark_as_saved is False the loaded data is treated as unsaved change (import)
+        and the store and telegram journal of the current project are kept."""
+        # partially loaded data must not be saved
+        self._is_loading = True
+        try:
+            # files of previous versions are stored as yaml
+            if not ApplicationDataStore.is_store_file(filename):
+                app_data:ApplicationData = ApplicationData.read_from_yaml_file(filename)
+            elif mark_as_saved:
+                app_data:ApplicationData = self._get_application_data_store(filename).read()
             else:
-                self.app_bus.fire_event(AppBusEventType.UPDATE_SENSOR_REPRESENTATION, device)
+                app_data:ApplicationData = ApplicationDataStore(filename).read()
+
+            self._apply_application_data(app_data)
+            if mark_as_saved:
+                self.open_telegram_journal(filename)
+        finally:
+            # also after a failed load, otherwise the reset data would be saved into the file
+            if mark_as_saved:
+                self._saved_change_key = self._get_change_key()
+            self._is_loading = False
+        return app_data
 
 
-    def load_application_data_from_file(self, filename:str):
-        # if filename.endswith('.eodm'):
-        #     app_data:ApplicationData = ApplicationData.read_from_file(filename)
-        # elif filename.endswith('.yaml'):
-        #     app_data:ApplicationData = ApplicationData.read_from_yaml_file(filename)
-        app_data:ApplicationData = ApplicationData.read_from_yaml_file(filename)
-        
+    def _apply_application_data(self, app_data:ApplicationData) -> None:
         self.load_data_filters(app_data.data_filters)
         self.selected_data_filter_name = app_data.selected_data_filter_name
         if self.selected_data_filter_name is None or self.selected_data_filter_name == '': 
@@ -104,34 +294,108 @@ class DataManager():
 
         self.send_message_template_list = app_data.send_message_template_list
 
-        self.recoreded_messages = app_data.recoreded_messages
+        self.recoreded_messages.clear()
+        self.recoreded_messages.extend(app_data.recoreded_messages)
         self.load_devices(app_data.devices)
-        return app_data
 
 
-    def write_application_data_to_file(self, filename:str):
+    def _create_application_data_snapshot(self, target):
+        """Serializes (store) or copies (yaml) the application data so that it can be written while the data manager keeps changing."""
         app_data = ApplicationData()
         app_data.application_version = AppInfo.get_version()
-        app_data.data_filters = self.data_fitlers
-        app_data.devices = self.devices
+        app_data.data_filters = dict(self.data_fitlers)
+        app_data.devices = dict(self.devices)
         app_data.selected_data_filter_name = self.selected_data_filter_name
-        app_data.recoreded_messages = self.recoreded_messages
+        app_data.recoreded_messages = self.recoreded_messages.to_list()
         app_data.send_message_template_list = self.send_message_template_list
+        if isinstance(target, ApplicationDataStore):
+            return ApplicationDataStore.encode(app_data)
+
+        # recorded messages are not changed after they were received
+        app_data.data_filters = copy.deepcopy(app_data.data_filters)
+        app_data.devices = copy.deepcopy(app_data.devices)
+        app_data.send_message_template_list = copy.deepcopy(app_data.send_message_template_list)
+        return app_data
+
+
+    def _write_application_data(self, target, snapshot) -> None:
+        """Writes into the given store or as yaml into the given filename. Files are replaced atomically."""
+        with self._write_lock:
+            if isinstance(target, ApplicationDataStore):
+                target.write_encoded(snapshot)
+            else:
+                ApplicationData.write_to_yaml_file(target, snapshot)
+
+
+    def _get_write_target(self, filename:str):
+        if filename.endswith('.yaml'):
+            return filename
+        return self._get_application_data_store(filename)
+
+
+    def write_application_data_to_file(self, filename:str):
+        change_key = self._get_change_key()
+        target = self._get_write_target(filename)
+        self._write_application_data(target, self._create_application_data_snapshot(target))
+        self._saved_change_key = change_key
+
+        self._flush_telegram_journal(filename)
+
+
+    def write_application_data_to_file_async(self, filename:str, callback=None) -> None:
+        """Takes a snapshot of the application data and writes it on a worker thread.
+        callback(filename, exception) is called on the worker thread after writing, exception is None on success."""
+        target = self._get_write_target(filename)
+        job = (target, self._create_application_data_snapshot(target), self._get_change_key(), filename, callback)
+        self._flush_telegram_journal(filename)
+
+        with self._save_lock:
+            # only the latest snapshot is written if the worker is still busy
+            self._pending_save = job
+            self._save_idle.clear()
+            if self._save_thread is None:
+                self._save_thread = threading.Thread(target=self._run_save_worker, name="Thread-save_application_data", daemon=True)
+                self._save_thread.start()
+
+
+    def _run_save_worker(self) -> None:
+        while True:
+            with self._save_lock:
+                job = self._pending_save
+                self._pending_save = None
+                if job is None:
+                    self._save_thread = None
+                    self._save_idle.set()
+                    return
+
+            target, snapshot, change_key, filename, callback = job
+            exception = None
+            try:
+                self._write_application_data(target, snapshot)
+                self._saved_change_key = change_key
+            except Exception as e:
+                exception = e
+
+            if callback is not None:
+                callback(filename, exception)
 
-        ApplicationData.write_to_yaml_file(filename, app_data)
+
+    def wait_for_pending_save(self, timeout:float=None) -> bool:
+        """Blocks until all snapshots are written. Returns False if the timeout has expired."""
+        return self._save_idle.wait(timeout)
 
 
     def _serial_callback_handler(self, data:dict):
         message:EltakoMessage = data['msg']
         current_base_id:str = data['base_id']
-        gateway_id:str = data['gateway_id']
 
         if type(message) in [EltakoWrappedRPS,EltakoWrapped4BS, RPSMessage, Regular1BSMessage, Regular4BSMessage, TeachIn4BSMessage2]:
+            adr_int = int.from_bytes(message.address, "big")
             # for decentral devices
-            if int.from_bytes(message.address, "big") > 0X0000FFFF:
-                dev_address = b2s(message.address)
+            if adr_int > 0X0000FFFF:
+                dev_address = self.devices.get_key_by_int(adr_int) or b2s(message.address)
                 # add message to list
-                self.recoreded_messages.append(RecordedMessage(message, dev_address, gateway_id))
+                self._record_message(message, dev_address, data)
                 # if device unknown add device to list
                 if dev_address not in self.devices:
                     decentralized_device = Device.get_decentralized_device_by_telegram(message)
@@ -143,14 +407,16 @@ class DataManager():
                     if self.devices[dev_address].eep in ('', 'unknown', None):
                         self.devices[dev_address].eep = b2s(message.profile)
                         Device.set_suggest_ha_config(self.devices[dev_address])
+                        self.devices.touch()
                         self.app_bus.fire_event(AppBusEventType.UPDATE_SENSOR_REPRESENTATION, self.devices[dev_address])
 
             
             # for bus devices
             elif current_base_id:
-                external_id = data_helper.a2s( int.from_bytes(AddressExpression.parse(current_base_id)[0], 'big') +  int.from_bytes(message.address, 'big') )
+                ext_int = self._get_base_id_int(current_base_id) + adr_int
+                external_id = self.devices.get_key_by_int(ext_int) or data_helper.a2s(ext_int)
                 # add message to list
-                self.recoreded_messages.append(RecordedMessage(message, external_id, gateway_id))
+                self._record_message(message, external_id, data)
                 # if device unknown add device to list
                 if external_id not in self.devices:
                     centralized_device = Device.get_centralized_device_by_telegram(message, current_base_id, external_id)
@@ -184,12 +450,16 @@ class DataManager():
             if 'mdns_service' in data and data['mdns_service'] is not None:
                 gw_device.additional_fields['mdns_service'] = data['mdns_service']
 
+            self.devices.touch()
+
             self.app_bus.fire_event(AppBusEventType.UPDATE_SENSOR_REPRESENTATION, gw_device)
                 
 
 
 
     async def _async_device_detected_handler(self, data):
+        # all devices and sensors of the detected device are represented at once
+        updated_devices:list[Device] = []
         for channel in range(1, data['device'].size+1):
             bd:Device = await Device.async_get_bus_device_by_natvice_bus_object(data['device'], data['base_id'], channel)
             
@@ -201,14 +471,14 @@ class DataManager():
 
             if update:
                 self.devices[bd.external_id] = bd
-                self.app_bus.fire_event(AppBusEventType.UPDATE_DEVICE_REPRESENTATION, bd)
+                updated_devices.append(bd)
 
             for si in bd.memory_entries:
                 _bd:Device = Device.get_decentralized_device_by_sensor_info(si, data['base_id'])
 
                 if _bd.external_id not in self.devices or update or not self.devices[_bd.external_id].bus_device:
                     self.devices[_bd.external_id] = _bd
-                    self.app_bus.fire_event(AppBusEventType.UPDATE_SENSOR_REPRESENTATION, _bd)
+                    updated_devices.append(_bd)
 
                 # add device a second time with base id of FTD14
                 if bd.is_ftd14():                    
@@ -216,38 +486,43 @@ class DataManager():
                 
                     if _bd.external_id not in self.devices or update or not self.devices[_bd.external_id].bus_device:
                         self.devices[_bd.external_id] = _bd
-                        self.app_bus.fire_event(AppBusEventType.UPDATE_SENSOR_REPRESENTATION, _bd)
+                        updated_devices.append(_bd)
                 
             # add features of device as own entity/device
             feature = Device.get_feature_as_device(bd)
             if feature is not None and (feature.external_id not in self.devices or update): 
                 self.devices[feature.external_id] = feature
-                self.app_bus.fire_event(AppBusEventType.UPDATE_DEVICE_REPRESENTATION, feature)
+                updated_devices.append(feature)
 
             # if a new gateway was detected check if there are already devices detected which should be moved as child nodes under the newly detected gateway.
             if bd.is_fam14():
+                self.app_bus.fire_event(AppBusEventType.UPDATE_DEVICES_REPRESENTATION, updated_devices)
+                updated_devices = []
                 await self._find_and_update_devices_belonging_to_gateway(bd.base_id)
 
+        if len(updated_devices) > 0:
+            self.app_bus.fire_event(AppBusEventType.UPDATE_DEVICES_REPRESENTATION, updated_devices)
+
 
     async def _find_and_update_devices_belonging_to_gateway(self, base_id:str):
         """Check all devices which are not detected as bus device (decentral/wireless device) if it belong to a gateway."""
-        base_id_int = int.from_bytes( AddressExpression.parse(base_id)[0], 'big' )
-        for d in self.devices.values():
-            if not d.bus_device and d.base_id == '00-00-00-00':
-                adr_int = int.from_bytes( AddressExpression.parse(d.address)[0], 'big' )
-                if 0 < (adr_int - base_id_int) and (adr_int - base_id_int) < 0xFF:
-                    d.address = data_helper.a2s(adr_int - base_id_int)
-                    d.bus_device = True
-                    d.base_id = base_id
+        base_id_int = self._get_base_id_int(base_id)
+        # only devices with an address within the address range of the gateway are affected
+        for adr_int in range(base_id_int+1, base_id_int+0xFF):
+            d = self.devices.get_by_int(adr_int)
+            if d is not None and not d.bus_device and d.base_id == '00-00-00-00' and d.address == data_helper.a2s(adr_int):
+                d.address = data_helper.a2s(adr_int - base_id_int)
+                d.bus_device = True
+                d.base_id = base_id
+                self.devices.touch()
 
-                    self.app_bus.fire_event(AppBusEventType.UPDATE_DEVICE_REPRESENTATION, d)
+                self.app_bus.fire_event(AppBusEventType.UPDATE_DEVICE_REPRESENTATION, d)
 
 
     def get_device_by_id(self, device_id:str):
-        for d in self.devices.values():
-            if d.external_id == device_id:
-                return d
-            
+        d = self.devices.get(device_id, None)
+        if d is not None and d.external_id == device_id:
+            return d
         return None
     
     def get_sensors_configured_in_a_device(self, device:Device) -> list[Device]:
@@ -276,16 +551,14 @@ class DataManager():
         devices = []
 
         # if sensor selected
-        for d in self.devices.values():
-            for m in d.memory_entries:
-                if sensor.address == m.sensor_id_str:
-                    if d.channel == m.channel:
-                        # sensor with global id
-                        if m.sensor_id_str == sensor.external_id:
-                            devices.append(d)
-                        # sensor with local bus id
-                        elif d.base_id == sensor.base_id:
-                            devices.append(d)
+        for d, m in self._get_sensor_index().get(sensor.address, []):
+            if d.channel == m.channel:
+                # sensor with global id
+                if m.sensor_id_str == sensor.external_id:
+                    devices.append(d)
+                # sensor with local bus id
+                elif d.base_id == sensor.base_id:
+                    devices.append(d)
         return devices
 
 
@@ -305,6 +578,8 @@ class DataManager():
 
     def update_device(self, device: Device) -> None:
         self.devices[device.external_id] = device
+        self._telegram_decoders.pop(device.external_id, None)
+        self.device_search_index.invalidate(device)
 
         if device.is_bus_device():
             self.app_bus.fire_event(AppBusEventType.UPDATE_DEVICE_REPRESENTATION, device)
@@ -313,38 +588,34 @@ class DataManager():
 
 
     def find_device_by_local_address(self, address:str, base_id:str) -> Device:
-        local_adr = int.from_bytes(AddressExpression.parse(address)[0], "big")
-        base_adr = int.from_bytes(AddressExpression.parse(base_id)[0], "big")
+        return self._find_device_by_local_int(data_helper.a2i(address), base_id)
 
-        if (local_adr + base_adr) > 0xFFFFFFFF:
-            return None
 
-        ext_id = data_helper.a2s(local_adr + base_adr)
-        if ext_id in self.devices:
-            return self.devices[ext_id]
-        
-        return None
+    def _find_device_by_local_int(self, local_adr:int, base_id:str) -> Device:
+        ext_adr = local_adr + self._get_base_id_int(base_id)
+        if ext_adr > 0xFFFFFFFF:
+            return None
+        return self.devices.get_by_int(ext_adr)
 
 
     def get_values_from_message_to_string(self, message:EltakoMessage, base_id:str=None) -> str:
         try:
             eep = None
-            # get ext id
-            ext_id_str = b2s(message.address)
-            if ext_id_str.startswith('00-00-00-') and base_id is not None:
-                device:Device = self.find_device_by_local_address(ext_id_str, base_id)
+            # get device by ext id
+            adr_int = int.from_bytes(message.address, 'big')
+            if adr_int <= 0xFF and base_id is not None:
+                device:Device = self._find_device_by_local_int(adr_int, base_id)
                 if device is None: 
                     return None, None
-                else:
-                    ext_id_str = device.external_id
-
-            if ext_id_str in self.devices:
-                device = self.devices[ext_id_str]
-                try:
-                    eep:EEP = data_helper.find_eep_by_name(device.eep)
-                    return eep, ', '.join(data_helper.get_values_for_eep(eep, message))
-                except:
-                    pass
+            else:
+                device:Device = self.devices.get_by_int(adr_int)
+
+            if device is not None:
+                decoder = self._telegram_decoders.get(device.external_id, None)
+                if decoder is None or decoder.eep_name != device.eep:
+                    decoder = TelegramDecoder(device.eep)
+                    self._telegram_decoders[device.external_id] = decoder
+                return decoder.eep, decoder.decode(message)
         except:
             pass
         return eep, None
@@ -352,4 +623,5 @@ class DataManager():
 
     def on_update_send_message_template_list(self, data:list[str]):
         self.send_message_template_list = data
+        self._set_dirty()
     
\ No newline at end of file
@@ -0,0 +1,101 @@
+from .device import Device
+from . import data_helper
+
+
+class DeviceDict(dict):
+    """Devices by external id (e.g. 'FF-AA-80-01'). Additionally keeps an index by external id as 32-bit integer
+    so that raw telegram addresses can be resolved without formatting them as string."""
+
+    def __init__(self, devices:dict[str:Device]=None) -> None:
+        super().__init__()
+        # external id as int => key
+        self._int_index:dict[int:str] = {}
+        # incremented with every change so that derived indexes know when to rebuild
+        self.version:int = 0
+        if devices:
+            self.update(devices)
+
+
+    @classmethod
+    def _key_to_int(cls, key:str) -> int:
+        """Returns int value of keys in the format 'XX-XX-XX-XX' otherwise None."""
+        if not isinstance(key, str) or len(key) != 11:
+            return None
+        try:
+            value = int.from_bytes(bytes.fromhex(key.replace('-', '')), 'big')
+        except ValueError:
+            return None
+        # only index keys which are equal to the formatted address
+        return value if data_helper.a2s(value) == key else None
+
+
+    def get_key_by_int(self, external_id:int) -> str:
+        return self._int_index.get(external_id, None)
+
+
+    def get_by_int(self, external_id:int) -> Device:
+        key = self._int_index.get(external_id, None)
+        if key is None:
+            return None
+        return self.get(key, None)
+
+
+    def touch(self) -> None:
+        """Marks the devices as changed, e.g. after memory entries of a device were changed in place."""
+        self.version += 1
+
+
+    def __setitem__(self, key:str, device:Device) -> None:
+        if key not in self:
+            i = self._key_to_int(key)
+            if i is not None:
+                self._int_index[i] = key
+        super().__setitem__(key, device)
+        self.version += 1
+
+
+    def __delitem__(self, key:str) -> None:
+        super().__delitem__(key)
+        self.version += 1
+        i = self._key_to_int(key)
+        if i is not None:
+            self._int_index.pop(i, None)
+
+
+    def pop(self, key:str, *default) -> Device:
+        if key in self:
+            device = self[key]
+            del self[key]
+            return device
+        return super().pop(key, *default)
+
+
+    def popitem(self) -> tuple:
+        key, device = super().popitem()
+        self.version += 1
+        i = self._key_to_int(key)
+        if i is not None:
+            self._int_index.pop(i, None)
+        return key, device
+
+
+    def setdefault(self, key:str, device:Device=None) -> Device:
+        if key not in self:
+            self[key] = device
+        return self[key]
+
+
+    def update(self, *args, **kwargs) -> None:
+        for key, device in dict(*args, **kwargs).items():
+            self[key] = device
+
+
+    def clear(self) -> None:
+        super().clear()
+        self._int_index.clear()
+        self.version += 1
+
+
+    def __reduce__(self):
+        # serialize like a plain dict
+        return (dict, (dict(self),))
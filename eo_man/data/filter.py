@@ -1,5 +1,59 @@
+import re
+
 from .device import Device
 
+class DeviceSearchDocument():
+    """Upper case values of a device which are searched by filters."""
+
+    __slots__ = ('address', 'external_id', 'device_type', 'eep', 'text')
+
+    # values are joined with a separator which is not part of filter terms
+    SEPARATOR = '\n'
+
+    def __init__(self, device:Device) -> None:
+        self.address:str = device.address.upper() if device.address else None
+        self.external_id:str = device.external_id.upper() if device.external_id else None
+        self.device_type:str = device.device_type.upper() if device.device_type else None
+        self.eep:str = device.eep.upper() if device.eep else None
+
+        values = [v.upper() for v in (device.key_function, device.comment, device.version, device.ha_platform) if v]
+        self._add_dict_values(device.additional_fields, values)
+        # global filter terms are searched in all values
+        values += [v for v in (self.address, self.external_id, self.device_type, self.eep) if v]
+        self.text:str = self.SEPARATOR.join(values) if len(values) > 0 else None
+
+
+    @classmethod
+    def _add_dict_values(cls, additional_fields:dict, values:list[str]) -> None:
+        for value in additional_fields.values():
+            if isinstance(value, dict):
+                cls._add_dict_values(value, values)
+            else:
+                values.append(str(value).upper())
+
+
+class DeviceSearchIndex():
+    """Cached search documents of devices. Documents of changed devices need to be invalidated."""
+
+    def __init__(self) -> None:
+        # external id of device => (device, search document), replaced devices overwrite the entry of their predecessor
+        self._documents:dict[str:tuple] = {}
+
+    def get_document(self, device:Device) -> DeviceSearchDocument:
+        entry = self._documents.get(device.external_id, None)
+        if entry is None or entry[0] is not device:
+            entry = (device, DeviceSearchDocument(device))
+            self._documents[device.external_id] = entry
+        return entry[1]
+
+    def invalidate(self, device:Device=None) -> None:
+        """Removes the document of the given device or of all devices if no device is given."""
+        if device is None:
+            self._documents.clear()
+        else:
+            self._documents.pop(device.external_id, None)
+
+
 class DataFilter():
 
     def __init__(self, name:str, 
@@ -16,55 +70,59 @@ class DataFilter():
         self.device_eep_filter = device_eep_filter
 
     
-    def filter_device(self, device:Device):
+    def __getstate__(self):
+        # compiled matchers are not persisted
+        state = self.__dict__.copy()
+        state.pop('_matchers', None)
+        return state
+
+
+    @classmethod
+    def _compile(cls, terms:list[str]):
+        """Returns one case insensitive substring matcher for all terms or None if there are no terms."""
+        terms = {t.upper() for t in terms}
+        if len(terms) == 0:
+            return None
+        return re.compile('|'.join(re.escape(t) for t in sorted(terms, key=len, reverse=True))).search
+
+
+    def _get_matchers(self) -> tuple:
+        matchers = getattr(self, '_matchers', None)
+        if matchers is None:
+            matchers = (self._compile(self.device_address_filter + self.global_filter),
+                        self._compile(self.device_external_address_filter + self.global_filter),
+                        self._compile(self.device_type_filter + self.global_filter),
+                        self._compile(self.device_eep_filter + self.global_filter),
+                        self._compile(self.global_filter))
+            self._matchers = matchers
+        return matchers
+
+
+    def filter_device(self, device:Device, document:DeviceSearchDocument=None) -> bool:
+        """Returns True if one of the filter terms is contained in the device. The search document of the device can be passed if cached."""
+        if document is None:
+            document = DeviceSearchDocument(device)
+
+        address_matcher, external_id_matcher, device_type_matcher, eep_matcher, global_matcher = self._get_matchers()
+
         # check address
-        for f in self.device_address_filter + self.global_filter:
-            if device.address and f.upper() in device.address.upper():
-                return True
+        if address_matcher and document.address and address_matcher(document.address):
+            return True
         
         # check external id
-        for f in self.device_external_address_filter + self.global_filter:
-            if device.external_id and f.upper() in device.external_id.upper():
-                return True
+        if external_id_matcher and document.external_id and external_id_matcher(document.external_id):
+            return True
             
         # check device type
-        for f in self.device_type_filter + self.global_filter:
-            if device.device_type and f.upper() in device.device_type.upper():
-                return True
+        if device_type_matcher and document.device_type and device_type_matcher(document.device_type):
+            return True
         
         # check eep
-        for f in self.device_eep_filter + self.global_filter:
-            if device.eep and f.upper() in device.eep.upper():
-                return True
-            
-        for f in self.global_filter:
-            # key function
-            if device.key_function and f.upper() in device.key_function.upper():
-                return True
-            
-            # comment
-            if device.comment and f.upper() in device.comment.upper():
-                return True
-            
-            # version
-            if device.version and f.upper() in device.version.upper():
-                return True
-            
-            # ha platform
-            if device.ha_platform and f.upper() in device.ha_platform.upper():
-                return True
+        if eep_matcher and document.eep and eep_matcher(document.eep):
+            return True
 
-            if self.find_in_dict(device.additional_fields, f.upper()):
-                return True
+        # key function, comment, version, ha platform and additional fields
+        if global_matcher and document.text is not None and global_matcher(document.text):
+            return True
 
         return False
-    
-    
-    def find_in_dict(self, additional_fields:dict, filter:str) -> bool:
-        for key, value in additional_fields.items():
-            if isinstance(value, dict):
-                if self.find_in_dict(value, filter):
-                    return True
-            elif filter in str(value).upper():
-                return True
-        return False
\ No newline at end of file
@@ -1,10 +1,48 @@
+import sys
+import time
 from datetime import datetime
-from eltakobus.message import ESP2Message
+from eltakobus.message import ESP2Message, prettify
 
 class RecordedMessage():
+    """Compact record of a received telegram. Only the raw ESP2 bytes are kept,
+    the message object is recreated when it is accessed."""
 
-    def __init__(self, message:ESP2Message, external_id:str, gateway_id:str) -> None:
-        self.message:ESP2Message = None
-        self.external_device_id:str = external_id
-        self.received_via_gateway_id: str = gateway_id
-        self.received = datetime.now()
\ No newline at end of file
+    __slots__ = ('raw_message', 'external_device_id', 'received_via_gateway_id', 'received_timestamp')
+
+    def __init__(self, message:ESP2Message, external_id:str, gateway_id:str, received:float=None) -> None:
+        self.raw_message:bytes = message.serialize() if message is not None else None
+        # ids are repeated for every telegram of a device, so share the string objects
+        self.external_device_id:str = sys.intern(external_id) if external_id is not None else None
+        self.received_via_gateway_id:str = sys.intern(gateway_id) if gateway_id is not None else None
+        self.received_timestamp:float = time.time() if received is None else received
+
+    @property
+    def message(self) -> ESP2Message:
+        if self.raw_message is None:
+            return None
+        return prettify(ESP2Message.parse(self.raw_message))
+
+    @property
+    def received(self) -> datetime:
+        return datetime.fromtimestamp(self.received_timestamp)
+
+    @received.setter
+    def received(self, value:datetime) -> None:
+        self.received_timestamp = value.timestamp() if isinstance(value, datetime) else float(value)
+
+    def __getstate__(self) -> dict:
+        return {
+            'raw_message': self.raw_message,
+            'external_device_id': self.external_device_id,
+            'received_via_gateway_id': self.received_via_gateway_id,
+            'received': self.received_timestamp,
+        }
+
+    def __setstate__(self, state:dict) -> None:
+        # older versions stored 'message' (always None) and 'received' as datetime
+        self.raw_message = state.get('raw_message', None)
+        ext_id = state.get('external_device_id', None)
+        self.external_device_id = sys.intern(ext_id) if ext_id is not None else None
+        gw_id = state.get('received_via_gateway_id', None)
+        self.received_via_gateway_id = sys.intern(gw_id) if gw_id is not None else None
+        self.received = state.get('received', 0.0)
@@ -0,0 +1,132 @@
+from array import array
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Iterator
+
+from .recorded_message import RecordedMessage
+
+
+class RecordedMessageStore():
+    """Ring buffer for recorded telegrams with a limited capacity (count and/or age).
+    Telegrams are kept in receiving order. A secondary index per external device id allows to
+    query the latest telegrams of a device without scanning all recorded telegrams."""
+
+    DEFAULT_MAX_COUNT:int = 100000
+
+    def __init__(self, max_count:int=DEFAULT_MAX_COUNT, max_age:timedelta=None) -> None:
+        if max_count is None or max_count < 1:
+            raise ValueError("max_count must be a positive number.")
+        self.max_count:int = max_count
+        self.max_age:timedelta = max_age
+
+        self._messages:list[RecordedMessage] = [None] * max_count
+        self._timestamps:array = array('d', [0.0]) * max_count
+        # sequence number of the oldest message and of the next appended message
+        self._first_seq:int = 0
+        self._next_seq:int = 0
+        # external device id => sequence numbers of its messages in ascending order
+        self._device_index:dict[str:deque[int]] = {}
+
+
+    def __len__(self) -> int:
+        return self._next_seq - self._first_seq
+
+
+    def __iter__(self) -> Iterator[RecordedMessage]:
+        """Iterates from oldest to newest message"""
+        for seq in range(self._first_seq, self._next_seq):
+            yield self._messages[seq % self.max_count]
+
+
+    def to_list(self) -> list[RecordedMessage]:
+        start = self._first_seq % self.max_count
+        end = start + len(self)
+        if end <= self.max_count:
+            return self._messages[start:end]
+        return self._messages[start:] + self._messages[:end - self.max_count]
+
+
+    def clear(self) -> None:
+        self._messages = [None] * self.max_count
+        self._first_seq = self._next_seq
+        self._device_index = {}
+
+
+    def append(self, message:RecordedMessage) -> None:
+        if len(self) == self.max_count:
+            self._evict_oldest()
+
+        pos = self._next_seq % self.max_count
+        self._messages[pos] = message
+        self._timestamps[pos] = message.received_timestamp
+        self._device_index.setdefault(message.external_device_id, deque()).append(self._next_seq)
+        self._next_seq += 1
+
+        self.evict_expired_messages()
+
+
+    def extend(self, messages:list[RecordedMessage]) -> None:
+        for m in messages:
+            self.append(m)
+
+
+    def evict_expired_messages(self, now:datetime=None) -> None:
+        """Removes all messages which are older than max_age."""
+        if self.max_age is None:
+            return
+
+        min_timestamp = ((now or datetime.now()) - self.max_age).timestamp()
+        while len(self) > 0 and self._timestamps[self._first_seq % self.max_count] < min_timestamp:
+            self._evict_oldest()
+
+
+    def _evict_oldest(self) -> None:
+        pos = self._first_seq % self.max_count
+        message = self._messages[pos]
+        self._messages[pos] = None
+
+        seqs = self._device_index[message.external_device_id]
+        seqs.popleft()
+        if len(seqs) == 0:
+            del self._device_index[message.external_device_id]
+
+        self._first_seq += 1
+
+
+    def get_external_device_ids(self) -> list[str]:
+        return list(self._device_index.keys())
+
+
+    def count_messages_of_device(self, external_id:str) -> int:
+        return len(self._device_index.get(external_id, ()))
+
+
+    def get_last_messages_of_device(self, external_id:str, count:int=1) -> list[RecordedMessage]:
+        """Returns up to count latest messages of the given device ordered from oldest to newest."""
+        seqs = self._device_index.get(external_id, None)
+        if not seqs or count < 1:
+            return []
+
+        result = []
+        for i in range(max(0, len(seqs)-count), len(seqs)):
+            result.append(self._messages[seqs[i] % self.max_count])
+        return result
+
+
+    def get_messages_between(self, start:datetime=None, end:datetime=None) -> list[RecordedMessage]:
+        """Returns all messages received in the time range [start, end)."""
+        first = self._first_seq if start is None else self._bisect_timestamp(start.timestamp())
+        last = self._next_seq if end is None else self._bisect_timestamp(end.timestamp())
+        return [self._messages[seq % self.max_count] for seq in range(first, last)]
+
+
+    def _bisect_timestamp(self, timestamp:float) -> int:
+        """Returns sequence number of the first message received at or after the given timestamp."""
+        lo, hi = self._first_seq, self._next_seq
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._timestamps[mid % self.max_count] < timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
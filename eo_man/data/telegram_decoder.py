@@ -0,0 +1,42 @@
+from eltakobus.eep import EEP
+from eltakobus.message import ESP2Message
+
+from . import data_helper
+
+
+class TelegramDecoder():
+    """Decodes telegrams of one device into a value string (see data_helper.get_values_for_eep).
+    The EEP class is resolved once and the result of the last telegram is kept so that repeated
+    identical telegrams (e.g. status repeats) are not decoded again."""
+
+    __slots__ = ('eep_name', 'eep', '_labels', '_last_key', '_last_values')
+
+    def __init__(self, eep_name:str) -> None:
+        self.eep_name:str = eep_name
+        self.eep:EEP = data_helper.find_eep_by_name(eep_name)
+        # attribute name of decoded message => displayed name
+        self._labels:dict[str:str] = {}
+        self._last_key = None
+        self._last_values:str = None
+
+    def _get_label(self, attribute:str) -> str:
+        label = self._labels.get(attribute, None)
+        if label is None:
+            label = attribute[1:] if attribute.startswith('_') else attribute
+            self._labels[attribute] = label
+        return label
+
+    def decode(self, message:ESP2Message) -> str:
+        """Returns the decoded values or None if the telegram cannot be decoded."""
+        key = (type(message), message.body)
+        if key == self._last_key:
+            return self._last_values
+
+        try:
+            values = ', '.join(f"{self._get_label(str(k))}: {str(v)}" for k, v in self.eep.decode_message(message).__dict__.items())
+        except Exception:
+            values = None
+
+        self._last_key = key
+        self._last_values = values
+        return values
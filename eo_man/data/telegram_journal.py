@@ -0,0 +1,205 @@
+import os
+import mmap
+import struct
+import bisect
+from datetime import datetime
+from typing import Iterator
+
+from eltakobus.message import ESP2Message, prettify
+from eltakobus.util import AddressExpression
+
+from . import data_helper
+from .recorded_message import RecordedMessage
+
+
+class TelegramJournal():
+    """Append-only binary file of received telegrams which is stored next to the application data file (.eodm).
+
+    The file starts with a header followed by fixed-size records:
+    receive timestamp (double), external device id (uint32), gateway id (uint32), raw ESP2 telegram (14 bytes), 2 bytes padding.
+    Records are in receiving order so that time ranges can be looked up by binary search. A sparse in-memory
+    index (every INDEX_INTERVAL-th record) narrows down the search. Reading is done via mmap so that the
+    journal never needs to be loaded completely into memory.
+    """
+
+    FILE_EXTENSION:str = '.eojournal'
+    MAGIC:bytes = b'EOTJ'
+    VERSION:int = 1
+    HEADER_STRUCT = struct.Struct('<4sHH')
+    RECORD_STRUCT = struct.Struct('<dII14s2x')
+    ESP2_MESSAGE_LENGTH:int = 14
+    INDEX_INTERVAL:int = 1024
+
+    def __init__(self, filename:str) -> None:
+        self.filename:str = filename
+        self._writer = None
+        self._record_count:int = 0
+        # sparse index: timestamps of every INDEX_INTERVAL-th record
+        self._index_timestamps:list[float] = []
+
+        # an empty file is treated like a new journal (e.g. crash before the header was written)
+        if os.path.isfile(filename) and os.path.getsize(filename) > 0:
+            self._check_header()
+            self._record_count = (os.path.getsize(filename) - self.HEADER_STRUCT.size) // self.RECORD_STRUCT.size
+            self._build_index()
+
+
+    @classmethod
+    def get_journal_filename(cls, app_data_filename:str) -> str:
+        return os.path.splitext(app_data_filename)[0] + cls.FILE_EXTENSION
+
+
+    def __len__(self) -> int:
+        return self._record_count
+
+
+    def _check_header(self) -> None:
+        with open(self.filename, 'rb') as f:
+            header = f.read(self.HEADER_STRUCT.size)
+        if len(header) < self.HEADER_STRUCT.size:
+            raise ValueError(f"Telegram journal '{self.filename}' is corrupted.")
+        magic, version, record_size = self.HEADER_STRUCT.unpack(header)
+        if magic != self.MAGIC or version != self.VERSION or record_size != self.RECORD_STRUCT.size:
+            raise ValueError(f"File '{self.filename}' is no supported telegram journal.")
+
+
+    def _build_index(self) -> None:
+        self._index_timestamps = []
+        with self._open_mmap() as mm:
+            if mm is None:
+                return
+            for i in range(0, self._record_count, self.INDEX_INTERVAL):
+                self._index_timestamps.append(self._read_timestamp(mm, i))
+
+
+    def _open_mmap(self):
+        if self._writer is not None:
+            self._writer.flush()
+        if self._record_count == 0:
+            return _EmptyContext()
+        with open(self.filename, 'rb') as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+    def _get_writer(self):
+        if self._writer is None:
+            is_new = not os.path.isfile(self.filename) or os.path.getsize(self.filename) == 0
+            self._writer = open(self.filename, 'ab')
+            if is_new:
+                # header is written immediately so that the file is never left without it
+                self._writer.write(self.HEADER_STRUCT.pack(self.MAGIC, self.VERSION, self.RECORD_STRUCT.size))
+                self._writer.flush()
+            else:
+                # cut off incomplete record e.g. after crash
+                self._writer.truncate(self.HEADER_STRUCT.size + self._record_count * self.RECORD_STRUCT.size)
+        return self._writer
+
+
+    @classmethod
+    def _id_to_int(cls, id:str) -> int:
+        try:
+            return int.from_bytes(AddressExpression.parse(id.strip())[0], 'big')
+        except Exception:
+            return 0
+
+
+    def append(self, recorded_message:RecordedMessage) -> None:
+        raw = recorded_message.raw_message
+        if raw is None or len(raw) != self.ESP2_MESSAGE_LENGTH:
+            return
+
+        timestamp = recorded_message.received_timestamp
+        if self._record_count % self.INDEX_INTERVAL == 0:
+            self._index_timestamps.append(timestamp)
+
+        self._get_writer().write(self.RECORD_STRUCT.pack(timestamp,
+                                                         self._id_to_int(recorded_message.external_device_id or ''),
+                                                         self._id_to_int(recorded_message.received_via_gateway_id or ''),
+                                                         raw))
+        self._record_count += 1
+
+
+    def flush(self) -> None:
+        if self._writer is not None:
+            self._writer.flush()
+
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+    def _read_timestamp(self, mm, record_no:int) -> float:
+        return struct.unpack_from('<d', mm, self.HEADER_STRUCT.size + record_no * self.RECORD_STRUCT.size)[0]
+
+
+    def _read_record(self, mm, record_no:int) -> RecordedMessage:
+        timestamp, ext_id, gw_id, raw = self.RECORD_STRUCT.unpack_from(mm, self.HEADER_STRUCT.size + record_no * self.RECORD_STRUCT.size)
+        rm = RecordedMessage.__new__(RecordedMessage)
+        rm.__setstate__({
+            'raw_message': raw,
+            'external_device_id': data_helper.a2s(ext_id),
+            'received_via_gateway_id': data_helper.a2s(gw_id) if gw_id != 0 else None,
+            'received': timestamp,
+        })
+        return rm
+
+
+    def _find_record_no(self, mm, timestamp:float) -> int:
+        """Returns the number of the first record received at or after the given timestamp."""
+        # narrow down search range with sparse index
+        block = bisect.bisect_left(self._index_timestamps, timestamp)
+        lo = max(0, (block-1) * self.INDEX_INTERVAL)
+        hi = min(self._record_count, block * self.INDEX_INTERVAL)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._read_timestamp(mm, mid) < timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+
+    def read(self, start:datetime=None, end:datetime=None) -> Iterator[RecordedMessage]:
+        """Yields all recorded telegrams received in the time range [start, end)."""
+        with self._open_mmap() as mm:
+            if mm is None:
+                return
+            first = 0 if start is None else self._find_record_no(mm, start.timestamp())
+            last = self._record_count if end is None else self._find_record_no(mm, end.timestamp())
+            for i in range(first, last):
+                yield self._read_record(mm, i)
+
+
+    @classmethod
+    def derive_base_id(cls, message:ESP2Message, external_id:str) -> str:
+        """Returns base id of the receiving gateway for telegrams with local bus address, otherwise None."""
+        if not isinstance(getattr(message, 'address', None), bytes) or not external_id:
+            return None
+        adr_int = int.from_bytes(message.address, 'big')
+        ext_int = cls._id_to_int(external_id)
+        if 0 < adr_int <= 0x0000FFFF and ext_int > adr_int:
+            return data_helper.a2s(ext_int - adr_int)
+        return None
+
+
+    def replay(self, callback, start:datetime=None, end:datetime=None) -> int:
+        """Calls callback (e.g. DataManager._serial_callback_handler) for every telegram in the time range. Returns number of replayed telegrams."""
+        count = 0
+        for rm in self.read(start, end):
+            message = prettify(ESP2Message.parse(rm.raw_message))
+            base_id = self.derive_base_id(message, rm.external_device_id)
+            callback({'msg': message, 'base_id': base_id, 'gateway_id': rm.received_via_gateway_id, 'received': rm.received_timestamp, 'replay': True})
+            count += 1
+        return count
+
+
+class _EmptyContext():
+    """Context used for reading an empty journal"""
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *args):
+        return False
@@ -0,0 +1,109 @@
+import yaml
+from homeassistant.const import Platform
+from eltakobus.device import SensorInfo
+
+from .device import Device
+from .filter import DataFilter
+from .recorded_message import RecordedMessage
+from .message_history import MessageHistoryEntry
+
+# use libyaml if available
+_SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+_SafeDumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+
+class ApplicationDataLoader(_SafeLoader):
+    """Safe yaml loader which only constructs the classes of the application data (see register_class)."""
+
+
+class ApplicationDataDumper(_SafeDumper):
+    """Safe yaml dumper for the classes of the application data. Uses the same tags as yaml.dump() so that files stay compatible."""
+
+
+def _get_tag(cls) -> str:
+    return f"tag:yaml.org,2002:python/object:{cls.__module__}.{cls.__name__}"
+
+
+def _construct_object(cls):
+    def construct(loader:ApplicationDataLoader, node:yaml.MappingNode):
+        obj = cls.__new__(cls)
+        # object is returned before its state is constructed to support recursive structures (anchors)
+        yield obj
+        state = loader.construct_mapping(node, deep=True)
+        if hasattr(obj, '__setstate__'):
+            obj.__setstate__(state)
+        else:
+            obj.__dict__.update(state)
+    return construct
+
+
+def _represent_object(dumper:ApplicationDataDumper, obj):
+    # custom __getstate__ e.g. of RecordedMessage or DataFilter defines what is stored
+    custom_getstate = getattr(type(obj), '__getstate__', None) is not getattr(object, '__getstate__', None)
+    state = obj.__getstate__() if custom_getstate else obj.__dict__
+    return dumper.represent_mapping(_get_tag(type(obj)), state)
+
+
+def register_class(cls) -> None:
+    """Allows to load and dump objects of the given class. The state of an object is stored as mapping."""
+    ApplicationDataLoader.add_constructor(_get_tag(cls), _construct_object(cls))
+    ApplicationDataDumper.add_representer(cls, _represent_object)
+
+
+# enums which may be referenced by name, python >= 3.12 dumps enums as getattr(<enum class>, <member name>)
+_ENUM_CLASSES:dict[str:type] = {}
+
+
+def register_enum(cls) -> None:
+    """Allows to load members of the given enum class."""
+    _ENUM_CLASSES[f"{cls.__module__}.{cls.__name__}"] = cls
+
+
+def _construct_enum_class(loader:ApplicationDataLoader, suffix:str, node:yaml.Node) -> type:
+    if suffix not in _ENUM_CLASSES:
+        raise yaml.constructor.ConstructorError(None, None, f"name '{suffix}' is not allowed", node.start_mark)
+    return _ENUM_CLASSES[suffix]
+
+
+def _construct_enum_member(loader:ApplicationDataLoader, node:yaml.SequenceNode):
+    args = loader.construct_sequence(node, deep=True)
+    if len(args) != 2 or args[0] not in _ENUM_CLASSES.values() or args[1] not in args[0].__members__:
+        raise yaml.constructor.ConstructorError(None, None, f"getattr{tuple(args)} is not allowed", node.start_mark)
+    return args[0][args[1]]
+
+
+def _construct_platform(loader:ApplicationDataLoader, node:yaml.SequenceNode) -> Platform:
+    return Platform(*loader.construct_sequence(node))
+
+
+def _represent_platform(dumper:ApplicationDataDumper, platform:Platform):
+    # format of python < 3.12 which can be loaded by all versions
+    return dumper.represent_sequence('tag:yaml.org,2002:python/object/apply:homeassistant.const.Platform', [platform.value])
+
+
+def _construct_tuple(loader:ApplicationDataLoader, node:yaml.SequenceNode) -> tuple:
+    return tuple(loader.construct_sequence(node))
+
+
+def _represent_tuple(dumper:ApplicationDataDumper, data:tuple):
+    return dumper.represent_sequence('tag:yaml.org,2002:python/tuple', data)
+
+
+for _cls in [Device, DataFilter, RecordedMessage, MessageHistoryEntry, SensorInfo]:
+    register_class(_cls)
+
+register_enum(Platform)
+ApplicationDataLoader.add_multi_constructor('tag:yaml.org,2002:python/name:', _construct_enum_class)
+ApplicationDataLoader.add_constructor('tag:yaml.org,2002:python/object/apply:builtins.getattr', _construct_enum_member)
+ApplicationDataLoader.add_constructor('tag:yaml.org,2002:python/object/apply:homeassistant.const.Platform', _construct_platform)
+ApplicationDataDumper.add_representer(Platform, _represent_platform)
+ApplicationDataLoader.add_constructor('tag:yaml.org,2002:python/tuple', _construct_tuple)
+ApplicationDataDumper.add_representer(tuple, _represent_tuple)
+
+
+def load(stream):
+    return yaml.load(stream, Loader=ApplicationDataLoader)
+
+
+def dump(data, stream=None):
+    return yaml.dump(data, stream, Dumper=ApplicationDataDumper)
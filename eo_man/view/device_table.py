@@ -1,5 +1,5 @@
-import threading
 import time
+from collections import deque
 from tkinter import *
 from tkinter import ttk
 
@@ -9,6 +9,7 @@ from ..data.homeassistant.const import CONF_ID, CONF_NAME
 from ..data.filter import DataFilter
 from ..data.data_manager import DataManager, Device
 from ..data import data_helper
+from .. import LOGGER
 from ..icons.image_gallary import ImageGallery
 
 from eltakobus.util import b2s
@@ -19,9 +20,16 @@ class DeviceTable():
 
     ICON_SIZE = (20,20)
     NON_BUS_DEVICE_LABEL:str="Distributed Devices"
+    # number of devices inserted into the treeview per cycle of the tk event loop
+    INSERT_CHUNK_SIZE:int = 250
+    # seconds a device is highlighted after a telegram was received
+    BLINK_DURATION:float = 0.5
 
     def __init__(self, main: Tk, app_bus:AppBus, data_manager:DataManager):
         self.blinking_enabled = True
+        # external id => time when highlighting of the device ends
+        self._blink_deadlines:dict[str:float] = {}
+        self._blink_job = None
         self.pane = ttk.Frame(main, padding=2)
         # Don't use pack() when this will be added to a PanedWindow - conflicts with PanedWindow.add()
         self.root = self.pane
@@ -90,10 +98,20 @@ class DeviceTable():
         self.check_if_wireless_network_exists()
 
         self.current_data_filter:DataFilter = None
+        # devices to be inserted/updated in chunks: external id => (device, parent)
+        self._pending_devices:dict[str:tuple] = {}
+        self._pending_devices_order:deque[str] = deque()
+        self._pending_devices_job = None
+        # parents which are known to exist in the treeview while a chunk is inserted
+        self._shown_parents:set[str] = None
+        # (device type, mdns service) => icon
+        self._device_icons:dict[tuple:object] = {}
+
         self.app_bus = app_bus
         self.app_bus.add_event_handler(AppBusEventType.DEVICE_SCAN_STATUS, self.device_scan_status_handler)
         self.app_bus.add_event_handler(AppBusEventType.UPDATE_DEVICE_REPRESENTATION, self.update_device_representation_handler)
         self.app_bus.add_event_handler(AppBusEventType.UPDATE_SENSOR_REPRESENTATION, self.update_sensor_representation_handler)
+        self.app_bus.add_event_handler(AppBusEventType.UPDATE_DEVICES_REPRESENTATION, self.update_devices)
         self.app_bus.add_event_handler(AppBusEventType.LOAD_FILE, self._reset)
         self.app_bus.add_event_handler(AppBusEventType.SET_DATA_TABLE_FILTER, self._set_data_filter_handler)
         self.app_bus.add_event_handler(AppBusEventType.SERIAL_CALLBACK, self._serial_callback_handler)
@@ -106,7 +124,7 @@ class DeviceTable():
             
         for d in self.data_manager.devices.values():
             parent = self.NON_BUS_DEVICE_LABEL if not d.is_bus_device() else None
-            self.update_device_handler(d, parent)
+            self._queue_device(d, parent)
             
         # Schedule a delayed refresh to ensure all widgets are properly initialized
         # This helps with cross-platform layout issues
@@ -126,15 +144,83 @@ class DeviceTable():
     def _set_data_filter_handler(self, filter):
         self.current_data_filter = filter
 
-        self._reset(None)
-        for d in self.data_manager.devices.values():
-            if d.bus_device:
-                self.update_device_handler(d)
+        # only show and hide the rows which changed instead of rebuilding the whole tree
+        for d in list(self.data_manager.devices.values()):
+            if not self._matches_filter(d):
+                self._hide_device(d.external_id)
+            elif not self.treeview.exists(d.external_id):
+                if d.bus_device:
+                    self._queue_device(d)
+                else:
+                    self._queue_device(d, parent=self.NON_BUS_DEVICE_LABEL)
+
+
+    def _queue_device(self, d:Device, parent:str=None) -> None:
+        """Schedules insert/update of the device so that many devices are added in chunks without blocking the ui."""
+        if d.external_id not in self._pending_devices:
+            self._pending_devices_order.append(d.external_id)
+        self._pending_devices[d.external_id] = (d, parent)
+
+        if self._pending_devices_job is None:
+            self._pending_devices_job = self.treeview.after_idle(self._insert_pending_devices)
+
+
+    def update_devices(self, devices:list[Device]) -> None:
+        """Applies inserts, updates and moves of many devices (bus devices and sensors) at once."""
+        for d in devices:
+            if d.is_bus_device():
+                self._queue_device(d)
             else:
-                self.update_device_handler(d, parent=self.NON_BUS_DEVICE_LABEL)
+                self._queue_device(d, parent=self.NON_BUS_DEVICE_LABEL)
+
+
+    def _insert_pending_devices(self) -> None:
+        self._pending_devices_job = None
+        # parents are only looked up once per chunk
+        self._shown_parents = set()
+        try:
+            for _ in range(min(self.INSERT_CHUNK_SIZE, len(self._pending_devices_order))):
+                d, parent = self._pending_devices.pop(self._pending_devices_order.popleft())
+                # a device which cannot be shown (e.g. gateway is missing) must not stop the other devices
+                try:
+                    self.update_device_handler(d, parent)
+                except Exception:
+                    LOGGER.exception(f"Device '{d.external_id}' cannot be shown in the device table.")
+        finally:
+            self._shown_parents = None
+
+        # give tk the chance to redraw before the next chunk
+        if len(self._pending_devices_order) > 0:
+            self._pending_devices_job = self.treeview.after(1, self._insert_pending_devices)
+
+
+    def _matches_filter(self, d:Device) -> bool:
+        return self.current_data_filter is None or self.data_manager.filter_device(self.current_data_filter, d)
+
+
+    def _hide_device(self, external_id:str) -> None:
+        """Removes the row of a filtered out device. Gateways are kept as long as they contain shown devices."""
+        if not self.treeview.exists(external_id) or len(self.treeview.get_children(external_id)) > 0:
+            return
+
+        parent = self.treeview.parent(external_id)
+        self.treeview.delete(external_id)
+        if self._shown_parents is not None:
+            self._shown_parents.discard(external_id)
+
+        # remove gateway which was only shown because of its devices
+        parent_device = self.data_manager.devices.get(parent, None)
+        if parent_device is not None and not self._matches_filter(parent_device):
+            self._hide_device(parent)
 
 
     def _reset(self, data):
+        if self._pending_devices_job is not None:
+            self.treeview.after_cancel(self._pending_devices_job)
+            self._pending_devices_job = None
+        self._pending_devices.clear()
+        self._pending_devices_order.clear()
+
         for item in self.treeview.get_children():
             self.treeview.delete(item)
         self.check_if_wireless_network_exists()
@@ -220,13 +306,37 @@ class DeviceTable():
                                  open=True)
 
 
+    def _get_device_icon(self, d:Device):
+        """Returns the icon of the device which is selected once per device type."""
+        key = (d.device_type, d.additional_fields.get('mdns_service', None))
+        image = self._device_icons.get(key, None)
+        if image is None:
+            if d.is_usb300():
+                image = ImageGallery.get_usb300_icon(self.ICON_SIZE)
+            elif d.is_fam_usb():
+                image = ImageGallery.get_fam_usb_icon(self.ICON_SIZE)
+            elif d.is_fgw14_usb():
+                image = ImageGallery.get_fgw14_usb_icon(self.ICON_SIZE)
+            elif d.is_ftd14():
+                image = ImageGallery.get_ftd14_icon(self.ICON_SIZE)
+            elif d.is_EUL_Wifi_gw():
+                image = ImageGallery.get_eul_gateway_icon(self.ICON_SIZE)
+            elif d.is_mgw():
+                image = ImageGallery.get_mgw_piotek_icon(self.ICON_SIZE)
+            else:
+                image = ImageGallery.get_blank(self.ICON_SIZE)
+            self._device_icons[key] = image
+        return image
+
+
     def update_device_representation_handler(self, device:Device):
         if device.bus_device and not device.is_bus_device():
             device.bus_device = False
-        self.update_device_handler(device)
+        self._queue_device(device)
 
     def update_device_handler(self, d:Device, parent:str=None):
-        if self.current_data_filter is not None and not self.current_data_filter.filter_device(d):
+        if not self._matches_filter(d):
+            self._hide_device(d.external_id)
             return
 
         if not d.is_fam14():
@@ -238,26 +348,15 @@ class DeviceTable():
             comment = "" if d.comment is None else d.comment
             sender_adr = "" if 'sender' not in d.additional_fields else d.additional_fields['sender'][CONF_ID]
             sender_eep = "" if 'sender' not in d.additional_fields else d.additional_fields['sender'][CONF_EEP]
-            
-            if d.is_usb300():
-                image = ImageGallery.get_usb300_icon(self.ICON_SIZE)
-            elif d.is_fam_usb():
-                image = ImageGallery.get_fam_usb_icon(self.ICON_SIZE)
-            elif d.is_fgw14_usb():
-                image = ImageGallery.get_fgw14_usb_icon(self.ICON_SIZE)
-            elif d.is_ftd14():
-                image = ImageGallery.get_ftd14_icon(self.ICON_SIZE)
-            elif d.is_EUL_Wifi_gw():
-                image = ImageGallery.get_eul_gateway_icon(self.ICON_SIZE)
-            elif d.is_mgw():
-                image = ImageGallery.get_mgw_piotek_icon(self.ICON_SIZE)
-            else:
-                image = ImageGallery.get_blank(self.ICON_SIZE)
+            image = self._get_device_icon(d)
 
             _parent = d.base_id if parent is None else parent
             
-            if not self.treeview.exists(_parent): 
-                self.add_fam14(self.data_manager.devices[_parent])
+            if self._shown_parents is None or _parent not in self._shown_parents:
+                if not self.treeview.exists(_parent): 
+                    self.add_fam14(self.data_manager.devices[_parent])
+                if self._shown_parents is not None:
+                    self._shown_parents.add(_parent)
                 
             if not self.treeview.exists(d.external_id):
                 try:
@@ -266,15 +365,8 @@ class DeviceTable():
                                          iid=d.external_id, 
                                          text=" " + d.name, 
                                          values=(d.address, d.external_id, device_type, key_func, comment, in_ha, ha_pl, eep, sender_adr, sender_eep), 
+                                         image=image,
                                          open=True)
-                    self.treeview.item(d.external_id, image=image)
-                    
-                    # Debug: Check if the item is actually in the treeview
-                    items = self.treeview.get_children()
-                    all_items = []
-                    # Force treeview update and refresh
-                    self.treeview.update()
-                    self.treeview.update_idletasks()
                 except Exception as e:
                     print(f"ERROR: DeviceTable.update_device_handler - Failed to add device {d.external_id} to treeview: {e}")
             else:
@@ -312,37 +404,42 @@ class DeviceTable():
     def trigger_blinking(self, external_id:str):
         if not self.blinking_enabled:
             return
-        
-        def blink(ext_id:str):
-            for i in range(0,2):
-                if self.treeview.exists(ext_id):
-                    tags = self.treeview.item(ext_id)['tags']
-                    if 'blinking' in tags:
-                        if isinstance(tags, str):
-                            self.treeview.item(ext_id, tags=() )
-                        else:
-                            tags.remove('blinking')
-                            self.treeview.item(ext_id, tags=tags )
-                    else:
-                        if isinstance(tags, str):
-                            self.treeview.item(ext_id, tags=('blinking') )
-                        else:
-                            tags.append('blinking')
-                            self.treeview.item(ext_id, tags=tags )
-                    time.sleep(.5)
-
-            if self.treeview.exists(ext_id):
-                tags = self.treeview.item(ext_id)['tags']
-                if 'blinking' in tags:
-                    if isinstance(tags, str):
-                        self.treeview.item(ext_id, tags=() )
-                    else:
-                        tags.remove('blinking')
-                        self.treeview.item(ext_id, tags=tags )
-
-        t = threading.Thread(target=lambda ext_id=external_id: blink(ext_id))
-        t.start()
+
+        # repeated telegrams of the same device extend the ongoing blink
+        if external_id not in self._blink_deadlines:
+            self._set_blinking_tag(external_id, True)
+        self._blink_deadlines[external_id] = time.monotonic() + self.BLINK_DURATION
+
+        if self._blink_job is None:
+            self._blink_job = self.treeview.after(int(self.BLINK_DURATION * 1000), self._blink_tick)
+
+
+    def _blink_tick(self):
+        self._blink_job = None
+        now = time.monotonic()
+        for ext_id in [i for i, deadline in self._blink_deadlines.items() if deadline <= now]:
+            del self._blink_deadlines[ext_id]
+            self._set_blinking_tag(ext_id, False)
+
+        if len(self._blink_deadlines) > 0:
+            delay = min(self._blink_deadlines.values()) - now
+            self._blink_job = self.treeview.after(max(1, int(delay * 1000)), self._blink_tick)
+
+
+    def _set_blinking_tag(self, external_id:str, blinking:bool):
+        if not self.treeview.exists(external_id):
+            return
+        tags = self.treeview.item(external_id)['tags']
+        # tk returns an empty string if no tags are set
+        tags = ([tags] if tags else []) if isinstance(tags, str) else list(tags)
+        if blinking and 'blinking' not in tags:
+            tags.append('blinking')
+        elif not blinking and 'blinking' in tags:
+            tags.remove('blinking')
+        else:
+            return
+        self.treeview.item(external_id, tags=tags)
 
 
     def update_sensor_representation_handler(self, d:Device):
-        self.update_device_handler(d, parent=self.NON_BUS_DEVICE_LABEL)
\ No newline at end of file
+        self._queue_device(d, parent=self.NON_BUS_DEVICE_LABEL)
\ No newline at end of file
@@ -1,3 +1,4 @@
+from collections import deque
 from datetime import datetime
 import tkinter as tk
 from tkinter import *
@@ -13,8 +14,72 @@ from ..data.data_helper import b2s, a2s
 from ..data.data_manager import DataManager
 from ..controller.app_bus import AppBus, AppBusEventType
 
+class TelegramLogRecord():
+    """Received telegram shown in the log. The displayed parts are computed when they are shown for the first time."""
+
+    __slots__ = ('telegram', 'base_id', 'rendered_options', '_text', '_values', '_esp2', '_esp3')
+
+    def __init__(self, telegram:EltakoMessage, base_id:str) -> None:
+        self.telegram:EltakoMessage = telegram
+        self.base_id:str = base_id
+        # display options the line in the log was formatted with, None if only the short text is shown
+        self.rendered_options:tuple = None
+        self._text:str = None
+        self._values:str = None
+        self._esp2:str = None
+        self._esp3:str = None
+
+    def get_text(self) -> str:
+        if self._text is None:
+            telegram = self.telegram
+            tt = type(telegram).__name__
+            adr = str(telegram.address) if isinstance(telegram.address, int) else b2s(telegram.address)
+            if hasattr(telegram, 'reported_address'):
+                adr = telegram.reported_address
+            payload = ''
+            if hasattr(telegram, 'data'):
+                payload += ', data: '+b2s(telegram.data)
+            elif hasattr(telegram, 'payload'):
+                payload += ', payload: '+b2s(telegram.payload)
+            
+            if hasattr(telegram, 'status'):
+                payload += ', status: '+ a2s(telegram.status, 1)
+
+            self._text = f"Received Telegram: {tt} from {adr}{payload}"
+        return self._text
+
+    def get_values(self, data_manager:DataManager) -> str:
+        if self._values is None:
+            eep, values = data_manager.get_values_from_message_to_string(self.telegram, self.base_id)
+            if eep is not None: 
+                if values is not None:
+                    values = f" => values for EEP {eep.__name__}: ({values})"
+                else:
+                    values = f" => No matching value for EEP {eep.__name__}"
+            else:
+                values = ''
+            self._values = values
+        return self._values
+
+    def get_esp2(self) -> str:
+        if self._esp2 is None:
+            self._esp2 = f", ESP2: {self.telegram.serialize().hex()}"
+        return self._esp2
+
+    def get_esp3(self) -> str:
+        if self._esp3 is None:
+            self._esp3 = f", ESP3: { ''.join(f'{num:02x}' for num in ESP3SerialCommunicator.convert_esp2_to_esp3_message(self.telegram).build())}"
+        return self._esp3
+
+
 class LogOutputPanel():
 
+    # lines kept in the text widget, older lines are removed
+    MAX_LINES:int = 5000
+    # milliseconds in which received messages are collected and written at once
+    FLUSH_INTERVAL:int = 100
+    TIME_FORMAT:str = "%Y-%m-%d %H:%M:%S.%f"
+
     def __init__(self, main: Tk, app_bus:AppBus, data_manager:DataManager):
         self.app_bus = app_bus
         self.data_manager = data_manager
@@ -33,15 +98,15 @@ class LogOutputPanel():
         # self.e_search.pack(side=LEFT, padx=(2,0))
 
         self.show_telegram_values = tk.BooleanVar(value=True)
-        cb_show_values = ttk.Checkbutton(tool_bar, text="Show Telegram Values", variable=self.show_telegram_values)
+        cb_show_values = ttk.Checkbutton(tool_bar, text="Show Telegram Values", variable=self.show_telegram_values, command=self.rerender_telegrams)
         cb_show_values.pack(side=LEFT, padx=(2,0))
 
         self.show_esp2_binary =tk.BooleanVar(value=False)
-        cb_show_es2_binary = ttk.Checkbutton(tool_bar, text="Show ESP2 Binary", variable=self.show_esp2_binary)
+        cb_show_es2_binary = ttk.Checkbutton(tool_bar, text="Show ESP2 Binary", variable=self.show_esp2_binary, command=self.rerender_telegrams)
         cb_show_es2_binary.pack(side=LEFT, padx=(2,0))
 
         self.show_esp3_binary =tk.BooleanVar(value=False)
-        cb_show_es3_binary = ttk.Checkbutton(tool_bar, text="Show ESP3 Binary", variable=self.show_esp3_binary)
+        cb_show_es3_binary = ttk.Checkbutton(tool_bar, text="Show ESP3 Binary", variable=self.show_esp3_binary, command=self.rerender_telegrams)
         cb_show_es3_binary.pack(side=LEFT, padx=(2,0))
 
         self.st = ScrolledText.ScrolledText(pane, border=3,  height=150, 
@@ -49,8 +114,18 @@ class LogOutputPanel():
                                             font=('Arial', 14), padx=5, pady=5)
         self.st.configure(font='TkFixedFont')
         self.st.pack(expand=True, fill=BOTH)
+        # telegrams are completely formatted when they are scrolled into view
+        self.st.configure(yscrollcommand=self._on_scrolled)
         # self.st.grid(row=2, column=0, sticky="nsew", columnspan=3)
 
+        # (received time, message or TelegramLogRecord, color) not yet written into the text widget
+        self._pending_lines:deque[tuple] = deque(maxlen=self.MAX_LINES)
+        self._flush_job = None
+        # entry of each line in the text widget, None for following lines of messages with line breaks
+        self._lines:deque[tuple] = deque()
+        self._render_job = None
+        self._color_tags:set[str] = set()
+
         app_bus.add_event_handler(AppBusEventType.SERIAL_CALLBACK, self.serial_callback)
         app_bus.add_event_handler(AppBusEventType.LOG_MESSAGE, self.receive_log_message)
 
@@ -68,55 +143,116 @@ class LogOutputPanel():
             pass
 
         if filter:
-            tt = type(telegram).__name__
-            adr = str(telegram.address) if isinstance(telegram.address, int) else b2s(telegram.address)
-            if hasattr(telegram, 'reported_address'):
-                adr = telegram.reported_address
-            payload = ''
-            if hasattr(telegram, 'data'):
-                payload += ', data: '+b2s(telegram.data)
-            elif hasattr(telegram, 'payload'):
-                payload += ', payload: '+b2s(telegram.payload)
-            
-            if hasattr(telegram, 'status'):
-                payload += ', status: '+ a2s(telegram.status, 1)
+            # telegram is only formatted when it becomes visible
+            self._add_line(TelegramLogRecord(telegram, current_base_id), 'darkgrey')
+
+
+    def _get_display_options(self) -> tuple:
+        return (self.show_telegram_values.get(), self.show_esp2_binary.get(), self.show_esp3_binary.get())
 
-            values = ''
-            eep, values = self.data_manager.get_values_from_message_to_string(telegram, current_base_id)
-            if eep is not None: 
-                if values is not None:
-                    values = f" => values for EEP {eep.__name__}: ({values})"
-                else:
-                    values = f" => No matching value for EEP {eep.__name__}"
-            else:
-                values = ''
 
-            display_values:str = values if self.show_telegram_values.get() else ''
-            display_esp2:str = f", ESP2: {telegram.serialize().hex()}" if self.show_esp2_binary.get() else ''
-            display_esp3:str = f", ESP3: { ''.join(f'{num:02x}' for num in ESP3SerialCommunicator.convert_esp2_to_esp3_message(telegram).build())}" if self.show_esp3_binary.get() else ''
+    def format_telegram(self, record:TelegramLogRecord) -> str:
+        display_values:str = record.get_values(self.data_manager) if self.show_telegram_values.get() else ''
+        display_esp2:str = record.get_esp2() if self.show_esp2_binary.get() else ''
+        display_esp3:str = record.get_esp3() if self.show_esp3_binary.get() else ''
 
-            display_msg = f"Received Telegram: {tt} from {adr}{payload}{display_values}{display_esp2}{display_esp3}"
-            self.receive_log_message({'msg': display_msg, 'color': 'darkgrey'})
+        return f"{record.get_text()}{display_values}{display_esp2}{display_esp3}"
 
 
     def receive_log_message(self, data):
         msg = data.get('msg', False)
         if not msg: return
 
-        # time_format = "%d.%b %Y %H:%M:%S"
-        time_format = "%Y-%m-%d %H:%M:%S.%f"
-        time_str = datetime.now().strftime(time_format)
-        msg = f"{time_str}: {msg}"
+        self._add_line(msg, data.get('color', False))
+
+
+    def _add_line(self, msg, color:str) -> None:
+        self._pending_lines.append((datetime.now(), msg, color))
+        if self._flush_job is None:
+            self._flush_job = self.st.after(self.FLUSH_INTERVAL, self._flush)
+
+
+    def _get_color_tag(self, color:str) -> str:
+        tag = 'mark_'+color
+        if tag not in self._color_tags:
+            self.st.tag_config(tag, foreground=color)
+            self._color_tags.add(tag)
+        return tag
+
+
+    def _format_line(self, entry:tuple, options:tuple=None) -> str:
+        """Telegrams are formatted completely if the current display options are given, otherwise only the short text is returned."""
+        time, msg, color = entry
+        if isinstance(msg, TelegramLogRecord):
+            msg.rendered_options = options
+            msg = self.format_telegram(msg) if options is not None else msg.get_text()
+        return f"{time.strftime(self.TIME_FORMAT)}: {msg}"
+
+
+    def _flush(self) -> None:
+        """Writes all pending lines with one insert into the text widget and removes the oldest lines."""
+        self._flush_job = None
+        if len(self._pending_lines) == 0:
+            return
+
+        # telegrams are written as short text and formatted completely when they are visible,
+        # the short text is already complete if no additional parts are shown
+        options = self._get_display_options()
+        if any(options):
+            options = None
+
+        args = []
+        for entry in self._pending_lines:
+            text = self._format_line(entry, options)
+            args.append(text + '\n')
+            args.append(self._get_color_tag(entry[2]) if entry[2] else ())
+
+            self._lines.append(entry)
+            for _ in range(text.count('\n')):
+                self._lines.append(None)
+        self._pending_lines.clear()
 
         self.st.configure(state='normal')
-        self.st.insert(tk.END, msg + '\n')
+        self.st.insert(tk.END, *args)
+        excess = len(self._lines) - self.MAX_LINES
+        if excess > 0:
+            self.st.delete('1.0', f"{excess + 1}.0")
+            for _ in range(excess):
+                self._lines.popleft()
         self.st.configure(state='disabled')
         
-        color = data.get('color', False)
-        if color:
-            final_index = str(self.st.index(tk.END))
-            num_of_lines = int(final_index.split('.')[0])-2
-            self.st.tag_config('mark_'+color, foreground=color)
-            self.st.tag_add('mark_'+color, f"{num_of_lines}.0", f"{num_of_lines}.{len(msg)}")
-        
-        self.st.yview(tk.END)
\ No newline at end of file
+        self.st.yview(tk.END)
+        self._render_visible_lines()
+        # completely formatted lines can wrap and push the last line out of view
+        self.st.yview(tk.END)
+
+
+    def _on_scrolled(self, first, last) -> None:
+        self.st.vbar.set(first, last)
+        if self._render_job is None:
+            self._render_job = self.st.after_idle(self._render_visible_lines)
+
+
+    def rerender_telegrams(self) -> None:
+        """Applies changed display options. Only the visible lines are updated, all other lines when they are scrolled into view."""
+        self._render_visible_lines()
+
+
+    def _render_visible_lines(self) -> None:
+        """Formats all visible telegrams which are not shown with the current display options."""
+        if self._render_job is not None:
+            self.st.after_cancel(self._render_job)
+            self._render_job = None
+
+        options = self._get_display_options()
+        first = int(self.st.index('@0,0').split('.')[0])
+        last = min(int(self.st.index(f"@0,{self.st.winfo_height()}").split('.')[0]), len(self._lines))
+
+        self.st.configure(state='normal')
+        for i in range(max(first, 1), last+1):
+            entry = self._lines[i-1]
+            if entry is None or not isinstance(entry[1], TelegramLogRecord) or entry[1].rendered_options == options:
+                continue
+            self.st.delete(f"{i}.0", f"{i}.end")
+            self.st.insert(f"{i}.0", self._format_line(entry, options), self._get_color_tag(entry[2]) if entry[2] else ())
+        self.st.configure(state='disabled')
@@ -5,17 +5,21 @@ import threading
 from tkinter import *
 from tkinter import ttk
 from tkinter import filedialog
+from tkinter import simpledialog
 import logging
 from tkinter import messagebox
 import webbrowser
 
 from ..controller.app_bus import AppBus, AppBusEventType
 from ..controller.serial_controller import SerialController
+from ..controller.telegram_replay import TelegramReplayEngine
 
 from ..data.device import Device
 from ..data.data_manager import DataManager
+from ..data.application_data_store import ApplicationDataStore
 from ..data.ha_config_generator import HomeAssistantConfigurationGenerator
 from ..data.pct14_data_manager import PCT14DataManager
+from ..data.telegram_journal import TelegramJournal
 
 from ..icons.image_gallary import ImageGallery
 
@@ -27,6 +31,9 @@ from . import DEFAULT_WINDOW_TITLE
 
 class MenuPresenter():
 
+    # interval in ms in which changed application data is saved into the latest loaded or saved file
+    AUTOSAVE_INTERVAL:int = 60000
+
     def __init__(self, main: Tk, app_bus: AppBus, data_manager: DataManager, serial_controller:SerialController):
         self.main = main
         self.app_bus = app_bus
@@ -36,6 +43,7 @@ class MenuPresenter():
         self.remember_latest_filename = ""
 
         self.send_message_window = None
+        self.replay_engine:TelegramReplayEngine = None
 
         menu_bar = Menu(main)
         file_menu = Menu(menu_bar, tearoff=False)
@@ -116,6 +124,17 @@ class MenuPresenter():
                               command=self.show_send_message_window)
         tool_menu.add_command(label="Message Log Analyser", 
                               command=lambda: messagebox.showinfo("Message Log Analyser", "Will be available soon!"))
+        tool_menu.add_separator()
+        tool_menu.add_command(label="Replay Telegram Journal...",
+                              command=self.replay_telegram_journal)
+        tool_menu.add_command(label="Stop Replay",
+                              command=self.stop_replay)
+        self.profile_event_handlers = BooleanVar(value=self.app_bus.is_profiling_enabled())
+        tool_menu.add_checkbutton(label="Profile Event Handlers",
+                                  variable=self.profile_event_handlers,
+                                  command=self.toggle_event_handler_profiling)
+        tool_menu.add_command(label="Show Event Handler Profile",
+                              command=self.show_event_handler_profile)
 
         help_menu = Menu(menu_bar, tearoff=False)
         menu_bar.add_cascade(label="Help", menu=help_menu)
@@ -174,6 +193,8 @@ class MenuPresenter():
         main.bind('<Control-s>', lambda e: self.save_file())
         main.bind('<Control-Shift-S>', lambda e: self.save_file(save_as=True))
         main.bind('<F1>', lambda e: AboutWindow(main))
+
+        self.main.after(self.AUTOSAVE_INTERVAL, self.autosave)
         
 
 
@@ -193,20 +214,43 @@ class MenuPresenter():
                     filename += '.eodm'
                 self.remember_latest_filename = filename
 
-            self.data_manager.write_application_data_to_file(self.remember_latest_filename)
+            # file is written in the background
+            self.data_manager.write_application_data_to_file_async(self.remember_latest_filename, self._on_file_saved)
             # with open(self.remember_latest_filename, 'wb') as file:
             #     pickle.dump( self.data_manager.devices, file)
             
             self.main.title(f"{DEFAULT_WINDOW_TITLE} ({os.path.basename(self.remember_latest_filename)})")
-            self.app_bus.fire_event(AppBusEventType.LOG_MESSAGE, {'msg': f"Save to File: '{self.remember_latest_filename}'", 'color': 'red'})
 
         except Exception as e:
+            self._on_file_saved(self.remember_latest_filename, e)
+
+
+    def _on_file_saved(self, filename:str, exception:Exception, autosave:bool=False):
+        # called by the save worker thread, log messages are passed to the main thread by the app bus
+        if exception is None:
+            # successful autosaves are not logged because received telegrams change the data permanently
+            if not autosave:
+                self.app_bus.fire_event(AppBusEventType.LOG_MESSAGE, {'msg': f"Save to File: '{filename}'", 'color': 'red'})
+        else:
             msg = f"Saving application configuration to file '{filename}' failed!"
             self.app_bus.fire_event(AppBusEventType.LOG_MESSAGE, {'msg': msg, 'log-level': 'ERROR', 'color': 'red'})
-            logging.exception(msg, exc_info=True)
+            logging.error(msg, exc_info=exception)
+
+
+    def autosave(self):
+        """Saves changed application data into the latest loaded or saved file and schedules the next autosave."""
+        try:
+            # files in the previous yaml format are only replaced by an explicit save
+            if ApplicationDataStore.is_store_file(self.remember_latest_filename) and self.data_manager.is_dirty():
+                self.data_manager.write_application_data_to_file_async(self.remember_latest_filename, 
+                                                                        lambda f, e: self._on_file_saved(f, e, autosave=True))
+        except Exception as e:
+            self._on_file_saved(self.remember_latest_filename, e, autosave=True)
+
+        self.main.after(self.AUTOSAVE_INTERVAL, self.autosave)
 
 
-    def import_from_file(self):
+    def import_from_file(self, reset:bool=False):
         filename = None
         
         if not self.remember_latest_filename:
@@ -221,9 +265,14 @@ class MenuPresenter():
         if not filename:
             return None
 
+        # autosave must not write the reset or partially loaded data into the file
+        self.data_manager.begin_loading()
+        if reset:
+            self.app_bus.fire_event(AppBusEventType.LOAD_FILE, {})
+
         def load():
             try:
-                self.data_manager.load_application_data_from_file(filename)
+                self.data_manager.load_application_data_from_file(filename, mark_as_saved=reset)
                 # with open(filename, 'rb') as file:
                 #     self.data_manager.load_devices( pickle.load(file) )
             except Exception as e:
@@ -239,10 +288,12 @@ class MenuPresenter():
         
     def load_file(self, filename:str=None):
         if filename == None:
-            filename = self.import_from_file()
+            # data is reset before loading starts
+            filename = self.import_from_file(reset=True)
+        elif filename:
+            self.app_bus.fire_event(AppBusEventType.LOAD_FILE, {})
 
         if filename:
-            self.app_bus.fire_event(AppBusEventType.LOAD_FILE, {})
             self.remember_latest_filename = filename
 
             self.main.title(f"{DEFAULT_WINDOW_TITLE} ({os.path.basename(self.remember_latest_filename)})")
@@ -308,9 +359,61 @@ class MenuPresenter():
                         s = Device.get_decentralized_device_by_sensor_info(me, d.base_id)
                         if s.external_id in self.data_manager.devices:
                             Device.merge_devices(self.data_manager.devices[s.external_id], s)
+                            self.data_manager.devices.touch()
                             self.app_bus.fire_event(AppBusEventType.UPDATE_SENSOR_REPRESENTATION, s)
 
 
+    def toggle_event_handler_profiling(self):
+        if self.profile_event_handlers.get():
+            self.app_bus.enable_profiling()
+            msg = "Profiling of event handlers enabled."
+        else:
+            self.app_bus.disable_profiling()
+            msg = "Profiling of event handlers disabled."
+        self.app_bus.fire_event(AppBusEventType.LOG_MESSAGE, {'msg': msg, 'color': 'grey'})
+
+
+    def show_event_handler_profile(self):
+        self.app_bus.fire_event(AppBusEventType.LOG_MESSAGE, {'msg': self.app_bus.get_profiling_report(), 'log-level': 'INFO'})
+
+
+    def replay_telegram_journal(self):
+        if self.replay_engine is not None and self.replay_engine.is_running():
+            messagebox.showinfo("Replay Telegram Journal", "Replay is already running.")
+            return
+
+        if self.serial_controller.is_serial_connection_active():
+            messagebox.showwarning("Replay Telegram Journal", "Telegrams cannot be replayed while a gateway is connected.")
+            return
+
+        initial_dir = os.path.dirname(self.remember_latest_filename) if self.remember_latest_filename else os.path.expanduser('~')
+        filename = filedialog.askopenfilename(initialdir=initial_dir,
+                                              title="Replay Telegram Journal",
+                                              filetypes=[("Telegram Journal", "*"+TelegramJournal.FILE_EXTENSION)],
+                                              defaultextension=TelegramJournal.FILE_EXTENSION)
+        if not filename:
+            return
+
+        speed = simpledialog.askfloat("Replay Speed", "Speed factor (1 = original timing, 0 = as fast as possible):", 
+                                      initialvalue=1.0, minvalue=0.0)
+        if speed is None:
+            return
+
+        try:
+            self.replay_engine = TelegramReplayEngine(self.app_bus, self.serial_controller, TelegramJournal(filename))
+            self.replay_engine.start(speed=speed)
+            self.app_bus.fire_event(AppBusEventType.LOG_MESSAGE, {'msg': f"Replay telegrams of '{filename}' (speed: {speed:g})", 'color': 'red'})
+        except Exception as e:
+            msg = f"Replay of telegram journal '{filename}' failed!"
+            self.app_bus.fire_event(AppBusEventType.LOG_MESSAGE, {'msg': msg, 'log-level': 'ERROR', 'color': 'red'})
+            logging.exception(msg, exc_info=True)
+
+
+    def stop_replay(self):
+        if self.replay_engine is not None:
+            self.replay_engine.stop()
+
+
     def open_eo_man_repo(self):
         webbrowser.open_new(r"https://github.com/grimmpp/enocean-device-manager")
         
@@ -102,6 +102,7 @@ class SerialConnectionBar():
         self.app_bus.add_event_handler(AppBusEventType.WINDOW_LOADED, self.on_window_loaded)
         self.app_bus.add_event_handler(AppBusEventType.UPDATE_DEVICE_REPRESENTATION, self.update_cb_gateways_for_HA)
         self.app_bus.add_event_handler(AppBusEventType.UPDATE_SENSOR_REPRESENTATION, self.update_cb_gateways_for_HA)
+        self.app_bus.add_event_handler(AppBusEventType.UPDATE_DEVICES_REPRESENTATION, self.update_cb_gateways_for_HA)
         self.app_bus.add_event_handler(AppBusEventType.SERVICE_ENDPOINTS_UPDATES, self.update_service_endpoints)
         
 
@@ -0,0 +1,251 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from eo_man import load_dep_homeassistant
+load_dep_homeassistant()
+
+from eo_man.controller.app_bus import AppBus, AppBusEventType, AppBusCoalescingPolicy
+
+
+class TkRootMock():
+
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, delay, callback):
+        self.scheduled.append((delay, callback))
+
+
+class DeviceMock():
+
+    def __init__(self, external_id:str):
+        self.external_id = external_id
+
+
+class TestAppBus(unittest.TestCase):
+
+    def setUp(self):
+        self.app_bus = AppBus(batched_dispatch=True)
+        self.handler_ids = []
+
+    def tearDown(self):
+        for h_id in self.handler_ids:
+            self.app_bus.remove_event_handler_by_id(h_id)
+
+    def add_handler(self, event:AppBusEventType, handler):
+        self.handler_ids.append( self.app_bus.add_event_handler(event, handler) )
+
+    def fire_from_background_thread(self, events:list):
+        def fire():
+            for event, data in events:
+                self.app_bus.fire_event(event, data)
+        t = threading.Thread(target=fire)
+        t.start()
+        t.join()
+
+    def test_coalescing_of_queued_events(self):
+        progress = []
+        sensors = []
+        self.add_handler(AppBusEventType.DEVICE_ITERATION_PROGRESS, progress.append)
+        self.add_handler(AppBusEventType.UPDATE_SENSOR_REPRESENTATION, sensors.append)
+
+        d1, d2, d1_updated = DeviceMock('FF-00-00-01'), DeviceMock('FF-00-00-02'), DeviceMock('FF-00-00-01')
+        self.fire_from_background_thread([
+            (AppBusEventType.DEVICE_ITERATION_PROGRESS, 10.0),
+            (AppBusEventType.UPDATE_SENSOR_REPRESENTATION, d1),
+            (AppBusEventType.DEVICE_ITERATION_PROGRESS, 20.0),
+            (AppBusEventType.UPDATE_SENSOR_REPRESENTATION, d2),
+            (AppBusEventType.UPDATE_SENSOR_REPRESENTATION, d1_updated),
+            (AppBusEventType.DEVICE_ITERATION_PROGRESS, 30.0),
+        ])
+
+        self.app_bus._tk_root = TkRootMock()
+        self.app_bus._process_event_queue()
+
+        self.assertEqual(progress, [30.0])
+        self.assertEqual(sensors, [d1_updated, d2])
+
+    def test_wait_for_queued_events(self):
+        self.fire_from_background_thread([(AppBusEventType.DEVICE_ITERATION_PROGRESS, 10.0)])
+        # nothing processes the queue without tk root
+        self.assertFalse(self.app_bus.wait_for_queued_events())
+
+        self.app_bus._tk_root = TkRootMock()
+        self.assertFalse(self.app_bus.wait_for_queued_events(timeout=0.05))
+        self.app_bus._process_event_queue()
+        self.assertTrue(self.app_bus.wait_for_queued_events(timeout=0))
+
+    def test_no_coalescing_without_policy(self):
+        received = []
+        self.add_handler(AppBusEventType.DEVICE_ITERATION_PROGRESS, received.append)
+        self.app_bus.set_coalescing_policy(AppBusEventType.DEVICE_ITERATION_PROGRESS, AppBusCoalescingPolicy.NONE)
+
+        self.fire_from_background_thread([(AppBusEventType.DEVICE_ITERATION_PROGRESS, float(i)) for i in range(5)])
+
+        self.app_bus._tk_root = TkRootMock()
+        self.app_bus._process_event_queue()
+
+        self.assertEqual(received, [0.0, 1.0, 2.0, 3.0, 4.0])
+
+    def test_time_budget_per_tick(self):
+        received = []
+        self.add_handler(AppBusEventType.DEVICE_ITERATION_PROGRESS, received.append)
+        self.app_bus.set_coalescing_policy(AppBusEventType.DEVICE_ITERATION_PROGRESS, AppBusCoalescingPolicy.NONE)
+        # budget is always exceeded after the first event
+        self.app_bus.tick_time_budget = 0
+
+        self.fire_from_background_thread([(AppBusEventType.DEVICE_ITERATION_PROGRESS, float(i)) for i in range(3)])
+
+        tk_root = TkRootMock()
+        self.app_bus._tk_root = tk_root
+        self.app_bus._process_event_queue()
+        self.assertEqual(received, [0.0])
+        # next tick is scheduled immediately because events are left
+        self.assertEqual(tk_root.scheduled[-1][0], 1)
+
+        self.app_bus._process_event_queue()
+        self.app_bus._process_event_queue()
+        self.assertEqual(received, [0.0, 1.0, 2.0])
+        self.assertEqual(tk_root.scheduled[-1][0], 10)
+
+    def test_bounded_queue_drop_policies(self):
+        self.app_bus = AppBus(batched_dispatch=True, max_queue_size=2, backpressure_timeout=0.01)
+        connection_changes = []
+        self.add_handler(AppBusEventType.CONNECTION_STATUS_CHANGE, connection_changes.append)
+
+        self.fire_from_background_thread([
+            (AppBusEventType.LOG_MESSAGE, {'msg': 'a'}),
+            (AppBusEventType.LOG_MESSAGE, {'msg': 'b'}),
+            (AppBusEventType.LOG_MESSAGE, {'msg': 'c'}),
+            (AppBusEventType.SERIAL_CALLBACK, {}),
+            (AppBusEventType.CONNECTION_STATUS_CHANGE, {'connected': True}),
+        ])
+        self.assertTrue(self.app_bus.is_saturated())
+
+        stats = self.app_bus.get_event_statistics()
+        self.assertEqual(stats[AppBusEventType.LOG_MESSAGE].enqueued, 2)
+        self.assertEqual(stats[AppBusEventType.LOG_MESSAGE].dropped, 1)
+        self.assertEqual(stats[AppBusEventType.SERIAL_CALLBACK].dropped, 1)
+        self.assertEqual(stats[AppBusEventType.CONNECTION_STATUS_CHANGE].dropped, 0)
+
+        self.app_bus._tk_root = TkRootMock()
+        self.app_bus._process_event_queue()
+
+        self.assertEqual(connection_changes, [{'connected': True}])
+        self.assertEqual(self.app_bus.get_queue_size(), 0)
+        stats = self.app_bus.get_event_statistics()
+        self.assertEqual(stats[AppBusEventType.LOG_MESSAGE].processed, 2)
+        self.assertEqual(stats[AppBusEventType.CONNECTION_STATUS_CHANGE].processed, 1)
+
+    def test_bounded_queue_with_slow_handler(self):
+        self.app_bus = AppBus(batched_dispatch=True, tick_time_budget=0.001, max_queue_size=10, backpressure_timeout=0.01)
+        self.app_bus._tk_root = TkRootMock()
+        self.add_handler(AppBusEventType.LOG_MESSAGE, lambda data: time.sleep(0.002))
+
+        for _ in range(5):
+            self.fire_from_background_thread([(AppBusEventType.LOG_MESSAGE, {'msg': str(i)}) for i in range(50)])
+            self.assertTrue(self.app_bus.is_saturated())
+            self.app_bus._process_event_queue()
+
+        # pending events and queue are bounded, events are dropped instead
+        self.assertLessEqual(self.app_bus.get_queue_size(), 20)
+        self.assertGreater(self.app_bus.get_event_statistics()[AppBusEventType.LOG_MESSAGE].dropped, 0)
+
+
+    def test_order_of_events_which_are_never_dropped(self):
+        for batched_dispatch in [True, False]:
+            self.app_bus = AppBus(batched_dispatch=batched_dispatch, max_queue_size=2, backpressure_timeout=0.01)
+            processed = []
+            self.add_handler(AppBusEventType.CONNECTION_STATUS_CHANGE, lambda data: processed.append(data['status']))
+            self.add_handler(AppBusEventType.LOG_MESSAGE, lambda data: processed.append(data['msg']))
+
+            self.fire_from_background_thread([
+                (AppBusEventType.CONNECTION_STATUS_CHANGE, {'status': 'connected'}),
+                (AppBusEventType.LOG_MESSAGE, {'msg': 'a'}),
+                # queue is full
+                (AppBusEventType.CONNECTION_STATUS_CHANGE, {'status': 'disconnected'}),
+                (AppBusEventType.LOG_MESSAGE, {'msg': 'b'}),
+                (AppBusEventType.CONNECTION_STATUS_CHANGE, {'status': 'connected again'}),
+            ])
+
+            self.app_bus._tk_root = TkRootMock()
+            self.app_bus._process_event_queue()
+
+            # earlier events of the same type are not overtaken
+            self.assertEqual(processed, ['connected', 'disconnected', 'connected again', 'a'], f"batched: {batched_dispatch}")
+            self.tearDown()
+            self.handler_ids = []
+
+
+    def test_coroutine_handlers_run_on_persistent_loop(self):
+        loop_threads = []
+        async def handler(data):
+            loop_threads.append(threading.get_ident())
+        self.add_handler(AppBusEventType.WINDOW_LOADED, handler)
+
+        for i in range(3):
+            self.app_bus.fire_event(AppBusEventType.WINDOW_LOADED, {})
+
+        self.assertTrue(self.app_bus.wait_for_async_handlers(timeout=5))
+        self.assertEqual(len(loop_threads), 3)
+        self.assertEqual(len(set(loop_threads)), 1)
+        self.assertNotEqual(loop_threads[0], threading.get_ident())
+
+        # handlers are completed before the next handler is called
+        order = []
+        async def slow_handler(data):
+            await asyncio.sleep(0.01)
+            order.append('coroutine')
+        self.add_handler(AppBusEventType.DEVICE_SCAN_STATUS, slow_handler)
+        self.add_handler(AppBusEventType.DEVICE_SCAN_STATUS, lambda data: order.append('handler'))
+        self.app_bus.fire_event(AppBusEventType.DEVICE_SCAN_STATUS, 'FINISHED')
+        self.assertEqual(order, ['coroutine', 'handler'])
+
+        future = self.app_bus.submit_coroutine(asyncio.sleep(0, result=42))
+        self.assertEqual(future.result(timeout=5), 42)
+        self.app_bus.shutdown()
+
+    def test_coroutine_handlers_do_not_block_on_full_queue(self):
+        self.app_bus = AppBus(batched_dispatch=True, max_queue_size=1, backpressure_timeout=1.0)
+        self.fire_from_background_thread([(AppBusEventType.SERIAL_CALLBACK, {})])
+        self.assertTrue(self.app_bus.is_saturated())
+
+        async def handler(data):
+            for i in range(3):
+                self.app_bus.fire_event(AppBusEventType.UPDATE_DEVICE_REPRESENTATION, DeviceMock(str(i)))
+                self.app_bus.fire_event(AppBusEventType.DEVICE_ITERATION_PROGRESS, i)
+        self.add_handler(AppBusEventType.WINDOW_LOADED, handler)
+        updated = []
+        self.add_handler(AppBusEventType.UPDATE_DEVICE_REPRESENTATION, lambda d: updated.append(d.external_id))
+
+        start = time.perf_counter()
+        self.app_bus.fire_event(AppBusEventType.WINDOW_LOADED, {})
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+        self.app_bus._tk_root = TkRootMock()
+        self.app_bus._process_event_queue()
+        self.assertEqual(updated, ['0', '1', '2'])
+        self.app_bus.shutdown()
+
+
+    def test_profiling_of_handlers(self):
+        def slow_handler(data):
+            time.sleep(0.002)
+        self.add_handler(AppBusEventType.WINDOW_LOADED, slow_handler)
+
+        self.app_bus.fire_event(AppBusEventType.WINDOW_LOADED, {})
+        self.assertFalse(self.app_bus.is_profiling_enabled())
+
+        profiler = self.app_bus.enable_profiling()
+        for i in range(3):
+            self.app_bus.fire_event(AppBusEventType.WINDOW_LOADED, {})
+
+        profile = profiler.get_profiles()[(AppBusEventType.WINDOW_LOADED, slow_handler.__qualname__)]
+        self.assertEqual(profile.call_count, 3)
+        self.assertGreaterEqual(profile.max_time, 0.002)
+        self.assertEqual(sum(profile.histogram), 3)
+        self.assertIn('slow_handler', self.app_bus.get_profiling_report())
+
+        self.app_bus.disable_profiling()
@@ -0,0 +1,208 @@
+import os
+import pickle
+import sqlite3
+import tempfile
+import unittest
+
+from eo_man import load_dep_homeassistant
+load_dep_homeassistant()
+
+from eltakobus.message import RPSMessage
+
+from eo_man.controller.app_bus import AppBus, AppBusEventType
+from eo_man.data.application_data import ApplicationData
+from eo_man.data.application_data_store import ApplicationDataStore
+from eo_man.data.data_manager import DataManager
+from eo_man.data.device import Device
+from eo_man.data.filter import DataFilter
+from eo_man.data.recorded_message import RecordedMessage
+
+
+class TestApplicationDataStore(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.temp_dir.name, 'test.eodm')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+
+    def create_app_data(self, device_count:int=10, message_count:int=10) -> ApplicationData:
+        app_data = ApplicationData(version='1.2.3', selected_data_filter='f1', data_filters={}, devices={}, recoreded_messages=[])
+        for i in range(device_count):
+            d = Device(address=f'FE-DB-00-{i:02X}', external_id=f'FE-DB-00-{i:02X}', name=f'device {i}', comment='comment')
+            app_data.devices[d.external_id] = d
+        app_data.data_filters['f1'] = DataFilter('f1', global_filter=['FE-DB'])
+        app_data.recoreded_messages = [self.create_message(i) for i in range(message_count)]
+        app_data.send_message_template_list = ['A5-38-08']
+        return app_data
+
+
+    def create_message(self, i:int) -> RecordedMessage:
+        return RecordedMessage(RPSMessage(b'\xfe\xdb\x00' + bytes([i % 256]), 0x30, b'\x70'), f'FE-DB-00-{i % 256:02X}', None, 1000.0 + i)
+
+
+    def count_rows(self, table:str) -> int:
+        con = sqlite3.connect(self.filename)
+        try:
+            return con.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        finally:
+            con.close()
+
+
+    def test_write_read(self):
+        app_data = self.create_app_data()
+        ApplicationDataStore(self.filename).write(app_data)
+        self.assertTrue(ApplicationDataStore.is_store_file(self.filename))
+
+        app_data2 = ApplicationDataStore(self.filename).read()
+        self.assertEqual(app_data2.application_version, '1.2.3')
+        self.assertEqual(app_data2.selected_data_filter_name, 'f1')
+        self.assertEqual(app_data2.send_message_template_list, ['A5-38-08'])
+        self.assertEqual(list(app_data2.devices.keys()), list(app_data.devices.keys()))
+        self.assertEqual([d.__dict__ for d in app_data2.devices.values()], [d.__dict__ for d in app_data.devices.values()])
+        self.assertEqual(app_data2.data_filters['f1'].global_filter, ['FE-DB'])
+        self.assertEqual([pickle.dumps(m) for m in app_data2.recoreded_messages], [pickle.dumps(m) for m in app_data.recoreded_messages])
+
+
+    def test_entries_are_not_executed(self):
+        app_data = self.create_app_data()
+        app_data.devices['FE-DB-00-01'].additional_fields = {'__type__': 'Device', 1: (b'\x01', 'a')}
+        ApplicationDataStore(self.filename).write(app_data)
+        self.assertEqual(ApplicationDataStore(self.filename).read().devices['FE-DB-00-01'].additional_fields, {'__type__': 'Device', 1: (b'\x01', 'a')})
+
+        class Exploit():
+            def __reduce__(self):
+                return (os.mkdir, (exploit_dir,))
+
+        exploit_dir = os.path.join(self.temp_dir.name, 'exploit')
+        for data in [pickle.dumps(Exploit()), '{"__type__":"Popen","state":{}}', '{"__type__":"DeviceDict","state":{}}']:
+            con = sqlite3.connect(self.filename)
+            with con:
+                con.execute("UPDATE devices SET data = ? WHERE external_id = 'FE-DB-00-02'", (data,))
+            con.close()
+            with self.assertRaises(ValueError):
+                ApplicationDataStore(self.filename).read()
+        self.assertFalse(os.path.exists(exploit_dir))
+
+
+    def test_incremental_write(self):
+        app_data = self.create_app_data()
+        store = ApplicationDataStore(self.filename)
+        store.write(app_data)
+
+        # change, remove and add devices and record more messages
+        app_data.devices['FE-DB-00-01'].name = 'changed'
+        del app_data.devices['FE-DB-00-02']
+        app_data.devices['FE-DB-00-99'] = Device(address='FE-DB-00-99', external_id='FE-DB-00-99')
+        app_data.recoreded_messages = app_data.recoreded_messages[5:] + [self.create_message(i) for i in range(10, 15)]
+        store.write(app_data)
+
+        self.assertEqual(self.count_rows('recorded_messages'), 10)
+        app_data2 = ApplicationDataStore(self.filename).read()
+        self.assertEqual(list(app_data2.devices.keys()), list(app_data.devices.keys()))
+        self.assertEqual(app_data2.devices['FE-DB-00-01'].name, 'changed')
+        self.assertEqual([m.received_timestamp for m in app_data2.recoreded_messages], [m.received_timestamp for m in app_data.recoreded_messages])
+
+        # recorded messages were cleared
+        app_data.recoreded_messages = [self.create_message(20)]
+        store.write(app_data)
+        self.assertEqual([m.received_timestamp for m in ApplicationDataStore(self.filename).read().recoreded_messages], [1020.0])
+
+
+    def test_data_manager_replaces_yaml_file(self):
+        ApplicationData.write_to_yaml_file(self.filename, self.create_app_data())
+        self.assertFalse(ApplicationDataStore.is_store_file(self.filename))
+
+        dm = DataManager(AppBus())
+        dm.load_application_data_from_file(self.filename)
+        self.assertEqual(len(dm.devices), 10)
+        dm.write_application_data_to_file(self.filename)
+        self.assertTrue(ApplicationDataStore.is_store_file(self.filename))
+
+        dm2 = DataManager(AppBus())
+        dm2.load_application_data_from_file(self.filename)
+        self.assertEqual(list(dm2.devices.keys()), list(dm.devices.keys()))
+        self.assertEqual(len(dm2.recoreded_messages), 10)
+
+        # export as yaml
+        yaml_filename = os.path.join(self.temp_dir.name, 'test.yaml')
+        dm2.write_application_data_to_file(yaml_filename)
+        self.assertEqual(len(ApplicationData.read_from_yaml_file(yaml_filename).devices), 10)
+        dm2._on_window_closed(None)
+        dm._on_window_closed(None)
+
+
+    def test_write_in_background(self):
+        dm = DataManager(AppBus())
+        dm.load_devices(self.create_app_data().devices)
+        self.assertTrue(dm.is_dirty())
+
+        results = []
+        dm.write_application_data_to_file_async(self.filename, lambda f, e: results.append((f, e)))
+        # changes after the snapshot are not written
+        dm.devices['FE-DB-00-99'] = Device(address='FE-DB-00-99', external_id='FE-DB-00-99')
+        self.assertTrue(dm.wait_for_pending_save(10))
+
+        self.assertEqual(results, [(self.filename, None)])
+        self.assertEqual(len(ApplicationDataStore(self.filename).read().devices), 10)
+        self.assertTrue(dm.is_dirty())
+
+        dm.write_application_data_to_file_async(self.filename)
+        self.assertTrue(dm.wait_for_pending_save(10))
+        self.assertFalse(dm.is_dirty())
+        self.assertEqual(len(ApplicationDataStore(self.filename).read().devices), 11)
+        self.assertFalse(os.path.exists(self.filename + '.tmp'))
+
+        dm.add_filter(DataFilter('f2'))
+        self.assertTrue(dm.is_dirty())
+        dm._on_window_closed(None)
+
+
+    def test_device_changes_during_background_write(self):
+        dm = DataManager(AppBus())
+        dm.load_devices(self.create_app_data().devices)
+        device = next(iter(dm.devices.values()))
+        yaml_filename = os.path.join(self.temp_dir.name, 'app_data.yaml')
+
+        for filename, read in [(self.filename, lambda: ApplicationDataStore(self.filename).read()),
+                               (yaml_filename, lambda: ApplicationData.read_from_yaml_file(yaml_filename))]:
+            # the worker waits until the device was changed
+            with dm._write_lock:
+                dm.write_application_data_to_file_async(filename)
+                device.comment = 'changed'
+                device.additional_fields['sender'] = {'id': '01'}
+            self.assertTrue(dm.wait_for_pending_save(10))
+
+            saved_device = read().devices[device.external_id]
+            self.assertEqual(saved_device.comment, 'comment')
+            self.assertNotIn('sender', saved_device.additional_fields)
+            device.comment = 'comment'
+            del device.additional_fields['sender']
+
+
+    def test_not_dirty_while_loading(self):
+        ApplicationDataStore(self.filename).write(self.create_app_data())
+        dm = DataManager(AppBus())
+        dm.load_application_data_from_file(self.filename)
+        self.assertFalse(dm.is_dirty())
+
+        # loading the file again starts with reset data
+        dm.begin_loading()
+        dm.app_bus.fire_event(AppBusEventType.LOAD_FILE, {})
+        self.assertFalse(dm.is_dirty())
+        dm.load_application_data_from_file(self.filename)
+        self.assertFalse(dm.is_dirty())
+
+        # imported data is not saved yet
+        dm.load_application_data_from_file(self.filename, mark_as_saved=False)
+        self.assertTrue(dm.is_dirty())
+
+        # reset data of a failed load is not saved into the file
+        dm.begin_loading()
+        dm.app_bus.fire_event(AppBusEventType.LOAD_FILE, {})
+        with self.assertRaises(Exception):
+            dm.load_application_data_from_file(os.path.join(self.temp_dir.name, 'missing.eodm'))
+        self.assertFalse(dm.is_dirty())
+        dm._on_window_closed(None)
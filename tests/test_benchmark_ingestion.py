@@ -0,0 +1,159 @@
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+import tkinter as tk
+import unittest
+
+from eo_man import load_dep_homeassistant
+load_dep_homeassistant()
+
+from eltakobus.message import RPSMessage, Regular4BSMessage, EltakoWrappedRPS
+
+from eo_man.controller.app_bus import AppBus
+from eo_man.data.data_manager import DataManager
+from eo_man.data.device import Device
+from eo_man.data import data_helper
+from eo_man.view.log_output import LogOutputPanel, TelegramLogRecord
+
+
+# EO_MAN_BENCHMARK=1 runs the benchmarks and compares them with the baseline,
+# EO_MAN_BENCHMARK=update runs the benchmarks and stores the results as new baseline.
+BENCHMARK_MODE = os.environ.get('EO_MAN_BENCHMARK', '')
+# allowed slowdown compared to the baseline
+BENCHMARK_TOLERANCE = float(os.environ.get('EO_MAN_BENCHMARK_TOLERANCE', 2.0))
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), 'resources', 'benchmarks', 'ingestion_baseline.json')
+# results of the last run next to the baseline values
+RESULTS_FILE = os.environ.get('EO_MAN_BENCHMARK_RESULTS', os.path.join(tempfile.gettempdir(), 'eo_man_ingestion_benchmark.json'))
+
+BASE_ID = 'FF-AA-80-00'
+DEVICE_TABLE_SIZES = [10, 1000, 50000]
+TELEGRAM_COUNT = 2000
+REPEATS = 5
+
+
+def create_device_table(data_manager:DataManager, size:int) -> dict[str:list[bytes]]:
+    """Fills the device table with decentralized sensors and bus devices. Returns addresses per telegram type."""
+    addresses = {'rps': [], '4bs': [], 'wrapped_rps': []}
+    base_adr = int.from_bytes(bytes.fromhex(BASE_ID.replace('-', '')), 'big')
+    for i in range(size):
+        if i % 4 == 3 and len(addresses['wrapped_rps']) < 254:
+            local_adr = len(addresses['wrapped_rps']) + 1
+            d = Device(address=data_helper.a2s(local_adr), bus_device=True, external_id=data_helper.a2s(base_adr + local_adr),
+                       device_type='FSR14_4x', base_id=BASE_ID, name=f"FSR14 {i}")
+            d.eep = 'M5-38-08'
+            addresses['wrapped_rps'].append(local_adr.to_bytes(4, 'big'))
+        else:
+            adr = 0xFE000000 + i
+            d = Device(address=data_helper.a2s(adr), external_id=data_helper.a2s(adr), device_type='sensor', base_id='00-00-00-00', name=f"Sensor {i}")
+            if i % 2 == 0:
+                d.eep = 'F6-02-01'
+                addresses['rps'].append(adr.to_bytes(4, 'big'))
+            else:
+                d.eep = 'A5-04-02'
+                addresses['4bs'].append(adr.to_bytes(4, 'big'))
+        data_manager.devices[d.external_id] = d
+
+    return addresses
+
+
+def create_telegrams(telegram_type:str, addresses:list[bytes], count:int) -> list:
+    rnd = random.Random(42)
+    telegrams = []
+    for _ in range(count):
+        adr = rnd.choice(addresses)
+        if telegram_type == 'rps':
+            telegrams.append(RPSMessage(adr, 0x30, bytes((rnd.choice((0x10, 0x30, 0x50, 0x70)),))))
+        elif telegram_type == '4bs':
+            telegrams.append(Regular4BSMessage(adr, 0x00, bytes((0x00, rnd.randrange(251), rnd.randrange(251), 0x0A))))
+        else:
+            telegrams.append(EltakoWrappedRPS(adr, 0x30, bytes((rnd.choice((0x50, 0x70)),))))
+    return telegrams
+
+
+def measure(func, items:list, repeats:int=REPEATS) -> float:
+    """Returns best time per item in microseconds."""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for i in items:
+            func(i)
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    return best / len(items) * 1e6
+
+
+@unittest.skipUnless(BENCHMARK_MODE, "Set EO_MAN_BENCHMARK=1 (or update) to run the benchmarks.")
+class TestIngestionBenchmark(unittest.TestCase):
+
+    def setUp(self):
+        # the log output is only measured if a display is available
+        try:
+            self.tk_root = tk.Tk()
+            self.tk_root.withdraw()
+        except tk.TclError:
+            self.tk_root = None
+
+    def tearDown(self):
+        if self.tk_root is not None:
+            self.tk_root.destroy()
+
+
+    def create_log_output_panel(self, data_manager:DataManager) -> LogOutputPanel:
+        panel = LogOutputPanel(self.tk_root, data_manager.app_bus, data_manager)
+        panel.show_telegram_values.set(True)
+        panel.show_esp2_binary.set(True)
+        panel.show_esp3_binary.set(False)
+        # received telegrams are only queued, the scheduled flush into the text widget is not executed without main loop
+        return panel
+
+
+    def run_benchmarks(self) -> dict[str:float]:
+        results = {}
+        for size in DEVICE_TABLE_SIZES:
+            dm = DataManager(AppBus())
+            addresses = create_device_table(dm, size)
+            panel = self.create_log_output_panel(dm) if self.tk_root is not None else None
+
+            for telegram_type, adrs in addresses.items():
+                if len(adrs) == 0:
+                    continue
+                telegrams = create_telegrams(telegram_type, adrs, TELEGRAM_COUNT)
+                callback_data = [{'msg': t, 'base_id': BASE_ID, 'gateway_id': BASE_ID} for t in telegrams]
+
+                results[f"{telegram_type}/{size}/serial_callback_handler"] = measure(dm._serial_callback_handler, callback_data)
+                results[f"{telegram_type}/{size}/get_values_from_message_to_string"] = measure(lambda t: dm.get_values_from_message_to_string(t, BASE_ID), telegrams)
+                if panel is not None:
+                    results[f"{telegram_type}/{size}/log_output_serial_callback"] = measure(panel.serial_callback, callback_data)
+                    # formatting of a telegram when it is written into the log (new records so that nothing is memoized)
+                    results[f"{telegram_type}/{size}/log_output_format_telegram"] = measure(lambda t: panel.format_telegram(TelegramLogRecord(t, BASE_ID)), telegrams)
+
+        return results
+
+
+    def write_json(self, filename:str, results:dict) -> None:
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(filename, 'w') as f:
+            json.dump({'python': platform.python_version(), 'machine': platform.machine(), 'telegram_count': TELEGRAM_COUNT, 'results': results}, f, indent=2)
+
+
+    def test_ingestion_benchmark(self):
+        results = self.run_benchmarks()
+
+        if BENCHMARK_MODE == 'update':
+            self.assertIsNotNone(self.tk_root, "The baseline can only be updated with a display, otherwise the log output is not measured.")
+            self.write_json(BASELINE_FILE, {n: round(v, 3) for n, v in results.items()})
+            return
+
+        baseline = {}
+        if os.path.isfile(BASELINE_FILE):
+            with open(BASELINE_FILE, 'r') as f:
+                baseline = json.load(f)['results']
+
+        # microseconds per telegram
+        self.write_json(RESULTS_FILE, {n: {'baseline': baseline.get(n, None), 'current': round(v, 3)} for n, v in results.items()})
+
+        regressions = [f"{n}: {v:.2f}us (baseline {baseline[n]:.2f}us)" for n, v in results.items() if n in baseline and v > baseline[n] * BENCHMARK_TOLERANCE]
+        self.assertEqual(regressions, [], f"Per-telegram cost increased by more than factor {BENCHMARK_TOLERANCE}, see {RESULTS_FILE}.")
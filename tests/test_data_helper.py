@@ -0,0 +1,71 @@
+import unittest
+
+from eo_man import load_dep_homeassistant
+load_dep_homeassistant()
+
+from eltakobus.eep import EEP
+
+from eo_man.data import data_helper
+
+
+def find_eep_by_walking_class_tree(eep_name:str) -> EEP:
+    for child in EEP.__subclasses__():
+        if child.__name__.replace('_', '-').upper() == eep_name.replace('_', '-').upper():
+            return child
+        for sub_child in child.__subclasses__():
+            if sub_child.eep_string.replace('_', '-').upper() == eep_name.replace('_', '-').upper():
+                return sub_child
+    return None
+
+
+def find_device_info_by_scanning(device_type:str, eep:str=None) -> dict:
+    for i in data_helper.EEP_MAPPING:
+        if str(i['hw-type']).replace('-', '_').upper() == data_helper.build_unique_name_for_device_type(device_type):
+            if eep is None or i.get(data_helper.CONF_EEP, None) == eep:
+                return i
+    return {}
+
+
+class TestDataHelper(unittest.TestCase):
+
+    def test_eep_mapping_lookups(self):
+        for row in data_helper.EEP_MAPPING:
+            hw_type = row['hw-type']
+            for device_type in [hw_type, hw_type.lower(), hw_type + '/extra']:
+                self.assertEqual(data_helper.find_device_info_by_device_type(device_type), find_device_info_by_scanning(device_type))
+            if data_helper.CONF_EEP in row:
+                eep = row[data_helper.CONF_EEP]
+                self.assertEqual(data_helper.find_device_info_by_device_type(hw_type, eep), find_device_info_by_scanning(hw_type, eep))
+                self.assertIs(data_helper.find_device_info_by_eep(eep), next(i for i in data_helper.EEP_MAPPING if i.get(data_helper.CONF_EEP, None) == eep))
+            if 'description' in row:
+                self.assertTrue(data_helper.is_device_description(row['description']))
+
+        self.assertEqual(data_helper.find_device_info_by_device_type('no device'), {})
+        self.assertEqual(data_helper.find_device_info_by_device_type('FSR14_4x', 'Z9-99-99'), {})
+        self.assertEqual(data_helper.find_device_info_by_eep('Z9-99-99'), {})
+        self.assertFalse(data_helper.is_device_description('no description'))
+
+    def test_find_eep_by_name(self):
+        names = data_helper.get_all_eep_names()
+        self.assertGreater(len(names), 0)
+        for name in names + [n.lower().replace('-', '_') for n in names] + ['unknown', '']:
+            self.assertEqual(data_helper.find_eep_by_name(name), find_eep_by_walking_class_tree(name), name)
+        self.assertIsNone(data_helper.find_eep_by_name(None))
+
+
+    def test_invalidate_eep_registry(self):
+        self.assertIsNone(data_helper.find_eep_by_name('Z9-99-99'))
+
+        class Z9_99_99(EEP):
+            eep_string = 'Z9-99-99'
+        try:
+            # still cached
+            self.assertIsNone(data_helper.find_eep_by_name('Z9-99-99'))
+
+            data_helper.invalidate_eep_registry()
+            self.assertEqual(data_helper.find_eep_by_name('Z9-99-99'), Z9_99_99)
+            self.assertIn('Z9-99-99', data_helper.get_all_eep_names())
+        finally:
+            del Z9_99_99
+            import gc; gc.collect()
+            data_helper.invalidate_eep_registry()
@@ -0,0 +1,133 @@
+import asyncio
+import pickle
+import unittest
+
+from eo_man import load_dep_homeassistant
+load_dep_homeassistant()
+
+from eltakobus.device import SensorInfo
+from eltakobus.message import RPSMessage, EltakoWrappedRPS
+
+from eo_man.controller.app_bus import AppBus, AppBusEventType
+from eo_man.data.data_manager import DataManager
+from eo_man.data.device import Device
+from eo_man.data import data_helper
+from eo_man.data.device_dict import DeviceDict
+
+
+def find_devices_containing_sensor_by_scanning(dm:DataManager, sensor:Device) -> list[Device]:
+    devices = []
+    for d in dm.devices.values():
+        for m in d.memory_entries:
+            if sensor.address == m.sensor_id_str and d.channel == m.channel:
+                if m.sensor_id_str == sensor.external_id or d.base_id == sensor.base_id:
+                    devices.append(d)
+    return devices
+
+
+def create_sensor_info(sensor_id:int, channel:int=1) -> SensorInfo:
+    return SensorInfo(sensor_id.to_bytes(4, 'big'), 'FSR14', 1, b'\x00\x00\x00\x01', 0, 0, channel, 0, 12)
+
+
+class TestDeviceDict(unittest.TestCase):
+
+    def test_int_index(self):
+        d1 = Device(address='FE-DB-00-01', external_id='FE-DB-00-01')
+        d2 = Device(address='00-00-00-01', external_id='FF-AA-80-01')
+        devices = DeviceDict({'FE-DB-00-01': d1})
+        devices['FF-AA-80-01'] = d2
+        devices['unknown'] = d2
+        devices['fe-db-00-02'] = d2
+
+        self.assertIs(devices.get_by_int(0xFEDB0001), d1)
+        self.assertIs(devices.get_by_int(0xFFAA8001), d2)
+        self.assertEqual(devices.get_key_by_int(0xFFAA8001), 'FF-AA-80-01')
+        # only formatted addresses are indexed
+        self.assertIsNone(devices.get_by_int(0xFEDB0002))
+
+        del devices['FE-DB-00-01']
+        self.assertIsNone(devices.get_by_int(0xFEDB0001))
+        self.assertIs(devices.pop('FF-AA-80-01'), d2)
+        self.assertIsNone(devices.get_by_int(0xFFAA8001))
+        devices.setdefault('FE-DB-00-03', d1)
+        self.assertIs(devices.get_by_int(0xFEDB0003), d1)
+        devices.clear()
+        self.assertIsNone(devices.get_by_int(0xFEDB0003))
+
+        # serialized as plain dict
+        devices['FE-DB-00-01'] = d1
+        self.assertIs(type(pickle.loads(pickle.dumps(devices))), dict)
+
+
+    def test_data_manager_lookups(self):
+        dm = DataManager(AppBus())
+        dm.devices = {'FF-AA-80-01': Device(address='00-00-00-01', bus_device=True, external_id='FF-AA-80-01', base_id='FF-AA-80-00')}
+        self.assertIsInstance(dm.devices, DeviceDict)
+
+        self.assertEqual(dm.find_device_by_local_address('00-00-00-01', 'FF-AA-80-00').external_id, 'FF-AA-80-01')
+        self.assertIsNone(dm.find_device_by_local_address('00-00-00-02', 'FF-AA-80-00'))
+        self.assertIsNone(dm.find_device_by_local_address('00-00-00-02', 'FF-FF-FF-FF'))
+
+        dm._serial_callback_handler({'msg': EltakoWrappedRPS(b'\x00\x00\x00\x01', 0x30, b'\x70'), 'base_id': 'FF-AA-80-00', 'gateway_id': 'FF-AA-80-FF'})
+        dm._serial_callback_handler({'msg': EltakoWrappedRPS(b'\x00\x00\x00\x05', 0x30, b'\x70'), 'base_id': 'FF-AA-80-00', 'gateway_id': 'FF-AA-80-FF'})
+        dm._serial_callback_handler({'msg': RPSMessage(b'\xff\xaa\x80\x07', 0x30, b'\x70'), 'base_id': None, 'gateway_id': None})
+        self.assertEqual(sorted(dm.devices.keys()), ['FF-AA-80-01', 'FF-AA-80-05', 'FF-AA-80-07'])
+        self.assertEqual(dm.recoreded_messages.count_messages_of_device('FF-AA-80-01'), 1)
+
+        # decentral device within address range of a detected gateway is moved to the gateway
+        asyncio.run(dm._find_and_update_devices_belonging_to_gateway('FF-AA-80-00'))
+        d = dm.devices['FF-AA-80-07']
+        self.assertTrue(d.bus_device)
+        self.assertEqual(d.address, '00-00-00-07')
+        self.assertEqual(d.base_id, 'FF-AA-80-00')
+
+
+    def test_devices_containing_sensor(self):
+        dm = DataManager(AppBus())
+        base_ids = ['FF-AA-80-00', 'FF-BB-80-00']
+        for b in base_ids:
+            for i in range(1, 5):
+                d = Device(address=f'00-00-00-0{i}', bus_device=True, channel=1 + i % 2, base_id=b, external_id=data_helper.add_addresses(b, f'00-00-00-0{i}'))
+                d.memory_entries = [create_sensor_info(0xFEDB0001, 1), create_sensor_info(0xFEDB0001, 2), create_sensor_info(0x00000010 + i % 2, d.channel)]
+                dm.devices[d.external_id] = d
+        sensors = [Device(address='FE-DB-00-01', external_id='FE-DB-00-01', base_id='00-00-00-00')]
+        sensors += [Device(address=f'00-00-00-1{i}', bus_device=True, external_id=data_helper.add_addresses(b, f'00-00-00-1{i}'), base_id=b) for b in base_ids for i in range(2)]
+        for s in sensors:
+            dm.devices[s.external_id] = s
+
+        for s in sensors:
+            self.assertEqual(dm.get_devices_containing_sensor_in_config(s), find_devices_containing_sensor_by_scanning(dm, s))
+        self.assertEqual(len(dm.get_devices_containing_sensor_in_config(sensors[0])), 8)
+        self.assertIs(dm.get_device_by_id('FF-AA-80-01'), dm.devices['FF-AA-80-01'])
+        self.assertIsNone(dm.get_device_by_id('FF-AA-80-99'))
+
+        # memory entries changed in place
+        d = dm.devices['FF-AA-80-01']
+        d.memory_entries = []
+        dm.devices.touch()
+        self.assertNotIn(d, dm.get_devices_containing_sensor_in_config(sensors[0]))
+        self.assertEqual(dm.get_devices_containing_sensor_in_config(sensors[0]), find_devices_containing_sensor_by_scanning(dm, sensors[0]))
+
+        # device removed and devices replaced
+        del dm.devices['FF-AA-80-02']
+        self.assertEqual(dm.get_devices_containing_sensor_in_config(sensors[0]), find_devices_containing_sensor_by_scanning(dm, sensors[0]))
+        dm.devices = {}
+        self.assertEqual(dm.get_devices_containing_sensor_in_config(sensors[0]), [])
+
+
+    def test_load_devices_fires_one_event(self):
+        app_bus = AppBus()
+        dm = DataManager(app_bus)
+        events = []
+        handler_ids = [app_bus.add_event_handler(et, lambda data, et=et: events.append((et, data)))
+                       for et in [AppBusEventType.UPDATE_DEVICE_REPRESENTATION, AppBusEventType.UPDATE_SENSOR_REPRESENTATION, AppBusEventType.UPDATE_DEVICES_REPRESENTATION]]
+        try:
+            devices = {'FE-DB-00-01': Device(address='FE-DB-00-01', external_id='FE-DB-00-01'),
+                       'FF-AA-80-01': Device(address='00-00-00-01', bus_device=True, external_id='FF-AA-80-01', base_id='FF-AA-80-00')}
+            dm.load_devices(devices)
+        finally:
+            for i in handler_ids:
+                app_bus.remove_event_handler_by_id(i)
+
+        self.assertEqual(events, [(AppBusEventType.UPDATE_DEVICES_REPRESENTATION, list(devices.values()))])
+        self.assertEqual(sorted(dm.devices.keys()), sorted(devices.keys()))
@@ -0,0 +1,100 @@
+import unittest
+import yaml
+
+from eo_man import load_dep_homeassistant
+load_dep_homeassistant()
+
+from homeassistant.const import Platform
+
+from eo_man.controller.app_bus import AppBus, AppBusEventType
+from eo_man.data.data_manager import DataManager
+from eo_man.data.device import Device
+from eo_man.data.filter import DataFilter
+
+
+def filter_device_by_scanning(filter:DataFilter, device:Device) -> bool:
+    def find_in_dict(additional_fields:dict, f:str) -> bool:
+        for value in additional_fields.values():
+            if isinstance(value, dict):
+                if find_in_dict(value, f):
+                    return True
+            elif f in str(value).upper():
+                return True
+        return False
+
+    fields = [(device.address, filter.device_address_filter), (device.external_id, filter.device_external_address_filter),
+              (device.device_type, filter.device_type_filter), (device.eep, filter.device_eep_filter),
+              (device.key_function, []), (device.comment, []), (device.version, []), (device.ha_platform, [])]
+    for value, terms in fields:
+        for f in terms + filter.global_filter:
+            if value and f.upper() in value.upper():
+                return True
+    return any(find_in_dict(device.additional_fields, f.upper()) for f in filter.global_filter)
+
+
+class TestDataFilter(unittest.TestCase):
+
+    def create_devices(self) -> list[Device]:
+        devices = []
+        for i in range(20):
+            d = Device(address=f'00-00-00-{i:02X}', external_id=f'FF-AA-80-{i:02X}', device_type=['FSR14_4x', 'FUD14', None][i % 3],
+                       version=f'1.{i}', comment='kitchen light' if i % 4 == 0 else None)
+            d.eep = ['A5-38-08', 'F6-02-01', None][i % 3]
+            d.key_function = 'Schalter' if i % 5 == 0 else None
+            d.ha_platform = Platform.LIGHT if i % 2 == 0 else None
+            d.additional_fields = {'sender': {'id': f'00-00-B0-{i:02X}', 'eep': 'A5-38-08'}} if i % 3 == 0 else {}
+            devices.append(d)
+        devices.append(Device())
+        return devices
+
+
+    def test_filter_device(self):
+        filters = [DataFilter('global', global_filter=['kitchen']),
+                   DataFilter('case', global_filter=['fud']),
+                   DataFilter('empty'),
+                   DataFilter('empty term', global_filter=['']),
+                   DataFilter('regex chars', global_filter=['1.1', '(', '*']),
+                   DataFilter('address', device_address_filter=['00-0A', '00-13']),
+                   DataFilter('external id', device_external_address_filter=['80-0'], device_eep_filter=['f6-02']),
+                   DataFilter('type', device_type_filter=['FSR14'], global_filter=['b0-0C']),
+                   DataFilter('platform', global_filter=['light', 'schalter'])]
+        for f in filters:
+            for d in self.create_devices():
+                self.assertEqual(f.filter_device(d), filter_device_by_scanning(f, d), f"{f.name} {d.external_id}")
+
+
+    def test_cached_search_document(self):
+        dm = DataManager(AppBus())
+        d = self.create_devices()[1]
+        dm.devices[d.external_id] = d
+        f = DataFilter('global', global_filter=['kitchen'])
+        self.assertFalse(dm.filter_device(f, d))
+
+        d.comment = 'Kitchen'
+        # still cached
+        self.assertFalse(dm.filter_device(f, d))
+        dm.app_bus.fire_event(AppBusEventType.UPDATE_SENSOR_REPRESENTATION, d)
+        self.assertTrue(dm.filter_device(f, d))
+
+        d.comment = None
+        dm.update_device(d)
+        self.assertFalse(dm.filter_device(f, d))
+
+
+    def test_replaced_devices_are_not_kept(self):
+        dm = DataManager(AppBus())
+        f = DataFilter('global', global_filter=['kitchen'])
+        for i in range(10):
+            d = Device(address='00-00-00-01', external_id='FF-AA-80-01', comment='kitchen' if i % 2 == 0 else None)
+            dm.update_device(d)
+            self.assertEqual(dm.filter_device(f, d), i % 2 == 0)
+        self.assertEqual(len(dm.device_search_index._documents), 1)
+
+
+    def test_compiled_matchers_are_not_persisted(self):
+        f = DataFilter('global', global_filter=['kitchen'])
+        f.filter_device(Device())
+        f2 = yaml.load(yaml.dump(f), Loader=yaml.Loader)
+        self.assertNotIn('_matchers', f2.__dict__)
+        self.assertEqual(f2.global_filter, ['kitchen'])
+        self.assertTrue(f2.filter_device(Device(comment='kitchen')))
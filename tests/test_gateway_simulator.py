@@ -0,0 +1,72 @@
+import asyncio
+import time
+import unittest
+
+from eltakobus.device import create_busobject, FAM14, FSR14_4x
+from eltakobus.locking import lock_bus, unlock_bus, LOCKED
+from eltakobus.message import *
+from eltakobus.serial import RS485SerialInterfaceV2
+from eltakobus.util import AddressExpression
+
+from eo_man.controller.gateway_simulator import Fam14Simulator
+
+
+class TestGatewaySimulator(unittest.TestCase):
+
+    def test_discovery_and_memory(self):
+        sim = Fam14Simulator(device_count=3, sensor_count=2, latency=0)
+
+        reply = prettify(sim.handle_request(EltakoDiscoveryRequest(address=1))[0])
+        self.assertEqual(reply.reported_address, 1)
+        self.assertEqual(reply.reported_size, 4)
+        self.assertIsInstance(sim.handle_request(EltakoDiscoveryRequest(address=2))[0], EltakoTimeout)
+
+        base_id = prettify(sim.handle_request(EltakoMemoryRequest(255, 1))[0])
+        self.assertEqual(base_id.value[0:4], AddressExpression.parse('FF-AA-80-00')[0])
+
+        sim.handle_request(EltakoMessage(0xf2, 5))
+        sim.handle_request(EltakoMessage(0xf4, 13, b'\x01\x02\x03\x04\x05\x03\x01\x00'))
+        self.assertEqual(sim.devices[5].memory[13], b'\x01\x02\x03\x04\x05\x03\x01\x00')
+
+
+    def test_latency_and_rate(self):
+        sim = Fam14Simulator(device_count=2, sensor_count=2, rate=100, latency=0.5, echo=False)
+        now = 1000.0
+
+        self.assertEqual(sim.receive(EltakoDiscoveryRequest(address=1).serialize(), now), b'')
+        self.assertEqual(sim.get_due_data(now+0.4), b'')
+        data = sim.get_due_data(now+0.6)
+        # discovery reply + synthetic telegrams emitted since first poll at 100 telegrams/s
+        self.assertEqual(len(data) % 14, 0)
+        self.assertIn(sim.devices[1].get_discovery_reply().serialize(), data)
+        self.assertEqual(sim.emitted_telegrams, 20)
+        self.assertEqual(len(data), 21*14)
+
+        # no traffic while bus is locked
+        sim.handle_request(EltakoBusLock())
+        self.assertEqual(sim.get_due_data(now+10), b'')
+
+
+    def test_bus_scan_via_serial_interface(self):
+        bus = RS485SerialInterfaceV2('fam14sim://?devices=2&sensors=2&latency=0', auto_reconnect=False)
+        bus.start()
+        try:
+            self.assertTrue(bus.is_serial_connected.wait(timeout=2))
+            self.assertTrue(bus.suppress_echo)
+
+            async def scan():
+                self.assertEqual(await lock_bus(bus), LOCKED)
+                fam14 = await create_busobject(bus, 255)
+                self.assertIsInstance(fam14, FAM14)
+                self.assertEqual(await fam14.get_base_id(), 'FF-AA-80-00')
+
+                dev = await create_busobject(bus, 1)
+                self.assertIsInstance(dev, FSR14_4x)
+                await dev.read_mem()
+                self.assertEqual(dev.memory[12][0:4], bytes.fromhex('FEDB0000'))
+                await unlock_bus(bus)
+
+            asyncio.run(scan())
+        finally:
+            bus.stop()
+            bus.join(timeout=2)
@@ -0,0 +1,82 @@
+import unittest
+import yaml
+from datetime import datetime, timedelta
+
+from eo_man import load_dep_homeassistant
+load_dep_homeassistant()
+
+from eltakobus.message import RPSMessage
+
+from eo_man.data.recorded_message import RecordedMessage
+from eo_man.data.recorded_message_store import RecordedMessageStore
+
+
+class TestRecordedMessageStore(unittest.TestCase):
+
+    def create_message(self, external_id:str, received:datetime=None) -> RecordedMessage:
+        msg = RPSMessage(bytes.fromhex(external_id.replace('-', '')), 0x30, b'\x70', True)
+        rm = RecordedMessage(msg, external_id, 'FF-00-00-00')
+        if received is not None:
+            rm.received = received
+        return rm
+
+    def test_capacity_by_count(self):
+        store = RecordedMessageStore(max_count=3)
+        messages = [self.create_message(f"FE-00-00-0{i%2}") for i in range(5)]
+        store.extend(messages)
+
+        self.assertEqual(len(store), 3)
+        self.assertEqual(store.to_list(), messages[2:])
+        self.assertEqual(store.count_messages_of_device('FE-00-00-00'), 2)
+        self.assertEqual(store.count_messages_of_device('FE-00-00-01'), 1)
+
+    def test_capacity_by_age(self):
+        now = datetime.now()
+        store = RecordedMessageStore(max_count=10, max_age=timedelta(hours=1))
+        old = self.create_message('FE-00-00-01', now - timedelta(hours=2))
+        new = self.create_message('FE-00-00-01', now)
+        store.extend([old, new])
+
+        self.assertEqual(store.to_list(), [new])
+
+    def test_last_messages_of_device(self):
+        store = RecordedMessageStore(max_count=100)
+        messages = [self.create_message(f"FE-00-00-0{i%3}") for i in range(30)]
+        store.extend(messages)
+
+        last = store.get_last_messages_of_device('FE-00-00-01', 2)
+        self.assertEqual(last, [messages[25], messages[28]])
+        self.assertEqual(store.get_last_messages_of_device('FE-00-00-09', 2), [])
+
+    def test_messages_between(self):
+        start = datetime(2024, 1, 1)
+        store = RecordedMessageStore(max_count=5)
+        messages = [self.create_message('FE-00-00-01', start + timedelta(minutes=i)) for i in range(8)]
+        store.extend(messages)
+
+        result = store.get_messages_between(start + timedelta(minutes=4), start + timedelta(minutes=6))
+        self.assertEqual(result, messages[4:6])
+        self.assertEqual(store.get_messages_between(), messages[3:])
+
+    def test_compact_recorded_message(self):
+        rm = self.create_message('FE-00-00-01', datetime(2024, 1, 1, 12))
+
+        self.assertFalse(hasattr(rm, '__dict__'))
+        self.assertEqual(rm.message.address, b'\xfe\x00\x00\x01')
+        self.assertEqual(rm.message.data, b'\x70')
+        self.assertEqual(rm.received, datetime(2024, 1, 1, 12))
+
+        # format of older versions without telegram
+        loaded = yaml.load("""!!python/object:eo_man.data.recorded_message.RecordedMessage
+external_device_id: FE-D4-E9-48
+message: null
+received: 2024-11-12 15:40:10.709805
+received_via_gateway_id: FF-CD-61-7F
+""", Loader=yaml.Loader)
+        self.assertIsNone(loaded.message)
+        self.assertEqual(loaded.external_device_id, 'FE-D4-E9-48')
+        self.assertEqual(loaded.received, datetime(2024, 11, 12, 15, 40, 10, 709805))
+
+        reloaded = yaml.load(yaml.dump(rm), Loader=yaml.Loader)
+        self.assertEqual(reloaded.raw_message, rm.raw_message)
+        self.assertEqual(reloaded.received_timestamp, rm.received_timestamp)
@@ -0,0 +1,60 @@
+import unittest
+
+from eo_man import load_dep_homeassistant
+load_dep_homeassistant()
+
+from eltakobus.message import RPSMessage, Regular4BSMessage
+
+from eo_man.controller.app_bus import AppBus
+from eo_man.data.data_manager import DataManager
+from eo_man.data.device import Device
+from eo_man.data import data_helper
+
+
+class TestTelegramDecoder(unittest.TestCase):
+
+    def create_data_manager(self) -> DataManager:
+        dm = DataManager(AppBus())
+        d = Device(address='FE-DB-00-01', external_id='FE-DB-00-01', base_id='00-00-00-00', name='sensor')
+        d.eep = 'A5-04-02'
+        dm.devices[d.external_id] = d
+        return dm
+
+
+    def test_decoded_values(self):
+        dm = self.create_data_manager()
+        msg = Regular4BSMessage(b'\xfe\xdb\x00\x01', 0x00, bytes((0x00, 0x64, 0x80, 0x0A)))
+
+        eep, values = dm.get_values_from_message_to_string(msg)
+        expected_eep = data_helper.find_eep_by_name('A5-04-02')
+        self.assertEqual(eep, expected_eep)
+        self.assertEqual(values, ', '.join(data_helper.get_values_for_eep(expected_eep, msg)))
+
+        # repeated telegram is served from memo
+        decoder = dm._telegram_decoders['FE-DB-00-01']
+        self.assertEqual(dm.get_values_from_message_to_string(msg), (eep, values))
+        self.assertIs(dm._telegram_decoders['FE-DB-00-01'], decoder)
+
+        other_msg = Regular4BSMessage(b'\xfe\xdb\x00\x01', 0x00, bytes((0x00, 0x10, 0x20, 0x0A)))
+        self.assertEqual(dm.get_values_from_message_to_string(other_msg)[1], ', '.join(data_helper.get_values_for_eep(expected_eep, other_msg)))
+
+        self.assertEqual(dm.get_values_from_message_to_string(RPSMessage(b'\xfe\xdb\x00\x99', 0x30, b'\x70')), (None, None))
+
+
+    def test_eep_change(self):
+        dm = self.create_data_manager()
+        msg = RPSMessage(b'\xfe\xdb\x00\x01', 0x30, b'\x70')
+        self.assertEqual(dm.get_values_from_message_to_string(msg)[0], data_helper.find_eep_by_name('A5-04-02'))
+
+        d = dm.devices['FE-DB-00-01']
+        d.eep = 'F6-02-01'
+        dm.update_device(d)
+        self.assertNotIn('FE-DB-00-01', dm._telegram_decoders)
+
+        eep, values = dm.get_values_from_message_to_string(msg)
+        self.assertEqual(eep, data_helper.find_eep_by_name('F6-02-01'))
+        self.assertEqual(values, ', '.join(data_helper.get_values_for_eep(eep, msg)))
+
+        # eep changed without update_device()
+        d.eep = None
+        self.assertEqual(dm.get_values_from_message_to_string(msg), (None, None))
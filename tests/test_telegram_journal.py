@@ -0,0 +1,169 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from eo_man import load_dep_homeassistant
+load_dep_homeassistant()
+
+from eltakobus.message import RPSMessage, Regular4BSMessage
+
+from eo_man.controller.app_bus import AppBus
+from eo_man.controller.serial_controller import SerialController
+from eo_man.controller.telegram_replay import TelegramReplayEngine
+from eo_man.data.application_data import ApplicationData
+from eo_man.data.application_data_store import ApplicationDataStore
+from eo_man.data.data_manager import DataManager
+from eo_man.data.device import Device
+from eo_man.data.recorded_message import RecordedMessage
+from eo_man.data.telegram_journal import TelegramJournal
+
+
+class SmallIndexTelegramJournal(TelegramJournal):
+    INDEX_INTERVAL = 4
+
+
+class TestTelegramJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.filename = TelegramJournal.get_journal_filename(os.path.join(self.temp_dir.name, 'test.eodm'))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_append_and_range_query(self):
+        start = datetime(2024, 1, 1)
+        journal = SmallIndexTelegramJournal(self.filename)
+        for i in range(20):
+            msg = RPSMessage(b'\xfe\x00\x00\x01', 0x30, bytes([i]), True)
+            journal.append(RecordedMessage(msg, 'FE-00-00-01', 'FF-00-00-80', (start + timedelta(minutes=i)).timestamp()))
+        journal.close()
+
+        journal = SmallIndexTelegramJournal(self.filename)
+        self.assertEqual(len(journal), 20)
+
+        result = list(journal.read(start + timedelta(minutes=5), start + timedelta(minutes=9)))
+        self.assertEqual([rm.message.data[0] for rm in result], [5, 6, 7, 8])
+        self.assertEqual(result[0].external_device_id, 'FE-00-00-01')
+        self.assertEqual(result[0].received_via_gateway_id, 'FF-00-00-80')
+        self.assertEqual(len(list(journal.read())), 20)
+        self.assertEqual(len(list(journal.read(start + timedelta(hours=1)))), 0)
+
+    def test_replay_into_data_manager(self):
+        dm = DataManager(AppBus())
+        dm.open_telegram_journal(os.path.join(self.temp_dir.name, 'test.eodm'))
+        self.assertFalse(os.path.isfile(self.filename))
+
+        dm._serial_callback_handler({'msg': RPSMessage(b'\xfe\x00\x00\x01', 0x30, b'\x70', True), 'base_id': None, 'gateway_id': 'FF-00-00-80'})
+        dm._serial_callback_handler({'msg': Regular4BSMessage(b'\x00\x00\x00\x05', 0x00, b'\x08\x08\x08\x08', True), 'base_id': 'FF-AA-80-00', 'gateway_id': 'FF-AA-80-00'})
+        dm.telegram_journal.close()
+        self.assertEqual(len(dm.telegram_journal), 2)
+
+        dm2 = DataManager(AppBus())
+        dm2.open_telegram_journal(os.path.join(self.temp_dir.name, 'test.eodm'))
+        self.assertEqual(dm2.replay_telegram_journal(), 2)
+        self.assertIn('FE-00-00-01', dm2.devices)
+        self.assertIn('FF-AA-80-05', dm2.devices)
+        self.assertEqual(len(dm2.recoreded_messages), 2)
+        # replayed telegrams are not journaled again
+        self.assertEqual(len(dm2.telegram_journal), 2)
+
+    def test_failed_replay_restores_profiler(self):
+        journal = TelegramJournal(self.filename)
+        journal.append(RecordedMessage(RPSMessage(b'\xfe\x00\x00\x01', 0x30, b'\x70', True), 'FE-00-00-01', 'FF-00-00-80', 1000.0))
+
+        app_bus = AppBus()
+        profiler = app_bus.enable_profiling()
+        sc = SerialController(app_bus, None)
+        def fail(message):
+            raise Exception('failed')
+        sc._received_serial_event = fail
+
+        with self.assertRaises(Exception):
+            TelegramReplayEngine(app_bus, sc, journal).run(speed=0)
+        self.assertIs(app_bus.profiler, profiler)
+        self.assertFalse(sc.is_replaying)
+        journal.close()
+
+
+    def test_damaged_journal_does_not_prevent_loading(self):
+        app_data_filename = os.path.join(self.temp_dir.name, 'test.eodm')
+        ApplicationDataStore(app_data_filename).write(ApplicationData(version='1.0', selected_data_filter=None, data_filters={},
+                                                                      devices={'FE-00-00-01': Device(address='FE-00-00-01', external_id='FE-00-00-01')},
+                                                                      recoreded_messages=[]))
+        msg = RPSMessage(b'\xfe\x00\x00\x01', 0x30, b'\x70', True)
+
+        # empty journal e.g. after a crash before anything was written
+        open(self.filename, 'wb').close()
+        dm = DataManager(AppBus())
+        dm.load_application_data_from_file(app_data_filename)
+        self.assertIn('FE-00-00-01', dm.devices)
+        dm._serial_callback_handler({'msg': msg, 'base_id': None, 'gateway_id': 'FF-00-00-80'})
+        dm.telegram_journal.close()
+        self.assertEqual(len(TelegramJournal(self.filename)), 1)
+
+        # foreign file is renamed
+        with open(self.filename, 'wb') as f:
+            f.write(b'no journal')
+        dm = DataManager(AppBus())
+        dm.load_application_data_from_file(app_data_filename)
+        self.assertIn('FE-00-00-01', dm.devices)
+        self.assertEqual(len(dm.telegram_journal), 0)
+        self.assertEqual(len([f for f in os.listdir(self.temp_dir.name) if f.endswith('.damaged')]), 1)
+        dm._on_window_closed(None)
+
+
+    def test_import_keeps_current_project(self):
+        app_data_filename = os.path.join(self.temp_dir.name, 'test.eodm')
+        import_filename = os.path.join(self.temp_dir.name, 'import.eodm')
+        for filename, address in [(app_data_filename, 'FE-00-00-01'), (import_filename, 'FE-00-00-02')]:
+            ApplicationDataStore(filename).write(ApplicationData(version='1.0', selected_data_filter=None, data_filters={},
+                                                                 devices={address: Device(address=address, external_id=address)},
+                                                                 recoreded_messages=[]))
+
+        dm = DataManager(AppBus())
+        dm.load_application_data_from_file(app_data_filename)
+        store = dm.application_data_store
+        dm.load_application_data_from_file(import_filename, mark_as_saved=False)
+        self.assertIn('FE-00-00-02', dm.devices)
+        self.assertIs(dm.application_data_store, store)
+        self.assertEqual(dm.telegram_journal.filename, self.filename)
+
+        msg = RPSMessage(b'\xfe\x00\x00\x02', 0x30, b'\x70', True)
+        dm._serial_callback_handler({'msg': msg, 'base_id': None, 'gateway_id': 'FF-00-00-80'})
+        dm._on_window_closed(None)
+        self.assertEqual(len(TelegramJournal(self.filename)), 1)
+        self.assertFalse(os.path.exists(TelegramJournal.get_journal_filename(import_filename)))
+
+
+    def test_header_is_written_immediately(self):
+        journal = TelegramJournal(self.filename)
+        journal.append(RecordedMessage(RPSMessage(b'\xfe\x00\x00\x01', 0x30, b'\x70', True), 'FE-00-00-01', None, 1000.0))
+        self.assertGreaterEqual(os.path.getsize(self.filename), TelegramJournal.HEADER_STRUCT.size)
+        journal.close()
+
+
+    def test_replay_engine(self):
+        start = datetime(2024, 1, 1)
+        journal = TelegramJournal(self.filename)
+        for i in range(10):
+            msg = RPSMessage(bytes([0xFE, 0, 0, i]), 0x30, b'\x70', True)
+            journal.append(RecordedMessage(msg, f"FE-00-00-0{i}", 'FF-00-00-80', (start + timedelta(milliseconds=10*i)).timestamp()))
+
+        app_bus = AppBus()
+        dm = DataManager(app_bus)
+        engine = TelegramReplayEngine(app_bus, SerialController(app_bus, None), journal)
+
+        report = engine.run(speed=0)
+        self.assertEqual(report.telegram_count, 10)
+        self.assertEqual(len(dm.devices), 10)
+        self.assertEqual(report.ingest.call_count, 10)
+        self.assertGreater(report.throughput, 0)
+        self.assertIn('DataManager._serial_callback_handler', str(report))
+
+        # original timing takes at least 90ms
+        report = engine.run(speed=1)
+        self.assertEqual(report.telegram_count, 10)
+        self.assertGreaterEqual(report.feed_duration, 0.09)
+        journal.close()
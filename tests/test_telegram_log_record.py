@@ -0,0 +1,65 @@
+import unittest
+from datetime import datetime
+
+from eo_man import load_dep_homeassistant
+load_dep_homeassistant()
+
+from eltakobus.message import Regular4BSMessage, EltakoWrappedRPS
+from esp2_gateway_adapter.esp3_serial_com import ESP3SerialCommunicator
+
+from eo_man.controller.app_bus import AppBus
+from eo_man.data.data_manager import DataManager
+from eo_man.data.device import Device
+from eo_man.view.log_output import LogOutputPanel, TelegramLogRecord
+
+
+class TestTelegramLogRecord(unittest.TestCase):
+
+    def test_formatted_parts(self):
+        dm = DataManager(AppBus())
+        d = Device(address='FE-DB-00-01', external_id='FE-DB-00-01', base_id='00-00-00-00', name='sensor')
+        d.eep = 'A5-04-02'
+        dm.devices[d.external_id] = d
+
+        msg = Regular4BSMessage(b'\xfe\xdb\x00\x01', 0x00, bytes((0x00, 0x64, 0x80, 0x0A)))
+        record = TelegramLogRecord(msg, None)
+        self.assertEqual(record.get_text(), "Received Telegram: Regular4BSMessage from FE-DB-00-01, data: 00-64-80-0A, status: 00")
+        eep, values = dm.get_values_from_message_to_string(msg)
+        self.assertEqual(record.get_values(dm), f" => values for EEP {eep.__name__}: ({values})")
+        self.assertEqual(record.get_esp2(), f", ESP2: {msg.serialize().hex()}")
+        self.assertEqual(record.get_esp3(), f", ESP3: {bytes(ESP3SerialCommunicator.convert_esp2_to_esp3_message(msg).build()).hex()}")
+
+        # memoized
+        self.assertIs(record.get_values(None), record.get_values(dm))
+        self.assertIs(record.get_esp3(), record.get_esp3())
+
+        unknown = TelegramLogRecord(EltakoWrappedRPS(b'\x00\x00\x00\x05', 0x30, b'\x70'), 'FF-AA-80-00')
+        self.assertEqual(unknown.get_values(dm), '')
+
+
+    def test_short_text_until_visible(self):
+        dm = DataManager(AppBus())
+        panel = LogOutputPanel.__new__(LogOutputPanel)
+        panel.data_manager = dm
+        panel.show_telegram_values = _BooleanVar(True)
+        panel.show_esp2_binary = _BooleanVar(True)
+        panel.show_esp3_binary = _BooleanVar(False)
+
+        record = TelegramLogRecord(Regular4BSMessage(b'\xfe\xdb\x00\x01', 0x00, bytes((0x00, 0x64, 0x80, 0x0A))), None)
+        entry = (datetime(2024, 1, 2, 3, 4, 5), record, 'darkgrey')
+        self.assertEqual(panel._format_line(entry), f"2024-01-02 03:04:05.000000: {record.get_text()}")
+        self.assertIsNone(record.rendered_options)
+        # nothing but the short text is computed
+        self.assertIsNone(record._esp2)
+
+        options = panel._get_display_options()
+        self.assertEqual(panel._format_line(entry, options), f"2024-01-02 03:04:05.000000: {record.get_text()}{record.get_esp2()}")
+        self.assertEqual(record.rendered_options, (True, True, False))
+
+
+class _BooleanVar():
+    def __init__(self, value:bool) -> None:
+        self.value = value
+
+    def get(self) -> bool:
+        return self.value
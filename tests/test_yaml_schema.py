@@ -0,0 +1,54 @@
+import os
+import unittest
+import yaml
+
+from eo_man import load_dep_homeassistant
+load_dep_homeassistant()
+
+from eltakobus.message import RPSMessage
+
+from eo_man.data import yaml_schema
+# registers ApplicationData in the yaml schema
+from eo_man.data.application_data import ApplicationData
+from eo_man.data.message_history import MessageHistoryEntry
+from eo_man.data.recorded_message import RecordedMessage
+
+
+class TestYamlSchema(unittest.TestCase):
+
+    def test_compatible_with_full_loader(self):
+        # demo.eodm was written by python >= 3.12 which stores enums as getattr(<class>, <name>)
+        filenames = [os.path.join(os.path.dirname(__file__), 'resources', 'test_app_config_1.eodm'),
+                     os.path.join(os.path.dirname(__file__), '..', 'demo.eodm')]
+        for filename in filenames:
+            with open(filename, 'r') as f:
+                file_content = f.read()
+
+            app_data = yaml_schema.load(file_content)
+            self.assertGreater(len(app_data.devices), 20)
+            self.assertEqual(yaml.dump(app_data), yaml.dump(yaml.load(file_content, Loader=yaml.Loader)), filename)
+            # files written with the schema can be read by previous versions
+            self.assertEqual(yaml.dump(yaml.load(yaml_schema.dump(app_data), Loader=yaml.Loader)), yaml.dump(app_data), filename)
+
+
+    def test_round_trip(self):
+        rm = RecordedMessage(RPSMessage(b'\xfe\x00\x00\x01', 0x30, b'\x70'), 'FE-00-00-01', 'FF-AA-80-00', 1700000000.5)
+        data = [rm, MessageHistoryEntry('button', b'\x01\x02'), (1, 'a')]
+
+        loaded = yaml_schema.load(yaml_schema.dump(data))
+        self.assertEqual(loaded[0].raw_message, rm.raw_message)
+        self.assertEqual(loaded[0].received_timestamp, rm.received_timestamp)
+        self.assertEqual(loaded[0].external_device_id, 'FE-00-00-01')
+        self.assertEqual(loaded[1].__dict__, {'name': 'button', 'message': b'\x01\x02'})
+        self.assertEqual(loaded[2], (1, 'a'))
+
+
+    def test_unknown_objects_are_not_constructed(self):
+        with self.assertRaises(yaml.constructor.ConstructorError):
+            yaml_schema.load("!!python/object/apply:os.getcwd []")
+        with self.assertRaises(yaml.constructor.ConstructorError):
+            yaml_schema.load("!!python/object/apply:builtins.getattr [!!python/name:os.path '', sep]")
+        with self.assertRaises(yaml.constructor.ConstructorError):
+            yaml_schema.load("!!python/object/apply:builtins.getattr [!!python/name:homeassistant.const.Platform '', __class__]")
+        with self.assertRaises(yaml.representer.RepresenterError):
+            yaml_schema.dump(object())